@@ -1,9 +1,12 @@
 import sys
 from PyQt5.QtWidgets import QApplication
 from gui.window import MainWindow
+from utils.log import setup_logging, shutdown_logging
 import time
 
 def main():
+    # Manager diagnostics go through a background logging thread
+    setup_logging()
     app = QApplication(sys.argv)
     
     # Allow time for Qt's event loop to initialize first
@@ -13,7 +16,10 @@ def main():
     # Make sure the WebUIManager is created after the QApplication
     # but before the event loop starts
     
-    return app.exec_()
+    try:
+        return app.exec_()
+    finally:
+        shutdown_logging()
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
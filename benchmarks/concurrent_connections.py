@@ -0,0 +1,129 @@
+"""Web UI responsiveness with many open dashboard connections.
+
+Opens N console streams (what every open server page holds) against each
+serving backend, then measures /api/dashboard latency from a few polling
+clients while the streams stay open.
+
+    python benchmarks/concurrent_connections.py [--streams 1000] [--backends pooled,asyncio] [--no-keep-alive]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication
+from gui.webui import WebUIManager, ConsoleBuffer
+
+HOST = '127.0.0.1'
+
+
+async def open_stream(port, path, timeout):
+    """Open one console stream and wait for its first event; returns the open connection or None"""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(HOST, port), timeout)
+        writer.write(f"GET /api/console/stream?path={path} HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode())
+        await asyncio.wait_for(reader.readuntil(b'event: lines'), timeout)
+        return reader, writer
+    except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError):
+        return None
+
+
+async def poll_dashboard(port, duration, timeout, latencies):
+    """One keep-alive client polling the dashboard for duration seconds"""
+    failures = 0
+    connection = None
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.wait_for(asyncio.open_connection(HOST, port), timeout)
+            reader, writer = connection
+            writer.write(f"GET /api/dashboard HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode())
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout)
+            length = 0
+            for line in head.decode('latin-1').split('\r\n'):
+                if line.lower().startswith('content-length:'):
+                    length = int(line.split(':', 1)[1])
+                if line.lower() == 'connection: close':
+                    connection = None
+            await asyncio.wait_for(reader.readexactly(length), timeout)
+            latencies.append(time.perf_counter() - start)
+        except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError):
+            failures += 1
+            connection = None
+    return failures
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run_load(port, streams, pollers, duration, timeout):
+    started = time.perf_counter()
+    opened = await asyncio.gather(*[open_stream(port, 'bench', timeout) for _ in range(streams)])
+    open_streams = [connection for connection in opened if connection]
+    open_time = time.perf_counter() - started
+
+    latencies = []
+    started = time.perf_counter()
+    failures = await asyncio.gather(*[poll_dashboard(port, duration, timeout, latencies) for _ in range(pollers)])
+    poll_time = time.perf_counter() - started
+
+    for _, writer in open_streams:
+        writer.close()
+    return len(open_streams), open_time, latencies, sum(failures), poll_time
+
+
+def benchmark(backend, args, port):
+    manager = WebUIManager()
+    manager.settings.update(host=HOST, port=port, backend=backend, workers=args.workers,
+                            keep_alive=args.keep_alive, request_timeout=60, shutdown_timeout=2)
+    manager.console_buffers['bench'] = ConsoleBuffer(100)
+    for number in range(args.profiles):
+        manager.profiles[f'servers/profile-{number}'] = None
+    manager.profiles['bench'] = None
+    manager.start()
+    threads_before = threading.active_count()
+    try:
+        loop = asyncio.new_event_loop()
+        opened, open_time, latencies, failures, poll_time = loop.run_until_complete(
+            run_load(port, args.streams, args.pollers, args.duration, args.timeout))
+        loop.close()
+    finally:
+        manager.stop()
+
+    print(f"{backend:<9} streams open {opened:>5}/{args.streams} in {open_time:5.2f}s | "
+          f"dashboard {len(latencies):>5} ok {failures:>4} failed | "
+          f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  p99 {percentile(latencies, 0.99) * 1000:7.1f} ms | "
+          f"{len(latencies) / poll_time:7.1f} req/s | threads {threads_before}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--streams', type=int, default=1000, help="open console streams")
+    parser.add_argument('--pollers', type=int, default=20, help="concurrent dashboard clients")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of dashboard polling")
+    parser.add_argument('--profiles', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--timeout', type=float, default=2.0, help="seconds before a request counts as failed")
+    parser.add_argument('--backends', default='pooled,asyncio')
+    parser.add_argument('--port', type=int, default=18090)
+    parser.add_argument('--no-keep-alive', dest='keep_alive', action='store_false',
+                        help="have the server close every connection after one response")
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    for offset, backend in enumerate(args.backends.split(',')):
+        benchmark(backend.strip(), args, args.port + offset)
+
+
+if __name__ == '__main__':
+    main()
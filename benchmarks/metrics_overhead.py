@@ -0,0 +1,135 @@
+"""Cost of the /metrics instrumentation relative to console ingest.
+
+Feeds synthetic console output through a ProcessOutputHub into the web
+console buffer, as a running server's output flows, and compares:
+
+  * the per-chunk byte counter against the per-chunk cost of ingest,
+  * the time spent scraping /metrics against ingest time while both run,
+  * the cost of one request's latency observation.
+
+    python benchmarks/metrics_overhead.py [--mb 16] [--runs 5] [--scrape-interval 1.0]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication, QProcess, QByteArray
+from gui.output import ProcessOutputHub
+from gui.webui import WebUIManager
+from line_assembler import make_burst, make_chunks
+
+
+def make_manager(servers, directory):
+    manager = WebUIManager()
+    for number in range(servers):
+        process = QProcess()
+        panel = type('Panel', (), {})()
+        panel.process = process
+        panel.output_hub = ProcessOutputHub(process)
+        manager.add_server_profile(os.path.join(directory, f"server-{number}"), panel)
+        panel.output_hub.unsubscribe('console-log')  # Keep disk I/O out of the measurement
+    return manager
+
+
+def ingest(manager, chunks):
+    """Feed every chunk through the first server's hub; returns (lines, seconds)"""
+    hub = next(iter(manager.profiles.values())).output_hub
+    before = hub.lines_published
+    started = time.perf_counter()
+    for chunk in chunks:
+        hub._read(chunk, 'stdout')
+    hub.flush()
+    return hub.lines_published - before, time.perf_counter() - started
+
+
+def scraper(manager, interval, stop, durations):
+    while not stop.wait(interval):
+        started = time.perf_counter()
+        manager.metrics.expose()
+        durations.append(time.perf_counter() - started)
+
+
+def scraped_ingest(manager, chunks, runs, interval):
+    """Ingest while a scraper runs; returns (lines, ingest seconds, scrape durations).
+
+    Throughput differs by several percent from run to run on its own, so the
+    scraper's share is measured directly: with the GIL, every second it
+    spends is a second ingest cannot use.
+    """
+    total_lines = 0
+    total_seconds = 0
+    durations = []
+    for _ in range(runs):
+        stop = threading.Event()
+        thread = threading.Thread(target=scraper, args=(manager, interval, stop, durations), daemon=True)
+        thread.start()
+        lines, seconds = ingest(manager, chunks)
+        stop.set()
+        thread.join()
+        total_lines += lines
+        total_seconds += seconds
+    return total_lines, total_seconds, durations
+
+
+def counter_cost(chunks, repeat=20):
+    """Seconds per chunk spent on the hub's byte counter"""
+    holder = type('Hub', (), {'bytes_read': 0})()
+    datas = [chunk.data() for chunk in chunks]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for data in datas:
+            holder.bytes_read += len(data)
+    return (time.perf_counter() - started) / (repeat * len(datas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--mb', type=float, default=16, help="console output per run")
+    parser.add_argument('--chunk', type=int, default=16384, help="bytes per readyRead")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--servers', type=int, default=20, help="profiles exposed in each scrape")
+    parser.add_argument('--scrape-interval', type=float, default=1.0)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    data = make_burst(int(args.mb * 1024 * 1024))
+    chunks = [QByteArray(chunk) for chunk in make_chunks(data, args.chunk)]
+    directory = tempfile.mkdtemp(prefix='metrics-bench-')
+    manager = make_manager(args.servers, directory)
+
+    lines, seconds = ingest(manager, chunks)  # Warm caches
+    per_chunk = seconds / len(chunks)
+    counter = counter_cost(chunks)
+    print(f"ingest        {lines / seconds:12,.0f} lines/s  {per_chunk * 1e6:8.1f} us/chunk")
+    print(f"byte counter  {counter * 1e9:12.1f} ns/chunk   {counter / per_chunk * 100:8.4f} % of ingest")
+
+    lines, seconds, durations = scraped_ingest(manager, chunks, args.runs, args.scrape_interval)
+    print(f"scraped       {lines / seconds:12,.0f} lines/s  {len(durations)} scrapes every {args.scrape_interval}s "
+          f"took {sum(durations) / seconds * 100:8.4f} % of ingest time")
+
+    started = time.perf_counter()
+    scrape_count = 200
+    for _ in range(scrape_count):
+        body = manager.metrics.expose()
+    print(f"one scrape    {(time.perf_counter() - started) / scrape_count * 1000:12.2f} ms  ({len(body)} bytes)")
+
+    latency = manager.request_latency.labels('/api/console')
+    count = manager.request_count.labels('/api/console', 'GET', '200')
+    observations = 200000
+    started = time.perf_counter()
+    for _ in range(observations):
+        latency.observe(0.0012)
+        count.inc()
+    print(f"per request   {(time.perf_counter() - started) / observations * 1e9:12.0f} ns")
+    manager.stop()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
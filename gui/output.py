@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from collections import deque
+from PyQt5.QtCore import QObject
+from utils.lines import LineAssembler
+from utils.logparse import LogParser
+from utils.render import render_segments, render_html
+
+logger = logging.getLogger(__name__)
+
+# Subscriber overflow policies
+DROP_OLDEST = 'drop_oldest'  # Keep the newest lines, forget the oldest queued ones
+DROP_NEWEST = 'drop_newest'  # Keep what is queued, refuse new lines until there is room
+
+SUBSCRIBER_QUEUE_LINES = 10000
+
+
+class OutputLine:
+    """One line of process output, decoded, parsed and rendered once and shared by every subscriber"""
+    __slots__ = ('text', 'stream', 'timestamp', 'entry', 'segments', 'html')
+
+    def __init__(self, text, stream='stdout', timestamp=None, entry=None):
+        self.text = text
+        self.stream = stream
+        self.timestamp = timestamp or time.time()
+        self.entry = entry  # Parsed LogEntry
+        self.segments = render_segments(text)  # Styled runs, or None for plain text
+        self.html = render_html(text)  # Escaped, colour-classified HTML
+
+    @property
+    def level(self):
+        return self.entry.level if self.entry else None
+
+    @property
+    def thread(self):
+        return self.entry.thread if self.entry else None
+
+    @property
+    def is_error(self):
+        return self.stream == 'stderr'
+
+    def __repr__(self):
+        return f"OutputLine({self.stream}, {self.text!r})"
+
+
+class OutputSubscriber:
+    """A consumer of process output with its own bounded queue.
+
+    Inline subscribers are drained on the publishing (Qt) thread right after
+    each chunk; threaded ones get a worker thread so a slow consumer only
+    ever fills its own queue.
+    """
+    def __init__(self, name, callback, max_pending=SUBSCRIBER_QUEUE_LINES,
+                 overflow=DROP_OLDEST, threaded=False):
+        self.name = name
+        self.callback = callback
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.threaded = threaded
+        self.pending = deque()
+        self.dropped = 0
+        self.cond = threading.Condition()
+        self.closed = False
+        self.thread = None
+        if threaded:
+            self.thread = threading.Thread(target=self._worker, name=f"output-{name}", daemon=True)
+            self.thread.start()
+
+    def offer(self, lines):
+        with self.cond:
+            room = self.max_pending - len(self.pending)
+            if len(lines) > room:
+                if self.overflow == DROP_NEWEST:
+                    self.dropped += len(lines) - max(room, 0)
+                    lines = lines[:max(room, 0)]
+                else:
+                    evicted = min(len(lines) - room, len(self.pending))
+                    for _ in range(evicted):
+                        self.pending.popleft()
+                    kept = lines[-self.max_pending:]
+                    self.dropped += evicted + len(lines) - len(kept)
+                    lines = kept
+            self.pending.extend(lines)
+            if self.threaded:
+                self.cond.notify()
+
+    def drain(self):
+        with self.cond:
+            if not self.pending:
+                return
+            batch = list(self.pending)
+            self.pending.clear()
+        try:
+            self.callback(batch)
+        except Exception as e:
+            logger.error("Error in output subscriber %s: %s", self.name, e)
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if self.closed and not self.pending:
+                    return
+            self.drain()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+
+class ProcessOutputHub(QObject):
+    """The only reader of a QProcess's stdout and stderr.
+
+    Each readyRead chunk is read once and fed to a per-stream LineAssembler;
+    the complete lines are parsed into log fields and published as
+    OutputLines to every registered subscriber.
+    """
+    def __init__(self, process, parent=None):
+        super().__init__(parent)
+        self.process = process
+        self.parser = LogParser()
+        self.assemblers = {'stdout': LineAssembler(), 'stderr': LineAssembler()}
+        self.subscribers = {}  # Name -> OutputSubscriber
+        self.lines_published = 0
+        self.bytes_read = 0
+        process.readyReadStandardOutput.connect(self.read_stdout)
+        process.readyReadStandardError.connect(self.read_stderr)
+        process.finished.connect(self.flush)
+
+    def subscribe(self, name, callback, **options):
+        """Register a subscriber, replacing any earlier one with the same name"""
+        subscriber = OutputSubscriber(name, callback, **options)
+        previous = self.subscribers.get(name)
+        self.subscribers = dict(self.subscribers, **{name: subscriber})
+        if previous:
+            previous.close()
+        return subscriber
+
+    def unsubscribe(self, name):
+        subscribers = dict(self.subscribers)
+        subscriber = subscribers.pop(name, None)
+        self.subscribers = subscribers
+        if subscriber:
+            subscriber.close()
+
+    def read_stdout(self):
+        self._read(self.process.readAllStandardOutput(), 'stdout')
+
+    def read_stderr(self):
+        self._read(self.process.readAllStandardError(), 'stderr')
+
+    def _read(self, chunk, stream):
+        try:
+            data = chunk.data()
+            self.bytes_read += len(data)
+            self._publish_assembled(self.assemblers[stream].feed(data), stream)
+        except Exception as e:
+            logger.error("Error reading process %s: %s", stream, e)
+
+    def flush(self, *args):
+        """Publish any unterminated last lines, e.g. once the process has exited"""
+        for stream, assembler in self.assemblers.items():
+            self._publish_assembled(assembler.flush(), stream)
+
+    def _publish_assembled(self, assembled, stream):
+        parse = self.parser.parse
+        self.publish([OutputLine(text, stream, ts, parse(text, stream)) for ts, text in assembled])
+
+    def publish(self, lines):
+        if not lines:
+            return
+        self.lines_published += len(lines)
+        for subscriber in self.subscribers.values():
+            subscriber.offer(lines)
+            if not subscriber.threaded:
+                subscriber.drain()
@@ -0,0 +1,64 @@
+let lastDashboard = null;
+
+function formatUptime(seconds) {
+    const hours = Math.floor(seconds / 3600);
+    const minutes = Math.floor(seconds % 3600 / 60);
+    return hours ? `${hours}h ${minutes}m` : `${minutes}m`;
+}
+
+function loadServers() {
+    // The browser revalidates with If-None-Match; unchanged data comes back as a 304
+    fetch('/api/dashboard')
+        .then(response => response.ok ? response.text() : Promise.reject(new Error('HTTP ' + response.status)))
+        .then(text => {
+            if (text === lastDashboard) {
+                return;
+            }
+            lastDashboard = text;
+            const data = JSON.parse(text);
+            const serverList = document.getElementById('serverList');
+            serverList.innerHTML = '';
+
+            if (data.servers.length === 0) {
+                serverList.innerHTML = '<p>No server profiles found.</p>';
+                return;
+            }
+
+            data.servers.forEach(server => {
+                const serverCard = document.createElement('div');
+                serverCard.className = 'server-card';
+
+                const running = server.status === 'running';
+                const statusClass = running ? 'status-running' : 'status-stopped';
+                const statusText = server.status.charAt(0).toUpperCase() + server.status.slice(1);
+                // CPU and memory are null until the first sample of a new process
+                const cpu = server.cpu !== null ? `${server.cpu}%` : '–';
+                const memory = server.memory !== null ? `${server.memory} MB` : '–';
+                const stats = running
+                    ? `CPU ${cpu} &middot; Memory ${memory} &middot; up ${formatUptime(server.uptime)}`
+                        + (server.players !== null ? ` &middot; ${server.players} players` : '')
+                        + (server.tps !== null ? ` &middot; ${server.tps} TPS` : '')
+                        + (server.lagging ? ' &middot; <span class="status-stopped">lagging</span>' : '')
+                        + (server.hung ? ' &middot; <span class="status-stopped">not responding</span>' : '')
+                    : '';
+
+                serverCard.innerHTML = `
+                    <div class="server-name">
+                        ${server.name}
+                        <span class="status-badge ${statusClass}">${statusText}</span>
+                    </div>
+                    <div class="server-path">${server.path}</div>
+                    <div class="server-stats">${stats}</div>
+                `;
+                serverCard.addEventListener('click', () => {
+                    window.location.href = '/server?path=' + encodeURIComponent(server.path);
+                });
+                serverList.appendChild(serverCard);
+            });
+        })
+        .catch(error => console.error('Error loading servers:', error));
+}
+
+// Load servers immediately and refresh every 2 seconds
+loadServers();
+setInterval(loadServers, 2000);
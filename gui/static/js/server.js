@@ -0,0 +1,306 @@
+// Per-page values are rendered into the page as JSON; everything else is static
+const PAGE = JSON.parse(document.getElementById('page-data').textContent);
+const SERVER_PATH = PAGE.path;
+
+// Server status and control
+let serverStatus = 'unknown';
+let consoleUpdateInterval;
+let consoleSeq = 0;  // Last console sequence number we have shown
+let consoleStream = null;
+const MAX_CONSOLE_LINES = PAGE.maxConsoleLines;
+
+let statusVersion = null;  // State version of the last status we have shown
+
+// State changes arrive through a long-poll that answers as soon as they happen;
+// console lines are pushed over a stream. Memory usage still needs an occasional status poll.
+checkServerStatus();
+setInterval(checkServerStatus, 10000);
+watchServerStatus();
+connectStream();
+
+function watchServerStatus() {
+    let url = '/api/status/wait?path=' + encodeURIComponent(SERVER_PATH);
+    if (statusVersion !== null) {
+        url += '&version=' + statusVersion;
+    }
+    fetch(url)
+        .then(jsonOrReject)
+        .then(data => {
+            applyStatus(data);
+            watchServerStatus();
+        })
+        .catch(error => {
+            console.error('Error waiting for server status:', error);
+            setTimeout(watchServerStatus, 2000);
+        });
+}
+
+function connectStream() {
+    if (!window.EventSource) {
+        // Old browsers fall back to polling
+        consoleUpdateInterval = setInterval(updateConsole, 500);
+        return;
+    }
+    // The browser resumes from Last-Event-ID when it reconnects
+    consoleStream = new EventSource('/api/console/stream?path=' + encodeURIComponent(SERVER_PATH) + '&since=' + consoleSeq + '&format=html' + levelParam());
+    consoleStream.addEventListener('lines', event => appendConsoleLines(JSON.parse(event.data)));
+    consoleStream.addEventListener('status', event => applyStatus(JSON.parse(event.data)));
+}
+
+function jsonOrReject(response) {
+    // A 429 means we are polling too fast; skip this update rather than show its error body
+    return response.ok ? response.json() : Promise.reject(new Error('HTTP ' + response.status));
+}
+
+function levelParam() {
+    const level = document.getElementById('levelFilter').value;
+    return level ? '&level=' + level : '';
+}
+
+function changeLevelFilter() {
+    // Filtering happens on the server, so start over with the new filter
+    document.getElementById('consoleOutput').innerHTML = '';
+    consoleSeq = 0;
+    if (consoleStream) {
+        consoleStream.close();
+        connectStream();
+    } else {
+        updateConsole();
+    }
+}
+
+function checkServerStatus() {
+    fetch('/api/status?path=' + encodeURIComponent(SERVER_PATH))
+        .then(jsonOrReject)
+        .then(applyStatus)
+        .catch(error => {
+            console.error('Error checking server status:', error);
+        });
+}
+
+function applyStatus(data) {
+    // The stream and the long-poll carry the same state versions; never step back to an older one
+    if (data.version !== undefined) {
+        if (statusVersion !== null && data.version < statusVersion) {
+            return;
+        }
+        statusVersion = data.version;
+    }
+    serverStatus = data.status;
+    const statusElement = document.getElementById('serverStatus');
+
+    if (data.status === 'running') {
+        // Running but not yet through startup ("Done (...)" not printed yet)
+        statusElement.textContent = data.hung ? 'Not responding' : (data.ready === false ? 'Starting' : 'Running');
+        statusElement.className = 'status-running';
+        document.getElementById('startButton').disabled = true;
+        document.getElementById('stopButton').disabled = false;
+    } else if (data.status === 'starting') {
+        statusElement.textContent = 'Starting';
+        statusElement.className = 'status-running';
+        document.getElementById('startButton').disabled = true;
+        document.getElementById('stopButton').disabled = false;
+    } else {
+        statusElement.textContent = data.crashed ? 'Crashed' : 'Stopped';
+        statusElement.className = 'status-stopped';
+        document.getElementById('startButton').disabled = false;
+        document.getElementById('stopButton').disabled = true;
+    }
+
+    // Update memory usage if available
+    if (data.memory) {
+        document.getElementById('memoryUsage').textContent = data.memory;
+    }
+
+    if (data.tick || data.lagging !== undefined) {
+        applyTickHealth(data.tick || {}, data.lagging);
+    }
+    if (data.ping !== undefined || data.status !== 'running') {
+        applyPing(data.ping, data.status);
+    }
+}
+
+function applyPing(ping, status) {
+    const element = document.getElementById('pingStatus');
+    if (status !== 'running' || !ping) {
+        element.textContent = '–';
+        element.className = '';
+    } else if (ping.online) {
+        const players = ping.players_max !== null ? ` · ${ping.players_online}/${ping.players_max} players` : '';
+        element.textContent = `${ping.latency} ms${players}` + (ping.motd ? ` · ${ping.motd}` : '');
+        element.className = '';
+    } else {
+        element.textContent = 'No answer' + (ping.failures > 1 ? ` (${ping.failures} tries)` : '');
+        element.className = 'status-stopped';
+    }
+}
+
+function applyTickHealth(tick, lagging) {
+    const parts = [];
+    if (tick.tps !== null && tick.tps !== undefined) {
+        parts.push('TPS ' + tick.tps.toFixed(1));
+    }
+    if (tick.mspt !== null && tick.mspt !== undefined) {
+        parts.push('MSPT ' + tick.mspt.toFixed(1));
+    }
+    if (lagging) {
+        parts.push(tick.behind_ms ? 'Lagging (' + tick.behind_ms + ' ms behind)' : 'Lagging');
+    }
+    const element = document.getElementById('tickHealth');
+    element.textContent = parts.length ? parts.join(' · ') : (serverStatus === 'running' ? 'OK' : '–');
+    element.className = lagging ? 'status-stopped' : '';
+}
+
+function startServer() {
+    fetch('/api/control/start', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ path: SERVER_PATH }),
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Show console; new lines and status arrive over the stream
+            document.getElementById('consoleArea').style.display = 'block';
+        }
+    })
+    .catch(error => console.error('Error:', error));
+}
+
+function stopServer() {
+    fetch('/api/control/stop', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ path: SERVER_PATH }),
+    })
+    .then(response => response.json())
+    .then(data => {
+        // Status update arrives over the stream
+        console.log(data);
+    })
+    .catch(error => console.error('Error:', error));
+}
+
+// Console functions
+function toggleConsole() {
+    const consoleArea = document.getElementById('consoleArea');
+    if (consoleArea.style.display === 'none' || consoleArea.style.display === '') {
+        consoleArea.style.display = 'block';
+        const consoleOutput = document.getElementById('consoleOutput');
+        consoleOutput.scrollTop = consoleOutput.scrollHeight;
+    } else {
+        consoleArea.style.display = 'none';
+    }
+}
+
+function updateConsole() {
+    fetch('/api/console?path=' + encodeURIComponent(SERVER_PATH) + '&since=' + consoleSeq + '&format=html' + levelParam())
+        .then(jsonOrReject)
+        .then(appendConsoleLines)
+        .catch(error => console.error('Error:', error));
+}
+
+function appendConsoleLines(data) {
+    const consoleOutput = document.getElementById('consoleOutput');
+    if (data.reset || data.seq < consoleSeq) {
+        consoleOutput.innerHTML = '';
+    }
+    consoleSeq = data.seq;
+    if (data.lines.length === 0) {
+        return;
+    }
+
+    const fragment = document.createDocumentFragment();
+    data.lines.forEach(line => {
+        // Lines arrive as HTML escaped and coloured by the server
+        const row = document.createElement('div');
+        row.innerHTML = line;
+        fragment.appendChild(row);
+    });
+    consoleOutput.appendChild(fragment);
+
+    // Keep the DOM as bounded as the server-side buffer
+    while (consoleOutput.childNodes.length > MAX_CONSOLE_LINES) {
+        consoleOutput.removeChild(consoleOutput.firstChild);
+    }
+    consoleOutput.scrollTop = consoleOutput.scrollHeight;
+}
+
+function sendCommand() {
+    const input = document.getElementById('consoleInput');
+    const command = input.value.trim();
+
+    if (command) {
+        fetch('/api/console/send', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ 
+                path: SERVER_PATH,
+                command: command
+            }),
+        })
+        .then(() => {
+            input.value = '';
+            // The echoed command arrives over the stream
+            if (!consoleStream) {
+                updateConsole();
+            }
+        })
+        .catch(error => console.error('Error:', error));
+    }
+}
+
+// Config functions
+function toggleConfig() {
+    const configArea = document.getElementById('configArea');
+    if (configArea.style.display === 'none' || configArea.style.display === '') {
+        configArea.style.display = 'block';
+        loadConfig();
+    } else {
+        configArea.style.display = 'none';
+    }
+}
+
+// Ensure this JavaScript function is correct in your HTML template
+function loadConfig() {
+    fetch('/api/config?path=' + encodeURIComponent(SERVER_PATH))
+        .then(response => response.json())
+        .then(data => {
+            console.log("Config data:", data);  // Debug line
+            if (data.content) {
+                document.getElementById('configText').value = data.content;
+            } else if (data.error) {
+                document.getElementById('configText').value = '# ' + data.error;
+            }
+        })
+        .catch(error => {
+            console.error('Error loading config:', error);
+            document.getElementById('configText').value = '# Error loading configuration';
+        });
+}
+
+function saveConfig() {
+    const configContent = document.getElementById('configText').value;
+
+    fetch('/api/config/save', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ 
+            path: SERVER_PATH,
+            content: configContent
+        }),
+    })
+    .then(response => response.json())
+    .then(data => {
+        alert(data.success ? 'Configuration saved successfully!' : 'Error saving configuration');
+    })
+    .catch(error => console.error('Error:', error));
+}
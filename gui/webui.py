@@ -1,43 +1,613 @@
-from flask import Flask, render_template, jsonify, send_from_directory, request, redirect
+from flask import Flask, render_template, jsonify, send_from_directory, request, redirect, Response, g
 import os
-import psutil
+import re
+import asyncio
 import threading
 import time
-from PyQt5.QtCore import QProcess, pyqtSignal, QObject, pyqtSlot, Qt
+from PyQt5.QtCore import QProcess, pyqtSignal, QObject, pyqtSlot, Qt, QTimer
 import subprocess
 import json
+import hashlib
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from utils.logstore import ConsoleLog
+from utils.logparse import LEVEL_RANKS, level_rank, normalize_level, match_line, is_game_entry
+from utils.log import OutputTracer, get_levels, set_level, queue_depth
+from utils.metrics import Registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from utils.ratelimit import RateLimiter, CoalescingCache
+from utils.sampler import ProcessSampler
+from utils.timeseries import TimeSeriesStore, parse_range
+from utils.tickhealth import TickHealth, is_paper_profile
+from utils.players import PlayerTracker
+from utils.slp import ServerPinger, read_server_address
+from utils.render import render_html, error_html, stylesheet
+from utils.serving import load_settings, create_backend
+from utils.assets import StaticAssets, IMMUTABLE_CACHE
+from utils.asyncserver import Response as AsyncResponse, StreamResponse
+from utils.compression import compress_response
+from werkzeug.http import is_resource_modified
+
+logger = logging.getLogger(__name__)
+
+# Default console history kept per profile and the byte budget shared by all profiles
+CONSOLE_BUFFER_LINES = 500
+CONSOLE_MEMORY_BUDGET = 16 * 1024 * 1024
+
+# Persistent console history lives in this directory inside each profile
+CONSOLE_LOG_DIR = 'console-log'
+CONSOLE_HISTORY_LIMIT = 5000  # Most records one history request may return
+CONSOLE_SEARCH_LIMIT = 1000   # Most matches one search request may return
+
+# Metric history is saved next to the console history
+HISTORY_FILE = 'metrics.dat'
+HISTORY_SAVE_INTERVAL = 300  # Seconds between saves of the minute and hour rollups
+HISTORY_DEFAULT_RANGE = '1h'
+
+# Player sessions are saved there too, with the console log position they cover
+PLAYERS_FILE = 'players.json'
+PLAYERS_LIMIT = 1000  # Most players one /api/players request may list
+
+# Console stream tuning
+STREAM_QUEUE_EVENTS = 256   # Events queued per client before it has to resync
+STREAM_HEARTBEAT = 15       # Seconds between keep-alive comments on an idle stream
+
+# CSS for the colour classes of pre-rendered console HTML
+CONSOLE_STYLESHEET = stylesheet()
+
+# Stylesheets and scripts for the web pages
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Dashboard summaries are shared by every poll within this many seconds
+DASHBOARD_TTL = 1.0
+
+# Batch control
+BATCH_ACTIONS = ('command', 'start', 'stop')
+BATCH_REPLY_TIMEOUT = 5     # Seconds a batch request waits for the Qt thread to dispatch it
+BATCH_STEP_TIMEOUT = 300    # Seconds a limited start/stop may take before the next one begins
+# Printed by the server once it has finished starting; matched against the whole message
+# of entries the game itself logged, so chat and plugins cannot mark a start complete
+# [12:00:00] [Server thread/INFO]: Done (3.456s)! For help, type "help"
+READY_MARKER = 'Done ('
+READY_PATTERN = re.compile(r'^Done \([\d.]+s\)!')
+
+# Long-polled status: default and longest wait for a change, in seconds
+STATUS_WAIT_TIMEOUT = 25
+STATUS_WAIT_MAX = 60
+
+# Tick health: Paper servers are asked for their tick rate every TICK_PROBE_INTERVAL
+# seconds; every TICK_CHECK_INTERVAL seconds lag warnings are checked for having expired
+TICK_PROBE_INTERVAL = 60
+TICK_CHECK_INTERVAL = 5
+TICK_PROBE_COMMANDS = b"tps\nmspt\n"
+
+# Server List Ping: failed pings in a row before a server that was ready counts as hung
+PING_HUNG_FAILURES = 3
+
+# QProcess states as reported to the web UI
+PROCESS_STATUS = {
+    QProcess.NotRunning: 'stopped',
+    QProcess.Starting: 'starting',
+    QProcess.Running: 'running',
+}
+
+class ServerState:
+    """Snapshot of one server's process, built on the main thread and never modified.
+    
+    The main thread swaps in a new snapshot whenever the process changes;
+    web threads read whichever snapshot is current without touching Qt.
+    """
+    __slots__ = ('status', 'pid', 'started', 'last_seq', 'version', 'ready', 'exit_code', 'crashed', 'lagging',
+                 'reachable', 'hung')
+    
+    def __init__(self, status='stopped', pid=None, started=None, last_seq=0, version=0, ready=False,
+                 exit_code=None, crashed=False, lagging=False, reachable=False, hung=False):
+        self.status = status
+        self.pid = pid
+        self.started = started  # Epoch seconds the process began running
+        self.last_seq = last_seq  # Console sequence number of the last captured output
+        self.version = version  # Bumped on start, stop, crash, ready, lag and ping changes; not on output
+        self.ready = ready  # Whether the server has finished starting since it was launched
+        self.exit_code = exit_code  # Of the last run, once it has exited
+        self.crashed = crashed  # Whether the last run ended abnormally
+        self.lagging = lagging  # Whether the running server is falling behind, see utils.tickhealth
+        self.reachable = reachable  # Whether the last Server List Ping was answered
+        self.hung = hung  # Ready once, but no longer answering pings though the process runs
+    
+    @property
+    def running(self):
+        return self.status == 'running'
+    
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return ServerState(**values)
+    
+    def to_dict(self):
+        return {
+            'status': self.status,
+            'version': self.version,
+            'ready': self.ready,
+            'started': self.started,
+            'exit_code': self.exit_code,
+            'crashed': self.crashed,
+            'lagging': self.lagging,
+            'reachable': self.reachable,
+            'hung': self.hung,
+        }
+    
+    def __repr__(self):
+        return f"ServerState({self.status}, pid={self.pid}, version={self.version})"
+
+STOPPED = ServerState()
+
+class StateWatch:
+    """Wakes threads and event-loop tasks waiting for a server's state version to change"""
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.async_waiters = set()  # (loop, asyncio.Event)
+    
+    def notify(self):
+        with self.cond:
+            self.cond.notify_all()
+            waiters = list(self.async_waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Loop already closed
+    
+    def wait(self, changed, timeout):
+        """Block until changed() is true or timeout passes; returns changed()"""
+        with self.cond:
+            return self.cond.wait_for(changed, timeout)
+    
+    async def wait_async(self, changed, timeout):
+        """wait() for a coroutine; no thread is held while waiting"""
+        waiter = (asyncio.get_event_loop(), asyncio.Event())
+        with self.cond:
+            if changed():
+                return True
+            self.async_waiters.add(waiter)
+        try:
+            deadline = time.monotonic() + timeout
+            while not changed():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), remaining)
+                except asyncio.TimeoutError:
+                    return changed()
+                waiter[1].clear()
+            return True
+        finally:
+            with self.cond:
+                self.async_waiters.discard(waiter)
+
+class ConsoleBudget:
+    """Byte budget shared by every console buffer"""
+    def __init__(self, max_bytes=CONSOLE_MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.lock = threading.Lock()
+    
+    def charge(self, size):
+        """Account for size bytes and return how far we are over budget"""
+        with self.lock:
+            self.used += size
+            return self.used - self.max_bytes
+    
+    def release(self, size):
+        with self.lock:
+            self.used -= size
+
+class StreamSubscriber:
+    """Bounded queue of events waiting to be sent to one streaming client.
+    
+    Producers never block: when the queue is full further events are dropped
+    and the client is flagged to resync from the console buffer instead.
+    """
+    def __init__(self, max_events=STREAM_QUEUE_EVENTS):
+        self.events = deque()
+        self.max_events = max_events
+        self.overflowed = False
+        self.cond = threading.Condition()
+    
+    def push(self, event):
+        with self.cond:
+            if len(self.events) >= self.max_events:
+                self.overflowed = True
+            else:
+                self.events.append(event)
+            self.cond.notify()
+    
+    def pop_all(self, timeout):
+        """Wait up to timeout seconds and return (events, overflowed)"""
+        with self.cond:
+            if not self.events and not self.overflowed:
+                self.cond.wait(timeout)
+            events = list(self.events)
+            self.events.clear()
+            overflowed = self.overflowed
+            self.overflowed = False
+            return events, overflowed
+
+class AsyncStreamSubscriber:
+    """StreamSubscriber for a client served on an asyncio event loop.
+    
+    push() may be called from any thread; the waiting coroutine is woken
+    through the loop, so no thread is held while the stream is idle.
+    """
+    def __init__(self, loop, max_events=STREAM_QUEUE_EVENTS):
+        self.loop = loop
+        self.events = deque()
+        self.max_events = max_events
+        self.overflowed = False
+        self.lock = threading.Lock()
+        self.ready = asyncio.Event()
+        self.notified = False
+    
+    def push(self, event):
+        with self.lock:
+            if len(self.events) >= self.max_events:
+                self.overflowed = True
+            else:
+                self.events.append(event)
+            if self.notified:
+                return
+            self.notified = True
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            pass  # Loop already closed
+    
+    async def pop_all(self, timeout):
+        """Wait up to timeout seconds and return (events, overflowed)"""
+        if not self.ready.is_set():
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        with self.lock:
+            self.ready.clear()
+            self.notified = False
+            events = list(self.events)
+            self.events.clear()
+            overflowed = self.overflowed
+            self.overflowed = False
+            return events, overflowed
+
+def sse_lines(lines, seq, reset):
+    payload = json.dumps({'lines': lines, 'seq': seq, 'reset': reset})
+    return f"id: {seq}\nevent: lines\ndata: {payload}\n\n"
+
+def sse_status(state):
+    """Status event carrying ServerState.to_dict(), the same fields /api/status/wait returns"""
+    return f"event: status\ndata: {json.dumps(state)}\n\n"
 
 class ConsoleBuffer:
-    def __init__(self, max_lines=100):
-        self.lines = []
+    """Fixed-capacity ring buffer where every line gets a monotonic sequence number.
+    
+    Sequence numbers start at 1, so a reader that has seen nothing asks for
+    lines since 0. Each line is held both as text and as the HTML rendered
+    for it at ingest.
+    """
+    def __init__(self, max_lines=100, budget=None, min_lines=50):
         self.max_lines = max_lines
+        self.budget = budget
+        self.min_lines = min(min_lines, max_lines)
+        self.lines = [None] * max_lines
+        self.html = [None] * max_lines  # Rendered HTML of each line
+        self.meta = [None] * max_lines  # (level rank, thread) of each line, for filtering
+        self.first_seq = 1  # Oldest line still held
+        self.next_seq = 1   # Sequence number the next line will get
+        self.size = 0       # Bytes held by this buffer
         self.lock = threading.Lock()
+        self.subscribers = []  # StreamSubscribers notified of every new line
+    
+    def __len__(self):
+        return self.next_seq - self.first_seq
+    
+    @property
+    def last_seq(self):
+        return self.next_seq - 1
+    
+    def _evict_oldest(self):
+        # Caller holds self.lock
+        slot = self.first_seq % self.max_lines
+        size = len(self.lines[slot]) + len(self.html[slot])
+        self.lines[slot] = None
+        self.html[slot] = None
+        self.meta[slot] = None
+        self.first_seq += 1
+        self.size -= size
+        if self.budget:
+            self.budget.release(size)
+    
+    def add_line(self, line, level=None, thread=None, html=None):
+        """Append a line and return its sequence number"""
+        rank = LEVEL_RANKS.get(level, LEVEL_RANKS['info'])
+        if html is None:
+            html = render_html(line)
+        size = len(line) + len(html)
+        with self.lock:
+            if self.next_seq - self.first_seq >= self.max_lines:
+                self._evict_oldest()
+            seq = self.next_seq
+            self.lines[seq % self.max_lines] = line
+            self.html[seq % self.max_lines] = html
+            self.meta[seq % self.max_lines] = (rank, thread)
+            self.next_seq += 1
+            self.size += size
+            
+            # Shrink our own history while the shared budget is exceeded
+            if self.budget:
+                excess = self.budget.charge(size)
+                while excess > 0 and self.next_seq - self.first_seq > self.min_lines:
+                    before = self.size
+                    self._evict_oldest()
+                    excess -= before - self.size
+            subscribers = self.subscribers
+        
+        for subscriber in subscribers:
+            subscriber.push(('line', seq, line, rank, thread, html))
+        return seq
+    
+    def subscribe(self, subscriber):
+        with self.lock:
+            # Copy on write so add_line can iterate without holding the lock
+            self.subscribers = self.subscribers + [subscriber]
     
-    def add_line(self, line):
+    def unsubscribe(self, subscriber):
         with self.lock:
-            self.lines.append(line)
-            if len(self.lines) > self.max_lines:
-                self.lines.pop(0)
+            self.subscribers = [s for s in self.subscribers if s is not subscriber]
     
-    def get_lines(self):
+    def get_lines(self, as_html=False):
+        column = self.html if as_html else self.lines
         with self.lock:
-            return self.lines.copy()
+            return [column[seq % self.max_lines] for seq in range(self.first_seq, self.next_seq)]
+    
+    def get_since(self, since, min_rank=None, thread=None, as_html=False):
+        """Return (lines, last_seq, reset) for lines newer than since.
+        
+        reset is True when lines after since were already evicted, in which
+        case everything still held is returned and the reader should start over.
+        min_rank and thread optionally restrict the lines returned; as_html
+        returns the rendered HTML instead of the text.
+        """
+        column = self.html if as_html else self.lines
+        with self.lock:
+            start = since + 1
+            reset = start < self.first_seq
+            if reset or since < 0:
+                start = self.first_seq
+            slots = [seq % self.max_lines for seq in range(start, self.next_seq)]
+            if min_rank is not None or thread:
+                slots = [slot for slot in slots if line_matches(self.meta[slot], min_rank, thread)]
+            lines = [column[slot] for slot in slots]
+            return lines, self.next_seq - 1, reset
+
+def line_matches(meta, min_rank, thread):
+    """Check a line's (rank, thread) against optional level and thread filters"""
+    rank, line_thread = meta[:2]
+    if min_rank is not None and rank < min_rank:
+        return False
+    if thread and (not line_thread or line_thread.lower() != thread.lower()):
+        return False
+    return True
+
+class BatchJob:
+    """Operations for many servers, dispatched to the main thread in one queued call"""
+    def __init__(self, operations):
+        self.operations = operations  # [(action, paths, command, parallel), ...]
+        self.results = []
+        self.done = threading.Event()
+    
+    def add_result(self, path, action, success, message):
+        self.results.append({'path': path, 'action': action, 'success': success, 'message': message})
+
+class BatchLane:
+    """Starts or stops of one batch operation that run at most limit at a time"""
+    def __init__(self, action, paths, limit):
+        self.action = action
+        self.pending = deque(paths)
+        self.limit = limit
+        self.active = {}  # Server path -> (deadline, time it began)
+
+class BatchRunner(QObject):
+    """Works through rate-limited starts and stops on the main thread.
+    
+    A start is complete once the server reports it is ready (or exits),
+    a stop once the process has exited; either way the next server in the
+    lane begins after at most BATCH_STEP_TIMEOUT seconds.
+    """
+    def __init__(self, handler):
+        super().__init__(handler)
+        self.handler = handler
+        self.lanes = []
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.advance)
+    
+    def add_lane(self, action, paths, limit):
+        """Queue paths and begin the first limit of them; returns the paths begun now"""
+        lane = BatchLane(action, paths, limit)
+        begun = self._fill(lane)
+        if lane.pending or lane.active:
+            self.lanes.append(lane)
+            if not self.timer.isActive():
+                self.timer.start()
+        return begun
+    
+    def cancel(self, path):
+        """Drop path from queued starts; returns whether it was queued"""
+        cancelled = False
+        for lane in self.lanes:
+            if lane.action == 'start' and path in lane.pending:
+                lane.pending.remove(path)
+                cancelled = True
+        return cancelled
+    
+    def _fill(self, lane):
+        begun = []
+        while lane.pending and len(lane.active) < lane.limit:
+            path = lane.pending.popleft()
+            if self.handler.begin(lane.action, path):
+                now = time.time()
+                lane.active[path] = (now + BATCH_STEP_TIMEOUT, now)
+                begun.append(path)
+        return begun
+    
+    def _finished(self, action, path, began):
+        panel = self.handler.web_manager.profiles.get(path)
+        process = getattr(panel, 'process', None)
+        if not process or process.state() == QProcess.NotRunning:
+            return True
+        if action == 'start':
+            return self.handler.web_manager.ready_at.get(path, 0) >= began
+        return False
+    
+    def advance(self):
+        now = time.time()
+        for lane in self.lanes:
+            for path, (deadline, began) in list(lane.active.items()):
+                if now >= deadline or self._finished(lane.action, path, began):
+                    del lane.active[path]
+            self._fill(lane)
+        self.lanes = [lane for lane in self.lanes if lane.pending or lane.active]
+        if not self.lanes:
+            self.timer.stop()
+
+class TickProbe(QObject):
+    """Keeps each server's lag flag current and asks Paper servers for their tick rate.
+    
+    Runs on the main thread. The tps and mspt commands go straight to the
+    server's stdin, like console commands, without echoing them into the
+    console; their replies are parsed from the output like any other line.
+    """
+    def __init__(self, web_manager):
+        super().__init__()
+        self.web_manager = web_manager
+        self.probed = {}  # Server path -> when it was last sent the probe commands
+        self.timer = QTimer(self)
+        self.timer.setInterval(TICK_CHECK_INTERVAL * 1000)
+        self.timer.timeout.connect(self.check)
+        self.timer.start()
+    
+    def check(self):
+        manager = self.web_manager
+        now = time.time()
+        for server_path, tick in list(manager.tick_health.items()):
+            state = manager.get_state(server_path)
+            if not state.running:
+                self.probed.pop(server_path, None)
+                continue
+            lagging = tick.lagging(now)
+            if lagging != state.lagging:
+                manager.set_state(server_path, state.replace(lagging=lagging))
+            if state.ready and is_paper_profile(server_path) \
+                    and now - self.probed.get(server_path, 0) >= TICK_PROBE_INTERVAL:
+                self.probe(server_path, now)
+    
+    def probe(self, server_path, now):
+        process = getattr(self.web_manager.profiles.get(server_path), 'process', None)
+        if process and process.state() == QProcess.Running:
+            process.write(TICK_PROBE_COMMANDS)
+            self.probed[server_path] = now
+
+class PingRelay(QObject):
+    """Carries each round of ping results from the pinger thread to the main thread"""
+    results = pyqtSignal(object)
 
 class ServerProcessHandler(QObject):
     """Helper class to handle server process commands from web UI thread"""
     start_server_signal = pyqtSignal(str)  # Signal to start server - sends server path
     stop_server_signal = pyqtSignal(str)   # Signal to stop server - sends server path
     send_command_signal = pyqtSignal(str, str)  # Signal to send command - (server path, command)
+    batch_signal = pyqtSignal(object)  # Signal to run a BatchJob
     
     def __init__(self, web_manager):
         super().__init__()
         self.web_manager = web_manager
+        self.batch_runner = BatchRunner(self)
+        
+        # Emit times of signals not yet delivered; queued events arrive in the order they were posted
+        self.dispatch_times = deque()
+        self.dispatch_lock = threading.Lock()
+        for signal in (self.start_server_signal, self.stop_server_signal,
+                       self.send_command_signal, self.batch_signal):
+            signal.connect(self._dispatched, type=Qt.QueuedConnection)
+    
+    def dispatch(self, name, signal, *args):
+        """Emit signal from a web thread, timing how long it waits for the main thread"""
+        with self.dispatch_lock:
+            self.dispatch_times.append((name, time.perf_counter()))
+            signal.emit(*args)
+    
+    @pyqtSlot()
+    def _dispatched(self):
+        name, emitted = self.dispatch_times.popleft()
+        self.web_manager.dispatch_latency.labels(name).observe(time.perf_counter() - emitted)
+    
+    def is_running(self, server_path):
+        panel = self.web_manager.profiles.get(server_path)
+        process = getattr(panel, 'process', None)
+        return bool(process) and process.state() != QProcess.NotRunning
+    
+    def begin(self, action, server_path):
+        """Start or stop one server as part of a batch"""
+        if action == 'start':
+            return not self.is_running(server_path) and self.start_server(server_path)
+        return self.stop_server(server_path)
+    
+    @pyqtSlot(object)
+    def run_batch(self, job):
+        """Run a BatchJob in main thread and record a result per server"""
+        try:
+            for action, paths, command, parallel in job.operations:
+                if action == 'command':
+                    for path in paths:
+                        sent = self.send_command(path, command)
+                        job.add_result(path, action, sent, 'Command sent' if sent else 'Server not running')
+                    continue
+                
+                if action == 'start':
+                    # Already running servers are reported rather than queued
+                    running = [path for path in paths if self.is_running(path)]
+                    for path in running:
+                        job.add_result(path, action, False, 'Server already running')
+                    paths = [path for path in paths if path not in running]
+                elif action == 'stop':
+                    # A stop overrides a start that has not begun yet
+                    for path in [path for path in paths if self.batch_runner.cancel(path)]:
+                        job.add_result(path, action, True, 'Queued start cancelled')
+                        paths.remove(path)
+                
+                if parallel:
+                    begun = set(self.batch_runner.add_lane(action, paths, parallel))
+                    for path in paths:
+                        if path in begun:
+                            job.add_result(path, action, True, f'{action.capitalize()} requested')
+                        elif self.batch_runner.lanes and path in self.batch_runner.lanes[-1].pending:
+                            job.add_result(path, action, True, 'Queued')
+                        else:
+                            job.add_result(path, action, False, f'Could not {action} server')
+                else:
+                    for path in paths:
+                        ok = self.begin(action, path)
+                        job.add_result(path, action, ok, f'{action.capitalize()} requested' if ok
+                                       else ('Server not running' if action == 'stop' else 'Could not start server'))
+        except Exception as e:
+            logger.exception("Error in run_batch: %s", e)
+        finally:
+            job.done.set()
     
     @pyqtSlot(str)
     def start_server(self, server_path):
         """Start server in main thread"""
         try:
-            print(f"Starting server via WebUI for path: {server_path}")
+            logger.info("Starting server via WebUI for path: %s", server_path)
             if server_path in self.web_manager.profiles:
                 control_panel = self.web_manager.profiles[server_path]
                 if hasattr(control_panel, 'toggle_server'):
@@ -46,29 +616,27 @@ class ServerProcessHandler(QObject):
                     # Start the server
                     success = control_panel.toggle_server()
                     self.web_manager.console_buffers[server_path].add_line("Server starting...")
-                    print(f"Server start result: {success}")
+                    logger.debug("Server start result: %s", success)
                     return True
                 else:
-                    print(f"Control panel missing toggle_server method for {server_path}")
+                    logger.warning("Control panel missing toggle_server method for %s", server_path)
             else:
-                print(f"Server path {server_path} not found in profiles")
+                logger.warning("Server path %s not found in profiles", server_path)
             return False
         except Exception as e:
-            print(f"Error in start_server: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in start_server: %s", e)
             return False
     
     @pyqtSlot(str)
     def stop_server(self, server_path):
         """Stop server in main thread"""
         try:
-            print(f"Stopping server via WebUI for path: {server_path}")
+            logger.info("Stopping server via WebUI for path: %s", server_path)
             if server_path in self.web_manager.profiles:
                 control_panel = self.web_manager.profiles[server_path]
                 if hasattr(control_panel, 'process') and control_panel.process:
                     if control_panel.process.state() == QProcess.Running:
-                        print(f"Sending stop command to process")
+                        logger.debug("Sending stop command to process")
                         control_panel.process.write(b"stop\n")
                         self.web_manager.console_buffers[server_path].add_line("Server stopping...")
                         
@@ -77,42 +645,38 @@ class ServerProcessHandler(QObject):
                         
                         return True
                     else:
-                        print(f"Process not running for {server_path}")
+                        logger.warning("Process not running for %s", server_path)
                 else:
-                    print(f"Process not available for {server_path}")
+                    logger.warning("Process not available for %s", server_path)
             else:
-                print(f"Server path {server_path} not found in profiles")
+                logger.warning("Server path %s not found in profiles", server_path)
             return False
         except Exception as e:
-            print(f"Error in stop_server: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in stop_server: %s", e)
             return False
     
     @pyqtSlot(str, str)
     def send_command(self, server_path, command):
         """Send command to server in main thread"""
         try:
-            print(f"Sending command via WebUI for path: {server_path}, command: {command}")
+            logger.info("Sending command via WebUI for path: %s, command: %s", server_path, command)
             if server_path in self.web_manager.profiles:
                 control_panel = self.web_manager.profiles[server_path]
                 if hasattr(control_panel, 'process') and control_panel.process:
                     if control_panel.process.state() == QProcess.Running:
-                        print(f"Sending command to process")
+                        logger.debug("Sending command to process")
                         control_panel.process.write(f"{command}\n".encode('utf-8'))
                         self.web_manager.console_buffers[server_path].add_line(f"> {command}")
                         return True
                     else:
-                        print(f"Process not running for {server_path}")
+                        logger.warning("Process not running for %s", server_path)
                 else:
-                    print(f"Process not available for {server_path}")
+                    logger.warning("Process not available for %s", server_path)
             else:
-                print(f"Server path {server_path} not found in profiles")
+                logger.warning("Server path %s not found in profiles", server_path)
             return False
         except Exception as e:
-            print(f"Error in send_command: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in send_command: %s", e)
             return False
 
 class WebUIManager:
@@ -120,556 +684,604 @@ class WebUIManager:
     def __init__(self):
         self.app = None
         self.thread = None
+        self.server = None  # Serving backend, see utils.serving
+        self.settings = load_settings()  # Bind address and serving options from webui.json
         self.running = False
         self.profiles = {}  # Dictionary of server paths to ServerControlPanel objects
         self.console_buffers = {}  # Dictionary of server paths to console buffers
+        self.console_budget = ConsoleBudget(CONSOLE_MEMORY_BUDGET)
+        self.states = {}  # Dictionary of server paths to ServerState snapshots, replaced by the main thread
+        self.state_watches = {}  # Dictionary of server paths to StateWatch for long-polling clients
+        self.console_logs = {}  # Dictionary of server paths to on-disk console logs
+        self.output_tracer = OutputTracer(logging.getLogger(__name__ + '.output'))
+        self.ready_at = {}  # Dictionary of server paths to when the server last reported it had started
+        self.dashboard_cache = None  # (built at, body, etag)
+        self.dashboard_lock = threading.Lock()
+        self.sampler = ProcessSampler(self.sample_targets)  # Resource usage of every running server
+        self.histories = {}  # Dictionary of server paths to TimeSeriesStore of their metrics
+        self.history_saved = time.monotonic()
+        self.sampler.subscribe(self.record_samples)
+        self.tick_health = {}  # Dictionary of server paths to TickHealth parsed from their output
+        self.players = {}  # Dictionary of server paths to PlayerTracker of who is and was online
+        self.pinger = ServerPinger(self.ping_targets)  # Server List Ping of every running server
+        self.pinger.subscribe(self.record_pings)
+        self.setup_metrics()
         
         # Create process handler to run operations in main thread
         self.process_handler = ServerProcessHandler(self)
+        self.tick_probe = TickProbe(self)
+        self.ping_relay = PingRelay()
+        self.ping_relay.results.connect(self.apply_pings, type=Qt.QueuedConnection)
         
     def add_server_profile(self, server_path, control_panel):
         """Register a server profile with the web UI"""
-        print(f"Adding server profile for {server_path}")
+        logger.debug("Adding server profile for %s", server_path)
         self.profiles[server_path] = control_panel
-        self.console_buffers[server_path] = ConsoleBuffer(500)
+        # Keep the existing buffer so sequence numbers stay monotonic for readers
+        if server_path not in self.console_buffers:
+            self.console_buffers[server_path] = ConsoleBuffer(CONSOLE_BUFFER_LINES, budget=self.console_budget)
+        if server_path not in self.console_logs:
+            try:
+                self.console_logs[server_path] = ConsoleLog(os.path.join(server_path, CONSOLE_LOG_DIR))
+            except OSError as e:
+                logger.warning("Console history disabled for %s: %s", server_path, e)
+        if server_path not in self.histories:
+            history_dir = os.path.join(server_path, CONSOLE_LOG_DIR)
+            self.histories[server_path] = TimeSeriesStore(
+                os.path.join(history_dir, HISTORY_FILE) if os.path.isdir(history_dir) else None)
+        if server_path not in self.tick_health:
+            self.tick_health[server_path] = TickHealth()
+        if server_path not in self.players:
+            console_log = self.console_logs.get(server_path)
+            tracker = self.players[server_path] = PlayerTracker(
+                os.path.join(console_log.directory, PLAYERS_FILE) if console_log else None)
+            if console_log:
+                # Read whatever was logged after the last save, in the background
+                tracker.catch_up(console_log, time.time())
+            process = getattr(control_panel, 'process', None)
+            if not process or process.state() == QProcess.NotRunning:
+                tracker.server_stopped()  # Whoever the log left online was disconnected when it stopped
         
-        # Connect signals for console output
+        # Track state changes for web readers and streaming clients (once per process object)
         if hasattr(control_panel, 'process') and control_panel.process:
-            print(f"Connecting process signals for {server_path}")
-            
-            # Disconnect any existing connections to avoid duplicates
-            try:
-                control_panel.process.readyReadStandardOutput.disconnect()
-                control_panel.process.readyReadStandardOutput.connect(
-                    lambda: self.capture_stdout(server_path)
-                )
-            except:
-                # Connect if not already connected
-                control_panel.process.readyReadStandardOutput.connect(
-                    lambda: self.capture_stdout(server_path)
-                )
-                
-            try:
-                control_panel.process.readyReadStandardError.disconnect()
-                control_panel.process.readyReadStandardError.connect(
-                    lambda: self.capture_stderr(server_path)
-                )
-            except:
-                # Connect if not already connected
-                control_panel.process.readyReadStandardError.connect(
-                    lambda: self.capture_stderr(server_path)
+            process = control_panel.process
+            if not getattr(process, '_webui_status_hooked', False):
+                process._webui_status_hooked = True
+                process.stateChanged.connect(
+                    lambda state: self.update_state(server_path, process, state)
                 )
+            self.update_state(server_path, process, process.state())
+        
+        # Subscribe to the panel's output hub; re-registering replaces the old subscriptions.
+        # The web console stays on the main thread because it swaps ServerState snapshots;
+        # the on-disk log only queues lines, so it gets its own thread and bounded queue.
+        if hasattr(control_panel, 'output_hub'):
+            logger.debug("Subscribing to process output for %s", server_path)
+            control_panel.output_hub.subscribe(
+                'web-console', lambda lines: self.capture_output(server_path, lines)
+            )
+            control_panel.output_hub.subscribe(
+                'console-log', lambda lines: self.log_output(server_path, lines), threaded=True
+            )
         else:
-            print(f"Process not available for {server_path}, will connect when server starts")
+            logger.warning("Output hub not available for %s", server_path)
     
-    def capture_stdout(self, server_path):
-        """Capture stdout from server process"""
-        if server_path in self.profiles:
-            control_panel = self.profiles[server_path]
-            if hasattr(control_panel, 'process') and control_panel.process:
-                try:
-                    data = control_panel.process.readAllStandardOutput().data().decode('utf-8', errors='replace')
-                    for line in data.splitlines():
-                        if line.strip():
-                            self.console_buffers[server_path].add_line(line)
-                            print(f"Captured stdout for {server_path}: {line}")
-                except Exception as e:
-                    print(f"Error capturing stdout: {str(e)}")
-
-    def capture_stderr(self, server_path):
-        """Capture stderr from server process"""
-        if server_path in self.profiles:
-            control_panel = self.profiles[server_path]
-            if hasattr(control_panel, 'process') and control_panel.process:
+    def setup_metrics(self):
+        """Create the manager's metrics; most are read from existing state when scraped"""
+        metrics = self.metrics = Registry()
+        self.request_count = metrics.counter(
+            'mcmgr_http_requests_total', 'Web UI requests served', ('route', 'method', 'status'))
+        self.request_latency = metrics.histogram(
+            'mcmgr_http_request_duration_seconds',
+            'Time to produce a response; for streams, until the response starts', ('route',))
+        self.rate_limited = metrics.counter(
+            'mcmgr_http_rate_limited_total', 'Requests refused with 429 Too Many Requests', ('route',))
+        self.dispatch_latency = metrics.histogram(
+            'mcmgr_qt_dispatch_seconds', 'Time from a web request emitting a signal until the Qt thread runs it',
+            ('signal',))
+        
+        def hubs():
+            for path, panel in list(self.profiles.items()):
+                hub = getattr(panel, 'output_hub', None)
+                if hub is not None:
+                    yield path, hub
+        
+        def buffers():
+            return list(self.console_buffers.items())
+        
+        metrics.callback('mcmgr_console_lines_total', 'Process output lines ingested',
+                         lambda: [((path,), hub.lines_published) for path, hub in hubs()], ('server',), 'counter')
+        metrics.callback('mcmgr_console_bytes_total', 'Process output bytes read',
+                         lambda: [((path,), hub.bytes_read) for path, hub in hubs()], ('server',), 'counter')
+        metrics.callback('mcmgr_output_queue_lines', 'Lines waiting for an output subscriber',
+                         lambda: [((path, name), len(subscriber.pending)) for path, hub in hubs()
+                                  for name, subscriber in hub.subscribers.items()], ('server', 'subscriber'))
+        metrics.callback('mcmgr_output_dropped_lines_total', 'Lines an output subscriber could not keep up with',
+                         lambda: [((path, name), subscriber.dropped) for path, hub in hubs()
+                                  for name, subscriber in hub.subscribers.items()], ('server', 'subscriber'),
+                         'counter')
+        metrics.callback('mcmgr_console_buffer_lines', 'Lines held in the web console buffer',
+                         lambda: [((path,), len(buffer)) for path, buffer in buffers()], ('server',))
+        metrics.callback('mcmgr_console_buffer_bytes', 'Bytes held in the web console buffer',
+                         lambda: [((path,), buffer.size) for path, buffer in buffers()], ('server',))
+        metrics.callback('mcmgr_console_budget_bytes', 'Bytes used of the budget shared by all console buffers',
+                         lambda: self.console_budget.used)
+        metrics.callback('mcmgr_stream_clients', 'Open console streams',
+                         lambda: [((path,), len(buffer.subscribers)) for path, buffer in buffers()], ('server',))
+        metrics.callback('mcmgr_stream_queue_events', 'Events waiting to be sent to console streams',
+                         lambda: [((path,), sum(len(subscriber.events) for subscriber in list(buffer.subscribers)))
+                                  for path, buffer in buffers()], ('server',))
+        metrics.callback('mcmgr_log_queue_records', 'Log records waiting to be written', queue_depth)
+        metrics.callback('mcmgr_http_connections', 'Web UI connections by state',
+                         lambda: [((state,), count) for state, count in
+                                  (self.server.stats() if self.server else {}).items()], ('state',))
+        metrics.callback('mcmgr_dispatch_pending', 'Signals waiting for the Qt thread',
+                         lambda: len(self.process_handler.dispatch_times))
+        
+        def sampled(field):
+            return lambda: [((path,), getattr(sample, field)) for path, sample in self.sampler.samples.items()
+                            if getattr(sample, field) is not None]
+        
+        metrics.callback('mcmgr_process_up', 'Whether the server process is running',
+                         lambda: [((path,), int(self.get_state(path).running)) for path in list(self.profiles)],
+                         ('server',))
+        metrics.callback('mcmgr_process_cpu_percent', 'Server process CPU usage, percent of one core',
+                         sampled('cpu'), ('server',))
+        metrics.callback('mcmgr_process_resident_bytes', 'Server process resident memory',
+                         sampled('rss'), ('server',))
+        metrics.callback('mcmgr_process_threads', 'Server process threads', sampled('threads'), ('server',))
+        metrics.callback('mcmgr_process_open_fds', 'Server process open file descriptors or handles',
+                         sampled('fds'), ('server',))
+        metrics.callback('mcmgr_process_read_bytes_total', 'Server process disk reads',
+                         sampled('read_bytes'), ('server',), 'counter')
+        metrics.callback('mcmgr_process_write_bytes_total', 'Server process disk writes',
+                         sampled('write_bytes'), ('server',), 'counter')
+        
+        def ticks(field):
+            return lambda: [((path,), getattr(tick, field)) for path, tick in list(self.tick_health.items())
+                            if getattr(tick, field) is not None and self.get_state(path).running]
+        
+        metrics.callback('mcmgr_server_tps', 'Ticks per second over the last minute, from the tps command',
+                         ticks('tps'), ('server',))
+        metrics.callback('mcmgr_server_mspt', 'Milliseconds per tick over the last minute, from the mspt command',
+                         ticks('mspt'), ('server',))
+        metrics.callback('mcmgr_server_ticks_behind_total', "Ticks skipped according to \"Can't keep up!\" warnings",
+                         lambda: [((path,), tick.behind_ticks_total) for path, tick in list(self.tick_health.items())],
+                         ('server',), 'counter')
+        metrics.callback('mcmgr_server_players', 'Players online',
+                         lambda: [((path,), tracker.count()) for path, tracker in list(self.players.items())],
+                         ('server',))
+        metrics.callback('mcmgr_server_reachable', 'Whether the server answered its last Server List Ping',
+                         lambda: [((path,), int(result.online)) for path, result in self.pinger.results.items()],
+                         ('server',))
+        metrics.callback('mcmgr_server_ping_seconds', 'Server List Ping round trip',
+                         lambda: [((path,), result.latency / 1000) for path, result in self.pinger.results.items()
+                                  if result.latency is not None], ('server',))
+        metrics.callback('mcmgr_server_lagging', 'Whether the server is falling behind',
+                         lambda: [((path,), int(self.get_state(path).lagging)) for path in list(self.profiles)],
+                         ('server',))
+    
+    def sample_targets(self):
+        """{server path: pid} of every running server, for the sampler"""
+        return {path: state.pid for path, state in list(self.states.items()) if state.running and state.pid}
+    
+    def record_samples(self, samples):
+        """Add each server's sample to its metric history; called on the sampler thread"""
+        for path, sample in samples.items():
+            history = self.histories.get(path)
+            if history is not None:
+                history.add(sample.time, {
+                    'cpu': sample.cpu,
+                    'memory': sample.rss / 1024 / 1024,
+                    'threads': sample.threads,
+                    'fds': sample.fds,
+                    'players': self.players[path].count() if path in self.players else None,
+                })
+        if time.monotonic() - self.history_saved >= HISTORY_SAVE_INTERVAL:
+            self.history_saved = time.monotonic()
+            self.save_histories()
+    
+    def ping_targets(self):
+        """{server path: (host, port)} of every running server, for the pinger"""
+        return {path: read_server_address(path) for path, state in list(self.states.items()) if state.running}
+    
+    def record_pings(self, results):
+        """Add ping latency to the metric history and pass the results to the main thread; called on the pinger thread"""
+        for path, result in results.items():
+            history = self.histories.get(path)
+            if history is not None and result.latency is not None:
+                history.add(result.time, {'ping': result.latency})
+        self.ping_relay.results.emit(results)
+    
+    def apply_pings(self, results):
+        """Update reachable, ready and hung from ping results; called on the main thread"""
+        for path, result in results.items():
+            state = self.get_state(path)
+            if not state.running or result.time < state.started:
+                continue  # From a run that has ended
+            changes = {}
+            if result.online != state.reachable:
+                changes['reachable'] = result.online
+            if result.online and not state.ready:
+                # Accepting connections is the surest sign it has finished starting
+                changes['ready'] = True
+                self.ready_at[path] = result.time
+            if result.online:
+                hung = False
+            else:
+                hung = state.hung or (state.ready and result.failures >= PING_HUNG_FAILURES)
+            if hung != state.hung:
+                changes['hung'] = hung
+            if changes:
+                self.set_state(path, state.replace(**changes))
+    
+    def save_histories(self):
+        """Save the metric history and player sessions of every profile"""
+        for history in list(self.histories.values()):
+            history.save()
+        for tracker in list(self.players.values()):
+            tracker.save()
+    
+    def update_state(self, server_path, process, state):
+        """Publish a new ServerState for a process state change; called on the main thread"""
+        current = self.states.get(server_path, STOPPED)
+        status = PROCESS_STATUS.get(state, 'stopped')
+        if status == current.status:
+            return
+        if status == 'running':
+            pid = process.processId() or None
+            self.set_state(server_path, current.replace(status=status, pid=pid, started=time.time(), ready=False))
+        elif status == 'starting':
+            self.set_state(server_path, current.replace(status=status, pid=None, started=None, ready=False,
+                                                        exit_code=None, crashed=False, lagging=False,
+                                                        reachable=False, hung=False))
+        else:
+            # Qt has the exit code and status by the time it reports NotRunning
+            exit_code = crashed = None
+            if current.running:
                 try:
-                    data = control_panel.process.readAllStandardError().data().decode('utf-8', errors='replace')
-                    for line in data.splitlines():
-                        if line.strip():
-                            self.console_buffers[server_path].add_line(f"[ERROR] {line}")
-                            print(f"Captured stderr for {server_path}: {line}")
-                except Exception as e:
-                    print(f"Error capturing stderr: {str(e)}")
+                    exit_code = process.exitCode()
+                    crashed = process.exitStatus() == QProcess.CrashExit or exit_code != 0
+                except RuntimeError:
+                    pass  # The process object is being destroyed, e.g. at exit
+            if server_path in self.tick_health:
+                self.tick_health[server_path].reset()  # Readings of this run no longer apply
+            if server_path in self.players:
+                self.players[server_path].server_stopped(time.time())
+            self.set_state(server_path, current.replace(status=status, pid=None, started=None, ready=False,
+                                                        exit_code=exit_code, crashed=bool(crashed), lagging=False,
+                                                        reachable=False, hung=False))
+    
+    def set_state(self, server_path, state, notify=True):
+        """Swap in a new snapshot; notify bumps its version and wakes long-polling clients"""
+        if notify:
+            state = state.replace(version=self.get_state(server_path).version + 1)
+        self.states[server_path] = state
+        if notify:
+            self.get_watch(server_path).notify()
+            self.publish_status(server_path, state)
+    
+    def get_state(self, server_path):
+        """Current ServerState of a profile; safe from any thread"""
+        return self.states.get(server_path, STOPPED)
+    
+    def get_watch(self, server_path):
+        watch = self.state_watches.get(server_path)
+        if watch is None:
+            watch = self.state_watches.setdefault(server_path, StateWatch())
+        return watch
+    
+    def log_output(self, server_path, lines):
+        """Queue captured process lines for the on-disk console history; called on the subscriber's thread"""
+        console_log = self.console_logs.get(server_path)
+        if console_log:
+            for line in lines:
+                console_log.append(line.text, line.stream, line.timestamp, line.level)
+    
+    def get_usage(self, server_path):
+        """Return (status, latest ProcessSample or None) for a profile; never touches the process"""
+        state = self.get_state(server_path)
+        if state.status == 'stopped':
+            return 'stopped', None
+        if not state.pid:
+            return 'starting', None
+        sample = self.sampler.get(server_path)
+        if sample is not None and sample.pid != state.pid:
+            sample = None  # From an earlier run
+        return 'running', sample
+    
+    def server_summary(self, server_path):
+        """Name, state and resource usage of one profile for the dashboard"""
+        summary = {
+            'path': server_path,
+            'name': os.path.basename(server_path),
+            'status': 'stopped',
+            'cpu': None,
+            'memory': None,
+            'players': None,
+            'tps': None,
+            'lagging': False,
+            'reachable': False,
+            'hung': False,
+            'max_players': None,
+            'started': None,
+            'uptime': None,
+        }
+        summary['status'], sample = self.get_usage(server_path)
+        if summary['status'] == 'running':
+            state = self.get_state(server_path)
+            summary['started'] = round(state.started)
+            summary['uptime'] = int(time.time() - summary['started']) // 60 * 60
+            summary['lagging'] = state.lagging
+            summary['reachable'] = state.reachable
+            summary['hung'] = state.hung
+            if server_path in self.players:
+                summary['players'] = self.players[server_path].count()
+            ping = self.pinger.get(server_path)
+            if ping is not None and ping.online:
+                summary['max_players'] = ping.players_max
+            tick = self.tick_health.get(server_path)
+            if tick is not None and tick.tps is not None:
+                summary['tps'] = round(tick.tps, 1)
+        if sample:
+            # Rounded so idle servers keep producing the same ETag
+            summary['cpu'] = round(sample.cpu) if sample.cpu is not None else None
+            summary['memory'] = round(sample.rss / 1024 / 1024)
+        return summary
+    
+    def dashboard(self):
+        """Return (JSON body, ETag) summarising every profile.
+        
+        Built at most once per DASHBOARD_TTL however many clients poll.
+        """
+        with self.dashboard_lock:
+            now = time.monotonic()
+            if self.dashboard_cache and now - self.dashboard_cache[0] < DASHBOARD_TTL:
+                return self.dashboard_cache[1:]
+            servers = [self.server_summary(path) for path in list(self.profiles)]
+            body = json.dumps({'servers': servers}, separators=(',', ':')).encode('utf-8')
+            etag = hashlib.sha1(body).hexdigest()[:20]
+            self.dashboard_cache = (now, body, etag)
+            return body, etag
+    
+    def publish_status(self, server_path, state):
+        """Push a new state version to streaming clients"""
+        buffer = self.console_buffers.get(server_path)
+        if buffer is not None:
+            status = state.to_dict()
+            for subscriber in buffer.subscribers:
+                subscriber.push(('status', status))
+    
+    def stream_console(self, server_path, since, min_rank=None, thread=None, as_html=False):
+        """Generate Server-Sent Events with console lines and status changes.
+        
+        Each 'lines' event carries the sequence number of its last line as the
+        event id, so a reconnecting EventSource resumes where it stopped.
+        """
+        buffer = self.console_buffers[server_path]
+        subscriber = StreamSubscriber()
+        # Subscribe before the first read so no line falls between the two
+        buffer.subscribe(subscriber)
+        try:
+            chunk, last_seq = self._stream_start(buffer, server_path, since, min_rank, thread, as_html)
+            yield chunk
+            while True:
+                events, overflowed = subscriber.pop_all(STREAM_HEARTBEAT)
+                chunk, last_seq, closing = self._stream_step(buffer, events, overflowed, last_seq,
+                                                             min_rank, thread, as_html)
+                yield chunk
+                if closing or not self.running:
+                    # The web UI is shutting down; the browser will reconnect later
+                    return
+        finally:
+            buffer.unsubscribe(subscriber)
+    
+    async def stream_console_async(self, server_path, since, min_rank=None, thread=None, as_html=False):
+        """stream_console for the asyncio server; waits on the event loop instead of a thread"""
+        buffer = self.console_buffers[server_path]
+        subscriber = AsyncStreamSubscriber(asyncio.get_event_loop())
+        buffer.subscribe(subscriber)
+        try:
+            chunk, last_seq = self._stream_start(buffer, server_path, since, min_rank, thread, as_html)
+            yield chunk
+            while True:
+                events, overflowed = await subscriber.pop_all(STREAM_HEARTBEAT)
+                chunk, last_seq, closing = self._stream_step(buffer, events, overflowed, last_seq,
+                                                             min_rank, thread, as_html)
+                yield chunk
+                if closing or not self.running:
+                    return
+        finally:
+            buffer.unsubscribe(subscriber)
+    
+    def _stream_start(self, buffer, server_path, since, min_rank, thread, as_html):
+        """Return (first chunk, last seq) of a console stream"""
+        lines, last_seq, reset = buffer.get_since(since, min_rank, thread, as_html)
+        chunk = ("retry: 2000\n\n"
+                 + sse_status(self.get_state(server_path).to_dict())
+                 + sse_lines(lines, last_seq, reset))
+        return chunk, last_seq
+    
+    def _stream_step(self, buffer, events, overflowed, last_seq, min_rank, thread, as_html):
+        """Turn queued subscriber events into (chunk, last seq, closing)"""
+        if not events and not overflowed:
+            return ": ping\n\n", last_seq, False
+        
+        chunks = []
+        new_lines = []
+        closing = False
+        for event in events:
+            if event[0] == 'close':
+                closing = True
+            elif event[0] == 'status':
+                chunks.append(sse_status(event[1]))
+            elif event[1] > last_seq:
+                if line_matches(event[3:], min_rank, thread):
+                    new_lines.append(event[5] if as_html else event[2])
+                last_seq = event[1]
+        
+        if overflowed:
+            # The client fell behind; catch up from the ring buffer
+            lines, seq, reset = buffer.get_since(last_seq, min_rank, thread, as_html)
+            chunks.append(sse_lines(new_lines + lines, seq, reset))
+            last_seq = seq
+        elif new_lines:
+            chunks.append(sse_lines(new_lines, last_seq, False))
+        return ''.join(chunks), last_seq, closing
+    
+    async def console_stream_route(self, request):
+        """Native asyncio version of /api/console/stream"""
+        server_path = request.arg('path')
+        if not server_path or server_path not in self.console_buffers:
+            return AsyncResponse(json.dumps({'error': 'Invalid server path'}), 404)
+        
+        # EventSource sends Last-Event-ID when it reconnects
+        since = request.header('Last-Event-ID')
+        since = int(since) if since and since.isdigit() else request.arg('since', 0, type=int)
+        min_rank = level_rank(request.arg('level'))
+        thread = request.arg('thread') or None
+        as_html = request.arg('format') == 'html'
+        return StreamResponse(
+            self.stream_console_async(server_path, since, min_rank, thread, as_html),
+            headers=[('Cache-Control', 'no-cache'), ('X-Accel-Buffering', 'no')]
+        )
+    
+    def status_changed(self, server_path, version):
+        # Shutting down also ends the wait, so no request outlives the server
+        return lambda: not self.running or self.get_state(server_path).version != version
+    
+    def status_reply(self, server_path, version):
+        state = self.get_state(server_path)
+        reply = dict(state.to_dict(), changed=state.version != version)
+        if server_path in self.tick_health:
+            reply['tick'] = self.tick_health[server_path].to_dict()
+        ping = self.pinger.get(server_path)
+        if ping is not None and state.running:
+            reply['ping'] = ping.to_dict()
+        return reply
+    
+    async def status_wait_route(self, request):
+        """Native asyncio version of /api/status/wait"""
+        server_path = request.arg('path')
+        if not server_path or server_path not in self.profiles:
+            return AsyncResponse(json.dumps({'status': 'error', 'message': 'Invalid server path'}), 404)
+        retry_after = self.rate_limiter.check(request.remote_addr, '/api/status/wait')
+        if retry_after:
+            self.rate_limited.labels('/api/status/wait').inc()
+            return AsyncResponse(json.dumps({'success': False, 'error': 'Too many requests', 'retry_after': retry_after}),
+                                 429, headers=[('Retry-After', str(retry_after))])
+        version = request.arg('version', type=int)
+        timeout = max(0, min(request.arg('timeout', STATUS_WAIT_TIMEOUT, type=float), STATUS_WAIT_MAX))
+        if version is not None:
+            await self.get_watch(server_path).wait_async(self.status_changed(server_path, version), timeout)
+        return AsyncResponse(json.dumps(self.status_reply(server_path, version)),
+                             headers=[('Cache-Control', 'no-store')])
+    
+    def timed_route(self, route, handler):
+        """Wrap a native async handler so it is counted like the Flask routes"""
+        async def timed(request):
+            started = time.perf_counter()
+            response = await handler(request)
+            self.request_latency.labels(route).observe(time.perf_counter() - started)
+            self.request_count.labels(route, request.method, str(response.status)).inc()
+            return response
+        return timed
+    
+    def async_routes(self):
+        """Endpoints the asyncio server runs on its event loop instead of through Flask"""
+        return {
+            '/api/console/stream': self.timed_route('/api/console/stream', self.console_stream_route),
+            '/api/status/wait': self.timed_route('/api/status/wait', self.status_wait_route),
+        }
+    
+    def capture_output(self, server_path, lines):
+        """Add captured process lines to the web console buffer; read tick health and players from them"""
+        buffer = self.console_buffers.get(server_path)
+        if buffer is not None:
+            for line in lines:
+                # Reuse the HTML rendered once at ingest
+                if line.is_error:
+                    buffer.add_line(f"[ERROR] {line.text}", line.level, line.thread, error_html(line.html))
+                else:
+                    buffer.add_line(line.text, line.level, line.thread, line.html)
+                if READY_MARKER in line.text:
+                    entry = match_line(line.text)
+                    if is_game_entry(entry) and READY_PATTERN.match(entry.message):
+                        self.ready_at[server_path] = line.timestamp
+            state = self.get_state(server_path)
+            changes = {'last_seq': buffer.last_seq}
+            if server_path in self.ready_at and not state.ready and state.running \
+                    and self.ready_at[server_path] >= state.started:
+                changes['ready'] = True
+            tick = self.tick_health.get(server_path)
+            if tick is not None:
+                readings = tick.feed(lines)
+                if readings and server_path in self.histories:
+                    self.histories[server_path].add(lines[-1].timestamp, readings)
+                lagging = state.running and tick.lagging()
+                if lagging != state.lagging:
+                    changes['lagging'] = lagging
+            if server_path in self.players:
+                self.players[server_path].feed(lines)
+            # Only ready and lag changes wake long-polling clients, not every line
+            self.set_state(server_path, state.replace(**changes), notify=len(changes) > 1)
+        self.output_tracer.trace(server_path, lines)
 
     def setup_app(self):
-        # Create Flask app
-        app = Flask(__name__)
+        # Create Flask app; static files are served by our own fingerprinted route
+        app = Flask(__name__, static_folder=None)
+        assets = StaticAssets(STATIC_DIR)
+        assets.add('css/console.css', CONSOLE_STYLESHEET)
+        app.jinja_env.globals['asset_url'] = assets.url
+        
+        self.rate_limiter = RateLimiter(self.settings['rate_limits'])
+        self.coalescer = CoalescingCache(self.settings['coalesce_window'])
+        
+        @app.before_request
+        def start_timer():
+            g.request_started = time.perf_counter()
+        
+        @app.before_request
+        def limit_rate():
+            # A forgotten tab or a runaway script gets told to back off instead of served
+            if request.url_rule is None:
+                return None
+            route = request.url_rule.rule
+            retry_after = self.rate_limiter.check(request.remote_addr, route)
+            if not retry_after:
+                return None
+            self.rate_limited.labels(route).inc()
+            response = jsonify({'success': False, 'error': 'Too many requests', 'retry_after': retry_after})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        
+        # Registered first so it runs last, after compression
+        @app.after_request
+        def record_request(response):
+            started = g.get('request_started')
+            if started is not None:
+                route = request.url_rule.rule if request.url_rule else 'unmatched'
+                self.request_latency.labels(route).observe(time.perf_counter() - started)
+                self.request_count.labels(route, request.method, str(response.status_code)).inc()
+            return response
+        
+        @app.after_request
+        def compress(response):
+            # Console and config JSON shrinks several times over on slow links
+            return compress_response(response, request.accept_encodings)
+        
+        def render_page(template, **context):
+            # Pages are small and only change with their assets, so revisits get a 304
+            response = app.make_response(render_template(template, **context))
+            response.add_etag()
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
         
         @app.route('/')
         def home():
             """Show list of server profiles"""
-            return """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Minecraft Server Manager</title>
-                <style>
-                    /* Modern UI Theme with Minecraft Inspiration */
-                    :root {
-                        --primary: #4CAF50;
-                        --primary-dark: #388E3C;
-                        --primary-light: #81C784;
-                        --secondary: #2196F3;
-                        --secondary-dark: #1976D2;
-                        --danger: #F44336;
-                        --danger-dark: #D32F2F;
-                        --warning: #FF9800;
-                        --success: #4CAF50;
-                        --dark: #212121;
-                        --dark-lighter: #2d2d2d;
-                        --dark-medium: #383838;
-                        --dark-border: #444444;
-                        --text: #f0f0f0;
-                        --text-muted: #aaaaaa;
-                        --shadow: rgba(0,0,0,0.2);
-                    }
-
-                    body {
-                        background: var(--dark);
-                        color: var(--text);
-                        font-family: 'Segoe UI', 'Roboto', Arial, sans-serif;
-                        margin: 0;
-                        padding: 20px;
-                        line-height: 1.6;
-                        background-image: linear-gradient(to bottom, #1a1a1a, #212121);
-                        min-height: 100vh;
-                        position: relative;
-                        overflow-x: hidden;
-                    }
-
-                    body::before {
-                        content: '';
-                        position: absolute;
-                        top: 0;
-                        left: 0;
-                        right: 0;
-                        height: 200px;
-                        background-image: linear-gradient(to bottom, rgba(76, 175, 80, 0.05), transparent);
-                        z-index: -1;
-                    }
-
-                    h1, h2, h3 {
-                        font-weight: 600;
-                        margin-top: 0;
-                        color: var(--primary);
-                        letter-spacing: 0.5px;
-                    }
-
-                    h1 {
-                        font-size: 28px;
-                        border-bottom: 2px solid var(--primary-dark);
-                        padding-bottom: 10px;
-                        margin-bottom: 25px;
-                        display: inline-block;
-                    }
-
-                    .header {
-                        display: flex;
-                        justify-content: space-between;
-                        align-items: center;
-                        margin-bottom: 30px;
-                        padding-bottom: 15px;
-                        border-bottom: 1px solid var(--dark-border);
-                    }
-
-                    .back-button {
-                        background-color: var(--dark-medium);
-                        color: var(--text);
-                        border: none;
-                        padding: 10px 16px;
-                        border-radius: 4px;
-                        cursor: pointer;
-                        transition: all 0.2s ease;
-                        font-weight: 500;
-                        display: flex;
-                        align-items: center;
-                        gap: 8px;
-                        box-shadow: 0 2px 5px var(--shadow);
-                    }
-
-                    .back-button:hover {
-                        background-color: var(--dark-border);
-                        transform: translateY(-2px);
-                    }
-
-                    .back-button::before {
-                        content: '←';
-                        font-size: 18px;
-                        line-height: 1;
-                    }
-
-                    .status-card {
-                        background: var(--dark-lighter);
-                        border-radius: 12px;
-                        padding: 20px;
-                        margin: 20px 0;
-                        border: 1px solid var(--dark-border);
-                        box-shadow: 0 4px 15px var(--shadow);
-                        transition: all 0.3s ease;
-                        position: relative;
-                        overflow: hidden;
-                    }
-
-                    .status-card:hover {
-                        transform: translateY(-3px);
-                        box-shadow: 0 6px 20px var(--shadow);
-                        border-color: var(--primary-dark);
-                    }
-
-                    .status-card::after {
-                        content: '';
-                        position: absolute;
-                        top: 0;
-                        right: 0;
-                        width: 80px;
-                        height: 80px;
-                        background: linear-gradient(135deg, transparent 70%, rgba(76, 175, 80, 0.1) 100%);
-                        border-radius: 0 0 0 80px;
-                    }
-
-                    .metric {
-                        display: flex;
-                        justify-content: space-between;
-                        align-items: center;
-                        margin: 18px 0;
-                        padding: 10px 15px;
-                        background: rgba(0,0,0,0.15);
-                        border-radius: 8px;
-                        border-left: 3px solid var(--primary);
-                    }
-
-                    .metric span:first-child {
-                        font-weight: 500;
-                        color: var(--text-muted);
-                    }
-
-                    .metric span:last-child {
-                        font-family: 'Consolas', 'Courier New', monospace;
-                        font-weight: 600;
-                        padding: 4px 10px;
-                        border-radius: 4px;
-                        background: rgba(0,0,0,0.2);
-                    }
-
-                    .status-running {
-                        color: var(--success);
-                        animation: pulse 2s infinite;
-                    }
-
-                    .status-stopped {
-                        color: var(--danger);
-                    }
-
-                    /* Controls styling */
-                    .controls {
-                        display: flex;
-                        flex-wrap: wrap;
-                        gap: 15px;
-                        margin: 25px 0;
-                    }
-
-                    .button {
-                        padding: 12px 24px;
-                        border-radius: 6px;
-                        border: none;
-                        font-weight: 600;
-                        cursor: pointer;
-                        transition: all 0.2s ease;
-                        text-transform: uppercase;
-                        letter-spacing: 1px;
-                        font-size: 14px;
-                        display: flex;
-                        align-items: center;
-                        gap: 8px;
-                        box-shadow: 0 3px 10px var(--shadow);
-                    }
-
-                    .button:hover {
-                        transform: translateY(-3px);
-                        box-shadow: 0 5px 15px var(--shadow);
-                    }
-
-                    .button:active {
-                        transform: translateY(1px);
-                    }
-
-                    .start-button {
-                        background-color: var(--success);
-                        color: white;
-                    }
-
-                    .start-button:hover {
-                        background-color: var(--primary-dark);
-                    }
-
-                    .stop-button {
-                        background-color: var(--danger);
-                        color: white;
-                    }
-
-                    .stop-button:hover {
-                        background-color: var(--danger-dark);
-                    }
-
-                    .config-button {
-                        background-color: var(--secondary);
-                        color: white;
-                    }
-
-                    .config-button:hover {
-                        background-color: var(--secondary-dark);
-                    }
-
-                    .console-button {
-                        background-color: #9c27b0;
-                        color: white;
-                    }
-
-                    .console-button:hover {
-                        background-color: #7B1FA2;
-                    }
-
-                    /* Console styling */
-                    .console-area, .config-area {
-                        background: var(--dark-lighter);
-                        border-radius: 12px;
-                        padding: 20px;
-                        margin: 25px 0;
-                        border: 1px solid var(--dark-border);
-                        box-shadow: 0 4px 15px var(--shadow);
-                        display: none;
-                    }
-
-                    .console-output {
-                        width: 100%;
-                        height: 350px;
-                        background: #1a1a1a;
-                        color: #a5d6a7;
-                        border: 1px solid var(--dark-border);
-                        padding: 15px;
-                        font-family: 'Consolas', 'Courier New', monospace;
-                        overflow-y: auto;
-                        white-space: pre-wrap;
-                        line-height: 1.5;
-                        font-size: 14px;
-                        margin-bottom: 15px;
-                        border-radius: 6px;
-                    }
-
-                    .console-input {
-                        width: calc(100% - 110px);
-                        background: #1a1a1a;
-                        color: var(--text);
-                        border: 1px solid var(--dark-border);
-                        padding: 12px 15px;
-                        font-family: 'Consolas', 'Courier New', monospace;
-                        margin-top: 10px;
-                        border-radius: 6px 0 0 6px;
-                        font-size: 14px;
-                        transition: all 0.3s ease;
-                    }
-
-                    .console-input:focus {
-                        outline: none;
-                        border-color: var(--primary);
-                        box-shadow: 0 0 0 2px rgba(76, 175, 80, 0.2);
-                    }
-
-                    .send-button {
-                        width: 100px;
-                        background-color: var(--warning);
-                        color: white;
-                        border-radius: 0 6px 6px 0;
-                        margin-left: -1px;
-                    }
-
-                    .save-button {
-                        background-color: var(--warning);
-                        color: white;
-                        margin-top: 15px;
-                    }
-
-                    textarea {
-                        width: 100%;
-                        height: 350px;
-                        background: #1a1a1a;
-                        color: var(--text);
-                        border: 1px solid var(--dark-border);
-                        padding: 15px;
-                        font-family: 'Consolas', 'Courier New', monospace;
-                        border-radius: 6px;
-                        font-size: 14px;
-                        line-height: 1.5;
-                        transition: all 0.3s ease;
-                    }
-
-                    textarea:focus {
-                        outline: none;
-                        border-color: var(--primary);
-                        box-shadow: 0 0 0 2px rgba(76, 175, 80, 0.2);
-                    }
-
-                    /* Server list styling */
-                    .server-list {
-                        display: flex;
-                        flex-direction: column;
-                        gap: 15px;
-                    }
-
-                    .server-card {
-                        background: var(--dark-lighter);
-                        border-radius: 12px;
-                        padding: 20px;
-                        cursor: pointer;
-                        transition: all 0.2s ease;
-                        border: 1px solid var(--dark-border);
-                        box-shadow: 0 4px 10px var(--shadow);
-                        position: relative;
-                        overflow: hidden;
-                    }
-
-                    .server-card:hover {
-                        background: var(--dark-medium);
-                        transform: translateY(-3px);
-                        box-shadow: 0 6px 20px var(--shadow);
-                        border-color: var(--primary-dark);
-                    }
-
-                    .server-name {
-                        font-size: 18px;
-                        font-weight: 600;
-                        display: flex;
-                        align-items: center;
-                        gap: 10px;
-                    }
-
-                    .server-path {
-                        color: var(--text-muted);
-                        font-size: 14px;
-                        margin-top: 8px;
-                        font-family: 'Consolas', 'Courier New', monospace;
-                    }
-
-                    .status-badge {
-                        display: inline-block;
-                        padding: 4px 12px;
-                        border-radius: 20px;
-                        font-size: 12px;
-                        font-weight: 600;
-                        letter-spacing: 0.5px;
-                        text-transform: uppercase;
-                    }
-
-                    .status-badge.status-running {
-                        background-color: rgba(76, 175, 80, 0.2);
-                        color: var(--success);
-                        border: 1px solid rgba(76, 175, 80, 0.3);
-                    }
-
-                    .status-badge.status-stopped {
-                        background-color: rgba(244, 67, 54, 0.2);
-                        color: var(--danger);
-                        border: 1px solid rgba(244, 67, 54, 0.3);
-                    }
-
-                    /* Animations */
-                    @keyframes pulse {
-                        0% { opacity: 1; }
-                        50% { opacity: 0.8; }
-                        100% { opacity: 1; }
-                    }
-
-                    /* Custom scrollbar */
-                    ::-webkit-scrollbar {
-                        width: 10px;
-                    }
-
-                    ::-webkit-scrollbar-track {
-                        background: var(--dark);
-                        border-radius: 10px;
-                    }
-
-                    ::-webkit-scrollbar-thumb {
-                        background: var(--dark-border);
-                        border-radius: 10px;
-                    }
-
-                    ::-webkit-scrollbar-thumb:hover {
-                        background: var(--primary-dark);
-                    }
-
-                    /* Responsive design */
-                    @media (max-width: 768px) {
-                        .controls {
-                            flex-direction: column;
-                        }
-                        
-                        .button {
-                            width: 100%;
-                            justify-content: center;
-                        }
-                        
-                        .console-input {
-                            width: 100%;
-                            border-radius: 6px;
-                            margin-bottom: 10px;
-                        }
-                        
-                        .send-button {
-                            width: 100%;
-                            border-radius: 6px;
-                            margin-left: 0;
-                        }
-                    }
-                </style>
-            </head>
-            <body>
-                <h1>Minecraft Server Manager</h1>
-                <div class="server-list" id="serverList">
-                    <!-- Server profiles will be loaded here -->
-                </div>
-
-                <script>
-                    function loadServers() {
-                        fetch('/api/servers')
-                            .then(response => response.json())
-                            .then(data => {
-                                const serverList = document.getElementById('serverList');
-                                serverList.innerHTML = '';
-                                
-                                if (data.servers.length === 0) {
-                                    serverList.innerHTML = '<p>No server profiles found.</p>';
-                                    return;
-                                }
-                                
-                                data.servers.forEach(server => {
-                                    const serverCard = document.createElement('div');
-                                    serverCard.className = 'server-card';
-                                    
-                                    const statusClass = server.running ? 'status-running' : 'status-stopped';
-                                    const statusText = server.running ? 'Running' : 'Stopped';
-                                    
-                                    serverCard.innerHTML = `
-                                        <div class="server-name">
-                                            ${server.name}
-                                            <span class="status-badge ${statusClass}">${statusText}</span>
-                                        </div>
-                                        <div class="server-path">${server.path}</div>
-                                    `;
-                                    serverCard.addEventListener('click', () => {
-                                        window.location.href = '/server?path=' + encodeURIComponent(server.path);
-                                    });
-                                    serverList.appendChild(serverCard);
-                                });
-                            });
-                    }
-                    
-                    // Load servers immediately and refresh every 2 seconds
-                    loadServers();
-                    setInterval(loadServers, 2000);
-                </script>
-            </body>
-            </html>
-            """
+            return render_page('index.html')
             
         @app.route('/server')
         def server():
@@ -681,680 +1293,250 @@ class WebUIManager:
             # Get the server name from path
             server_name = os.path.basename(server_path)
             
-            return f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Server: {server_name}</title>
-                <style>
-                    /* Modern UI Theme with Minecraft Inspiration */
-                    :root {{
-                        --primary: #4CAF50;
-                        --primary-dark: #388E3C;
-                        --primary-light: #81C784;
-                        --secondary: #2196F3;
-                        --secondary-dark: #1976D2;
-                        --danger: #F44336;
-                        --danger-dark: #D32F2F;
-                        --warning: #FF9800;
-                        --success: #4CAF50;
-                        --dark: #212121;
-                        --dark-lighter: #2d2d2d;
-                        --dark-medium: #383838;
-                        --dark-border: #444444;
-                        --text: #f0f0f0;
-                        --text-muted: #aaaaaa;
-                        --shadow: rgba(0,0,0,0.2);
-                    }}
-
-                    body {{
-                        background: var(--dark);
-                        color: var(--text);
-                        font-family: 'Segoe UI', 'Roboto', Arial, sans-serif;
-                        margin: 0;
-                        padding: 20px;
-                        line-height: 1.6;
-                        background-image: linear-gradient(to bottom, #1a1a1a, #212121);
-                        min-height: 100vh;
-                        position: relative;
-                        overflow-x: hidden;
-                    }}
-
-                    body::before {{
-                        content: '';
-                        position: absolute;
-                        top: 0;
-                        left: 0;
-                        right: 0;
-                        height: 200px;
-                        background-image: linear-gradient(to bottom, rgba(76, 175, 80, 0.05), transparent);
-                        z-index: -1;
-                    }}
-
-                    h1, h2, h3 {{
-                        font-weight: 600;
-                        margin-top: 0;
-                        color: var(--primary);
-                        letter-spacing: 0.5px;
-                    }}
-
-                    h1 {{
-                        font-size: 28px;
-                        border-bottom: 2px solid var(--primary-dark);
-                        padding-bottom: 10px;
-                        margin-bottom: 25px;
-                        display: inline-block;
-                    }}
-
-                    .header {{
-                        display: flex;
-                        justify-content: space-between;
-                        align-items: center;
-                        margin-bottom: 30px;
-                        padding-bottom: 15px;
-                        border-bottom: 1px solid var(--dark-border);
-                    }}
-
-                    .back-button {{
-                        background-color: var(--dark-medium);
-                        color: var(--text);
-                        border: none;
-                        padding: 10px 16px;
-                        border-radius: 4px;
-                        cursor: pointer;
-                        transition: all 0.2s ease;
-                        font-weight: 500;
-                        display: flex;
-                        align-items: center;
-                        gap: 8px;
-                        box-shadow: 0 2px 5px var(--shadow);
-                    }}
-
-                    .back-button:hover {{
-                        background-color: var(--dark-border);
-                        transform: translateY(-2px);
-                    }}
-
-                    .back-button::before {{
-                        content: '←';
-                        font-size: 18px;
-                        line-height: 1;
-                    }}
-
-                    .status-card {{
-                        background: var(--dark-lighter);
-                        border-radius: 12px;
-                        padding: 20px;
-                        margin: 20px 0;
-                        border: 1px solid var(--dark-border);
-                        box-shadow: 0 4px 15px var(--shadow);
-                        transition: all 0.3s ease;
-                        position: relative;
-                        overflow: hidden;
-                    }}
-
-                    .status-card:hover {{
-                        transform: translateY(-3px);
-                        box-shadow: 0 6px 20px var(--shadow);
-                        border-color: var(--primary-dark);
-                    }}
-
-                    .status-card::after {{
-                        content: '';
-                        position: absolute;
-                        top: 0;
-                        right: 0;
-                        width: 80px;
-                        height: 80px;
-                        background: linear-gradient(135deg, transparent 70%, rgba(76, 175, 80, 0.1) 100%);
-                        border-radius: 0 0 0 80px;
-                    }}
-
-                    .metric {{
-                        display: flex;
-                        justify-content: space-between;
-                        align-items: center;
-                        margin: 18px 0;
-                        padding: 10px 15px;
-                        background: rgba(0,0,0,0.15);
-                        border-radius: 8px;
-                        border-left: 3px solid var(--primary);
-                    }}
-
-                    .metric span:first-child {{
-                        font-weight: 500;
-                        color: var(--text-muted);
-                    }}
-
-                    .metric span:last-child {{
-                        font-family: 'Consolas', 'Courier New', monospace;
-                        font-weight: 600;
-                        padding: 4px 10px;
-                        border-radius: 4px;
-                        background: rgba(0,0,0,0.2);
-                    }}
-
-                    .status-running {{
-                        color: var(--success);
-                        animation: pulse 2s infinite;
-                    }}
-
-                    .status-stopped {{
-                        color: var(--danger);
-                    }}
-
-                    /* Controls styling */
-                    .controls {{
-                        display: flex;
-                        flex-wrap: wrap;
-                        gap: 15px;
-                        margin: 25px 0;
-                    }}
-
-                    .button {{
-                        padding: 12px 24px;
-                        border-radius: 6px;
-                        border: none;
-                        font-weight: 600;
-                        cursor: pointer;
-                        transition: all 0.2s ease;
-                        text-transform: uppercase;
-                        letter-spacing: 1px;
-                        font-size: 14px;
-                        display: flex;
-                        align-items: center;
-                        gap: 8px;
-                        box-shadow: 0 3px 10px var(--shadow);
-                    }}
-
-                    .button:hover {{
-                        transform: translateY(-3px);
-                        box-shadow: 0 5px 15px var(--shadow);
-                    }}
-
-                    .button:active {{
-                        transform: translateY(1px);
-                    }}
-
-                    .start-button {{
-                        background-color: var(--success);
-                        color: white;
-                    }}
-
-                    .start-button:hover {{
-                        background-color: var(--primary-dark);
-                    }}
-
-                    .stop-button {{
-                        background-color: var(--danger);
-                        color: white;
-                    }}
-
-                    .stop-button:hover {{
-                        background-color: var(--danger-dark);
-                    }}
-
-                    .config-button {{
-                        background-color: var(--secondary);
-                        color: white;
-                    }}
-
-                    .config-button:hover {{
-                        background-color: var(--secondary-dark);
-                    }}
-
-                    .console-button {{
-                        background-color: #9c27b0;
-                        color: white;
-                    }}
-
-                    .console-button:hover {{
-                        background-color: #7B1FA2;
-                    }}
-
-                    /* Console styling */
-                    .console-area, .config-area {{
-                        background: var(--dark-lighter);
-                        border-radius: 12px;
-                        padding: 20px;
-                        margin: 25px 0;
-                        border: 1px solid var(--dark-border);
-                        box-shadow: 0 4px 15px var(--shadow);
-                        display: none;
-                    }}
-
-                    .console-output {{
-                        width: 100%;
-                        height: 350px;
-                        background: #1a1a1a;
-                        color: #a5d6a7;
-                        border: 1px solid var(--dark-border);
-                        padding: 15px;
-                        font-family: 'Consolas', 'Courier New', monospace;
-                        overflow-y: auto;
-                        white-space: pre-wrap;
-                        line-height: 1.5;
-                        font-size: 14px;
-                        margin-bottom: 15px;
-                        border-radius: 6px;
-                    }}
-
-                    .console-input {{
-                        width: calc(100% - 110px);
-                        background: #1a1a1a;
-                        color: var(--text);
-                        border: 1px solid var(--dark-border);
-                        padding: 12px 15px;
-                        font-family: 'Consolas', 'Courier New', monospace;
-                        margin-top: 10px;
-                        border-radius: 6px 0 0 6px;
-                        font-size: 14px;
-                        transition: all 0.3s ease;
-                    }}
-
-                    .console-input:focus {{
-                        outline: none;
-                        border-color: var(--primary);
-                        box-shadow: 0 0 0 2px rgba(76, 175, 80, 0.2);
-                    }}
-
-                    .send-button {{
-                        width: 100px;
-                        background-color: var(--warning);
-                        color: white;
-                        border-radius: 0 6px 6px 0;
-                        margin-left: -1px;
-                    }}
-
-                    .save-button {{
-                        background-color: var(--warning);
-                        color: white;
-                        margin-top: 15px;
-                    }}
-
-                    textarea {{
-                        width: 100%;
-                        height: 350px;
-                        background: #1a1a1a;
-                        color: var(--text);
-                        border: 1px solid var (--dark-border);
-                        padding: 15px;
-                        font-family: 'Consolas', 'Courier New', monospace;
-                        border-radius: 6px;
-                        font-size: 14px;
-                        line-height: 1.5;
-                        transition: all 0.3s ease;
-                    }}
-
-                    textarea:focus {{
-                        outline: none;
-                        border-color: var(--primary);
-                        box-shadow: 0 0 0 2px rgba(76, 175, 80, 0.2);
-                    }}
-
-                    /* Animations */
-                    @keyframes pulse {{
-                        0% {{ opacity: 1; }}
-                        50% {{ opacity: 0.8; }}
-                        100% {{ opacity: 1; }}
-                    }}
-
-                    /* Custom scrollbar */
-                    ::-webkit-scrollbar {{
-                        width: 10px;
-                    }}
-
-                    ::-webkit-scrollbar-track {{
-                        background: var(--dark);
-                        border-radius: 10px;
-                    }}
-
-                    ::-webkit-scrollbar-thumb {{
-                        background: var(--dark-border);
-                        border-radius: 10px;
-                    }}
-
-                    ::-webkit-scrollbar-thumb:hover {{
-                        background: var(--primary-dark);
-                    }}
-
-                    /* Responsive design */
-                    @media (max-width: 768px) {{
-                        .controls {{
-                            flex-direction: column;
-                        }}
-                        
-                        .button {{
-                            width: 100%;
-                            justify-content: center;
-                        }}
-                        
-                        .console-input {{
-                            width: 100%;
-                            border-radius: 6px;
-                            margin-bottom: 10px;
-                        }}
-                        
-                        .send-button {{
-                            width: 100%;
-                            border-radius: 6px;
-                            margin-left: 0;
-                        }}
-                    }}
-
-                    /* Error message styling */
-                    .error-message {{
-                        background-color: rgba(244, 67, 54, 0.1);
-                        border-left: 4px solid var(--danger);
-                        color: var(--danger);
-                        padding: 12px 15px;
-                        margin: 10px 0;
-                        border-radius: 4px;
-                        font-weight: 500;
-                    }}
-                </style>
-            </head>
-            <body>
-                <div class="header">
-                    <h1>{server_name}</h1>
-                    <button class="back-button" onclick="window.location.href='/'">Back to List</button>
-                </div>
-
-                <div class="status-card">
-                    <h2>Server Status</h2>
-                    <div class="metric">
-                        <span>Status:</span>
-                        <span id="serverStatus">Loading...</span>
-                    </div>
-                    <div class="metric">
-                        <span>Path:</span>
-                        <span>{server_path}</span>
-                    </div>
-                    <div class="metric">
-                        <span>Memory Usage:</span>
-                        <span id="memoryUsage">Checking...</span>
-                    </div>
-                </div>
-
-                <div class="controls">
-                    <button class="button start-button" id="startButton" onclick="startServer()">
-                        <span class="button-icon">▶</span> Start Server
-                    </button>
-                    <button class="button stop-button" id="stopButton" onclick="stopServer()">
-                        <span class="button-icon">■</span> Stop Server
-                    </button>
-                    <button class="button console-button" onclick="toggleConsole()">
-                        <span class="button-icon">></span> Console
-                    </button>
-                    <button class="button config-button" onclick="toggleConfig()">
-                        <span class="button-icon">⚙</span> Config
-                    </button>
-                </div>
-
-                <div class="console-area" id="consoleArea">
-                    <h2>Server Console</h2>
-                    <div class="console-output" id="consoleOutput"></div>
-                    <div style="display: flex;">
-                        <input type="text" class="console-input" id="consoleInput" placeholder="Enter command..." onkeydown="if(event.key==='Enter') sendCommand()">
-                        <button class="button send-button" onclick="sendCommand()">Send</button>
-                    </div>
-                </div>
-
-                <div class="config-area" id="configArea">
-                    <h2>Server Configuration</h2>
-                    <textarea id="configText"></textarea>
-                    <button class="button save-button" onclick="saveConfig()">Save Config</button>
-                </div>
-
-                <script>
-                    // Server status and control
-                    let serverStatus = 'unknown';
-                    let consoleUpdateInterval;
-                    
-                    // Initial status check
-                    checkServerStatus();
-                    setInterval(checkServerStatus, 2000);
-                    
-                    function checkServerStatus() {{
-                        fetch('/api/status?path={server_path}')
-                            .then(response => response.json())
-                            .then(data => {{
-                                serverStatus = data.status;
-                                const statusElement = document.getElementById('serverStatus');
-                                
-                                if (data.status === 'running') {{
-                                    statusElement.textContent = 'Running';
-                                    statusElement.className = 'status-running';
-                                    document.getElementById('startButton').disabled = true;
-                                    document.getElementById('stopButton').disabled = false;
-                                }} else {{
-                                    statusElement.textContent = 'Stopped';
-                                    statusElement.className = 'status-stopped';
-                                    document.getElementById('startButton').disabled = false;
-                                    document.getElementById('stopButton').disabled = true;
-                                }}
-                                
-                                // Update memory usage if available
-                                if (data.memory) {{
-                                    document.getElementById('memoryUsage').textContent = data.memory;
-                                }}
-                            }})
-                            .catch(error => {{
-                                console.error('Error checking server status:', error);
-                            }});
-                    }}
-                    
-                    function startServer() {{
-                        fetch('/api/control/start', {{
-                            method: 'POST',
-                            headers: {{
-                                'Content-Type': 'application/json',
-                            }},
-                            body: JSON.stringify({{ path: '{server_path}' }}),
-                        }})
-                        .then(response => response.json())
-                        .then(data => {{
-                            if (data.success) {{
-                                // Enable console auto-update
-                                if (!consoleUpdateInterval) {{
-                                    consoleUpdateInterval = setInterval(updateConsole, 500);
-                                }}
-                                // Show console
-                                document.getElementById('consoleArea').style.display = 'block';
-                                // Update status will be handled by the status interval
-                            }}
-                        }})
-                        .catch(error => console.error('Error:', error));
-                    }}
-                    
-                    function stopServer() {{
-                        fetch('/api/control/stop', {{
-                            method: 'POST',
-                            headers: {{
-                                'Content-Type': 'application/json',
-                            }},
-                            body: JSON.stringify({{ path: '{server_path}' }}),
-                        }})
-                        .then(response => response.json())
-                        .then(data => {{
-                            // Status update will be handled by the status interval
-                            console.log(data);
-                        }})
-                        .catch(error => console.error('Error:', error));
-                    }}
-                    
-                    // Console functions
-                    function toggleConsole() {{
-                        const consoleArea = document.getElementById('consoleArea');
-                        if (consoleArea.style.display === 'none' || consoleArea.style.display === '') {{
-                            consoleArea.style.display = 'block';
-                            // Start auto-update only if not already running
-                            if (!consoleUpdateInterval) {{
-                                consoleUpdateInterval = setInterval(updateConsole, 500);
-                            }}
-                            updateConsole(); // Immediate update
-                        }} else {{
-                            consoleArea.style.display = 'none';
-                            // Stop auto-update
-                            if (consoleUpdateInterval) {{
-                                clearInterval(consoleUpdateInterval);
-                                consoleUpdateInterval = null;
-                            }}
-                        }}
-                    }}
-                    
-                    function updateConsole() {{
-                        fetch('/api/console?path={server_path}')
-                            .then(response => response.json())
-                            .then(data => {{
-                                const consoleOutput = document.getElementById('consoleOutput');
-                                consoleOutput.innerHTML = data.lines.join('<br>');
-                                consoleOutput.scrollTop = consoleOutput.scrollHeight;
-                            }})
-                            .catch(error => console.error('Error:', error));
-                    }}
-                    
-                    function sendCommand() {{
-                        const input = document.getElementById('consoleInput');
-                        const command = input.value.trim();
-                        
-                        if (command) {{
-                            fetch('/api/console/send', {{
-                                method: 'POST',
-                                headers: {{
-                                    'Content-Type': 'application/json',
-                                }},
-                                body: JSON.stringify({{ 
-                                    path: '{server_path}',
-                                    command: command
-                                }}),
-                            }})
-                            .then(() => {{
-                                input.value = '';
-                                updateConsole(); // Refresh console after sending
-                            }})
-                            .catch(error => console.error('Error:', error));
-                        }}
-                    }}
-                    
-                    // Config functions
-                    function toggleConfig() {{
-                        const configArea = document.getElementById('configArea');
-                        if (configArea.style.display === 'none' || configArea.style.display === '') {{
-                            configArea.style.display = 'block';
-                            loadConfig();
-                        }} else {{
-                            configArea.style.display = 'none';
-                        }}
-                    }}
-                    
-                    // Ensure this JavaScript function is correct in your HTML template
-                    function loadConfig() {{
-                        fetch('/api/config?path=' + encodeURIComponent('{server_path}'))
-                            .then(response => response.json())
-                            .then(data => {{
-                                console.log("Config data:", data);  // Debug line
-                                if (data.content) {{
-                                    document.getElementById('configText').value = data.content;
-                                }} else if (data.error) {{
-                                    document.getElementById('configText').value = '# ' + data.error;
-                                }}
-                            }})
-                            .catch(error => {{
-                                console.error('Error loading config:', error);
-                                document.getElementById('configText').value = '# Error loading configuration';
-                            }});
-                    }}
-                    
-                    function saveConfig() {{
-                        const configContent = document.getElementById('configText').value;
-                        
-                        fetch('/api/config/save', {{
-                            method: 'POST',
-                            headers: {{
-                                'Content-Type': 'application/json',
-                            }},
-                            body: JSON.stringify({{ 
-                                path: '{server_path}',
-                                content: configContent
-                            }}),
-                        }})
-                        .then(response => response.json())
-                        .then(data => {{
-                            alert(data.success ? 'Configuration saved successfully!' : 'Error saving configuration');
-                        }})
-                        .catch(error => console.error('Error:', error));
-                    }}
-                </script>
-            </body>
-            </html>
-            """
+            return render_page(
+                'server.html',
+                server_name=server_name,
+                server_path=server_path,
+                page_data={'path': server_path, 'maxConsoleLines': CONSOLE_BUFFER_LINES},
+            )
+        
+        @app.route('/static/<path:filename>')
+        def static_asset(filename):
+            """Serve a fingerprinted, precompressed static file"""
+            asset = assets.get(filename)
+            if asset is None:
+                return jsonify({'error': 'Not found'}), 404
+            encoding, body = asset.select(request.accept_encodings)
+            response = app.response_class(body, content_type=asset.mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+            response.headers['Vary'] = 'Accept-Encoding'
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE
+            response.set_etag(f"{asset.digest}-{encoding}")
+            return response.make_conditional(request)
             
-        # API routes
         @app.route('/api/servers')
         def get_servers():
             servers = []
-            for path, panel in self.profiles.items():
-                # Check if server is running
-                running = False
-                if hasattr(panel, 'process') and panel.process:
-                    try:
-                        running = panel.process.state() == QProcess.Running and panel.process.processId() > 0
-                    except:
-                        running = False
-                
+            for path in list(self.profiles):
+                state = self.get_state(path)
                 servers.append({
                     'path': path,
                     'name': os.path.basename(path),
-                    'running': running
+                    'running': state.running and bool(state.pid)
                 })
             return jsonify({'servers': servers})
             
+        @app.route('/api/dashboard')
+        def get_dashboard():
+            """Every profile's state and usage in one response; unchanged polls get a bodiless 304"""
+            body, etag = self.dashboard()
+            response = app.response_class(body, mimetype='application/json')
+            response.set_etag(etag)
+            # Let browsers cache the body but revalidate it on every poll
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+        
         @app.route('/api/status')
         def get_status():
             server_path = request.args.get('path')
             if not server_path or server_path not in self.profiles:
                 return jsonify({'status': 'error', 'message': 'Invalid server path'})
-                
-            control_panel = self.profiles[server_path]
-            if not hasattr(control_panel, 'process') or not control_panel.process:
-                return jsonify({'status': 'stopped'})
-                
+            
+            # Read from the state snapshot and the sampler; no request touches the process
+            state = self.get_state(server_path)
+            status, sample = self.get_usage(server_path)
+            reply = {'status': status, 'version': state.version, 'ready': state.ready, 'crashed': state.crashed,
+                     'lagging': state.lagging, 'reachable': state.reachable, 'hung': state.hung}
+            if server_path in self.tick_health:
+                reply['tick'] = self.tick_health[server_path].to_dict()
+            ping = self.pinger.get(server_path)
+            if ping is not None and state.running:
+                reply['ping'] = ping.to_dict()
+            if sample:
+                if sample.cpu is not None:
+                    reply['cpu'] = f"{sample.cpu:.1f}%"
+                reply['memory'] = f"{sample.rss / 1024 / 1024:.1f} MB"
+                reply['process'] = sample.to_dict()
+            return jsonify(reply)
+        
+        @app.route('/api/status/wait')
+        def wait_status():
+            """Answer once the state version differs from ?version=, or after ?timeout= seconds.
+            
+            Without a version the current state is returned at once. Every
+            start, stop, crash and finished startup bumps the version.
+            """
+            server_path = request.args.get('path')
+            if not server_path or server_path not in self.profiles:
+                return jsonify({'status': 'error', 'message': 'Invalid server path'}), 404
+            version = request.args.get('version', type=int)
+            timeout = max(0, min(request.args.get('timeout', STATUS_WAIT_TIMEOUT, type=float), STATUS_WAIT_MAX))
+            if version is not None:
+                self.get_watch(server_path).wait(self.status_changed(server_path, version), timeout)
+            response = jsonify(self.status_reply(server_path, version))
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+        
+        @app.route('/api/metrics/history')
+        def get_metrics_history():
+            """History of one metric for charts: ?path=&metric=cpu|memory|threads|fds|players|ping|tps|mspt|behind_ms&range=1h&end=
+            
+            Ranges within the last hour come at 1 s, within two days as
+            minute min/avg/max, anything longer as hourly min/avg/max.
+            """
+            server_path = request.args.get('path')
+            if not server_path or server_path not in self.histories:
+                return jsonify({'success': False, 'message': 'Invalid server path'}), 404
+            history = self.histories[server_path]
+            metric = request.args.get('metric', 'cpu')
             try:
-                if control_panel.process.state() != QProcess.Running:
-                    return jsonify({'status': 'stopped'})
-                    
-                pid = control_panel.process.processId()
-                if pid <= 0:
-                    return jsonify({'status': 'starting'})
-                    
-                proc = psutil.Process(pid)
-                cpu = proc.cpu_percent()
-                mem = proc.memory_info().rss / 1024 / 1024  # Convert to MB
-                
-                return jsonify({
-                    'status': 'running',
-                    'cpu': f"{cpu:.1f}%",
-                    'memory': f"{mem:.1f} MB"
-                })
-            except Exception as e:
-                return jsonify({'status': 'stopped', 'error': str(e)})
+                seconds = parse_range(request.args.get('range', HISTORY_DEFAULT_RANGE))
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            end = request.args.get('end', time.time(), type=float)
+            try:
+                result = history.query(metric, end - seconds, end)
+            except KeyError:
+                return jsonify({'success': False, 'message': f'No history for metric: {metric}',
+                                'metrics': history.metrics()}), 404
+            return jsonify(dict(result, success=True, path=server_path, metric=metric, start=end - seconds, end=end))
+        
+        @app.route('/api/players')
+        def get_players():
+            """Who is online and who has played: ?path=&limit=100, or one player's sessions with &player=
+            
+            Built from join and leave lines as they are captured and, after a
+            restart, from the console log written since the last save.
+            """
+            server_path = request.args.get('path')
+            if not server_path or server_path not in self.players:
+                return jsonify({'success': False, 'message': 'Invalid server path'}), 404
+            tracker = self.players[server_path]
+            name = request.args.get('player')
+            if name:
+                player = tracker.sessions(name)
+                if player is None:
+                    return jsonify({'success': False, 'message': f'Unknown player: {name}'}), 404
+                return jsonify(dict(player, success=True, path=server_path))
+            limit = max(1, min(request.args.get('limit', 100, type=int), PLAYERS_LIMIT))
+            online = tracker.online_players()
+            return jsonify({'success': True, 'path': server_path, 'count': len(online), 'online': online,
+                            'players': tracker.summaries(limit), 'catching_up': tracker.catching_up})
         
         @app.route('/api/console')
         def get_console():
             server_path = request.args.get('path')
+            since = request.args.get('since', type=int)
+            min_rank = level_rank(request.args.get('level'))
+            thread = request.args.get('thread') or None
+            as_html = request.args.get('format') == 'html'
             if not server_path or server_path not in self.console_buffers:
-                return jsonify({'lines': []})
+                return jsonify({'lines': [], 'seq': 0})
+            
+            buffer = self.console_buffers[server_path]
             
             # Look for active Java process if console buffer is empty
-            if len(self.console_buffers[server_path].get_lines()) == 0:
-                control_panel = self.profiles[server_path]
-                if hasattr(control_panel, 'process') and control_panel.process:
-                    if control_panel.process.state() == QProcess.Running:
-                        self.console_buffers[server_path].add_line("Server is running... waiting for output")
+            if len(buffer) == 0 and self.get_state(server_path).running:
+                buffer.add_line("Server is running... waiting for output")
+            
+            def read_console():
+                if since is None and min_rank is None and not thread:
+                    return {'lines': buffer.get_lines(as_html), 'seq': buffer.last_seq}
+                
+                # Incremental and/or filtered read
+                lines, seq, reset = buffer.get_since(since or 0, min_rank, thread, as_html)
+                return {'lines': lines, 'seq': seq, 'reset': reset}
             
-            lines = self.console_buffers[server_path].get_lines()
-            return jsonify({'lines': lines})
+            # Keyed on the newest line, so a shared result is never stale
+            key = ('console', server_path, since, min_rank, thread, as_html, buffer.last_seq)
+            return jsonify(self.coalescer.get(key, read_console))
+        
+        @app.route('/api/console/stream')
+        def get_console_stream():
+            server_path = request.args.get('path')
+            if not server_path or server_path not in self.console_buffers:
+                return jsonify({'error': 'Invalid server path'}), 404
+            
+            # EventSource sends Last-Event-ID when it reconnects
+            since = request.headers.get('Last-Event-ID', type=int)
+            if since is None:
+                since = request.args.get('since', 0, type=int)
+            min_rank = level_rank(request.args.get('level'))
+            thread = request.args.get('thread') or None
+            as_html = request.args.get('format') == 'html'
+            
+            return Response(
+                self.stream_console(server_path, since, min_rank, thread, as_html),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+        
+        @app.route('/api/console/history')
+        def get_console_history():
+            """Read persisted console output: the last N lines or lines since a timestamp"""
+            server_path = request.args.get('path')
+            if not server_path or server_path not in self.console_logs:
+                return jsonify({'records': [], 'error': 'Invalid server path'})
+            
+            console_log = self.console_logs[server_path]
+            limit = min(request.args.get('limit', 500, type=int), CONSOLE_HISTORY_LIMIT)
+            start = request.args.get('from', type=float)
+            count = min(request.args.get('lines', 500, type=int), CONSOLE_HISTORY_LIMIT)
+            
+            def read_history():
+                try:
+                    if start is not None:
+                        records = console_log.since(start, limit)
+                    else:
+                        records = console_log.tail(count)
+                    return {'records': [dict(record.to_dict(), html=render_html(record.text)) for record in records]}
+                except Exception as e:
+                    logger.error("Error reading console history: %s", e)
+                    return {'records': [], 'error': f'Error reading console history: {str(e)}'}
+            
+            return jsonify(self.coalescer.get(('history', server_path, start, limit, count), read_history))
+        
+        @app.route('/api/console/search')
+        def search_console():
+            """Search persisted console output of one profile, or all of them without a path"""
+            server_path = request.args.get('path')
+            query = request.args.get('q', '')
+            # This level and above, as in /api/console; unknown levels do not filter
+            level = normalize_level(request.args.get('level'))
+            start = request.args.get('from', type=float)
+            end = request.args.get('to', type=float)
+            limit = min(request.args.get('limit', 100, type=int), CONSOLE_SEARCH_LIMIT)
+            
+            if server_path:
+                if server_path not in self.console_logs:
+                    return jsonify({'results': [], 'error': 'Invalid server path'})
+                paths = [server_path]
+            else:
+                paths = list(self.console_logs)
+            
+            if not query.strip() and not level:
+                return jsonify({'results': [], 'error': 'Empty query'})
+            
+            def run_search():
+                try:
+                    results = []
+                    for path in paths:
+                        for record in self.console_logs[path].search(query, level, start, end, limit):
+                            result = record.to_dict()
+                            result['path'] = path
+                            result['html'] = render_html(record.text)
+                            results.append(result)
+                    # Newest first across all profiles
+                    results.sort(key=lambda result: result['time'], reverse=True)
+                    return {'results': results[:limit]}
+                except Exception as e:
+                    logger.error("Error searching console history: %s", e)
+                    return {'results': [], 'error': f'Error searching console history: {str(e)}'}
+            
+            # The same search from several tabs scans the logs once
+            key = ('search', server_path, query, level, start, end, limit)
+            return jsonify(self.coalescer.get(key, run_search))
         
         @app.route('/api/console/send', methods=['POST'])
         def send_console_command():
@@ -1370,14 +1552,12 @@ class WebUIManager:
             
             try:
                 # Emit signal to send command in main thread
-                print(f"Emitting send_command_signal for {server_path}, command: {command}")
-                self.process_handler.send_command_signal.emit(server_path, command)
+                logger.debug("Emitting send_command_signal for %s, command: %s", server_path, command)
+                self.process_handler.dispatch('command', self.process_handler.send_command_signal, server_path, command)
                 
                 return jsonify({'success': True})
             except Exception as e:
-                print(f"Error emitting command signal: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error emitting command signal: %s", e)
                 return jsonify({
                     'success': False,
                     'message': f'Error sending command: {str(e)}'
@@ -1389,22 +1569,20 @@ class WebUIManager:
             server_path = data.get('path')
             
             if not server_path or server_path not in self.profiles:
-                print(f"Invalid server path: {server_path}")
+                logger.warning("Invalid server path: %s", server_path)
                 return jsonify({'message': 'Invalid server path', 'success': False})
                 
             try:
                 # Emit signal to start server in main thread
-                print(f"Emitting start_server_signal for {server_path}")
-                self.process_handler.start_server_signal.emit(server_path)
+                logger.debug("Emitting start_server_signal for %s", server_path)
+                self.process_handler.dispatch('start', self.process_handler.start_server_signal, server_path)
                 
                 return jsonify({
                     'message': 'Server start requested...',
                     'success': True
                 })
             except Exception as e:
-                print(f"Error emitting start signal: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error emitting start signal: %s", e)
                 return jsonify({
                     'message': f'Error starting server: {str(e)}',
                     'success': False
@@ -1420,22 +1598,74 @@ class WebUIManager:
                 
             try:
                 # Emit signal to stop server in main thread
-                print(f"Emitting stop_server_signal for {server_path}")
-                self.process_handler.stop_server_signal.emit(server_path)
+                logger.debug("Emitting stop_server_signal for %s", server_path)
+                self.process_handler.dispatch('stop', self.process_handler.stop_server_signal, server_path)
                 
                 return jsonify({
                     'message': 'Server stop requested...',
                     'success': True
                 })
             except Exception as e:
-                print(f"Error emitting stop signal: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error emitting stop signal: %s", e)
                 return jsonify({
                     'message': f'Error stopping server: {str(e)}',
                     'success': False
                 })
 
+        @app.route('/api/batch', methods=['POST'])
+        def run_batch():
+            """Send commands to, start or stop many servers in one request.
+            
+            Body: {"operations": [{"paths": [...] or "*", "action": "command" | "start" | "stop",
+            "command": "...", "parallel": N}, ...]}. parallel limits how many
+            servers of a start/stop operation are in progress at once.
+            """
+            data = request.json or {}
+            operations = data.get('operations') if isinstance(data, dict) else None
+            if not isinstance(operations, list) or not operations:
+                return jsonify({'success': False, 'message': 'No operations'})
+            
+            job = BatchJob([])
+            invalid = []
+            for operation in operations:
+                if not isinstance(operation, dict):
+                    return jsonify({'success': False, 'message': 'Each operation must be an object'})
+                action = operation.get('action')
+                paths = operation.get('paths', [])
+                command = operation.get('command') or ''
+                parallel = operation.get('parallel')
+                if not isinstance(action, str) or action not in BATCH_ACTIONS:
+                    return jsonify({'success': False, 'message': f'Unknown action: {action}'})
+                if not isinstance(command, str):
+                    return jsonify({'success': False, 'message': 'command must be a string'})
+                command = command.strip()
+                if action == 'command' and not command:
+                    return jsonify({'success': False, 'message': 'Empty command'})
+                # bool is an int subclass, so true would otherwise pass as 1
+                if parallel is not None and (isinstance(parallel, bool) or not isinstance(parallel, int)
+                                             or parallel < 1):
+                    return jsonify({'success': False, 'message': 'parallel must be a positive integer'})
+                if paths == '*':
+                    paths = list(self.profiles)
+                elif isinstance(paths, str):
+                    paths = [paths]
+                elif not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+                    return jsonify({'success': False, 'message': 'paths must be "*", a path or a list of paths'})
+                for path in paths:
+                    if path not in self.profiles:
+                        invalid.append({'path': path, 'action': action, 'success': False,
+                                        'message': 'Invalid server path'})
+                paths = [path for path in paths if path in self.profiles]
+                job.operations.append((action, paths, command, parallel))
+            
+            # One queued call to the main thread for the whole batch
+            logger.debug("Emitting batch_signal with %d operations", len(job.operations))
+            self.process_handler.dispatch('batch', self.process_handler.batch_signal, job)
+            if not job.done.wait(BATCH_REPLY_TIMEOUT):
+                return jsonify({'success': True, 'message': 'Batch dispatched; results not yet available',
+                                'results': invalid})
+            return jsonify({'success': True, 'results': job.results + invalid})
+        
         @app.route('/api/config/save', methods=['POST'])
         def save_config():
             """Save changes to the server.properties file"""
@@ -1450,13 +1680,8 @@ class WebUIManager:
                 return jsonify({'success': False, 'message': 'No content provided'})
             
             # Check if server is running
-            control_panel = self.profiles[server_path]
-            is_running = False
-            if hasattr(control_panel, 'process') and control_panel.process:
-                try:
-                    is_running = control_panel.process.state() == QProcess.Running and control_panel.process.processId() > 0
-                except:
-                    is_running = False
+            state = self.get_state(server_path)
+            is_running = state.running and bool(state.pid)
             
             # Optionally warn if server is running
             # if is_running:
@@ -1467,15 +1692,35 @@ class WebUIManager:
                 with open(config_path, 'w') as f:
                     f.write(content)
                 
-                print(f"Config saved for {server_path}")
+                logger.info("Config saved for %s", server_path)
                 return jsonify({'success': True, 'message': 'Configuration saved successfully'})
             except Exception as e:
                 error_msg = f"Error saving config: {str(e)}"
-                print(error_msg)
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error saving config for %s", server_path)
                 return jsonify({'success': False, 'message': error_msg})
 
+        @app.route('/metrics')
+        def get_metrics():
+            """Manager metrics in the Prometheus text format"""
+            return Response(self.metrics.expose(), content_type=METRICS_CONTENT_TYPE)
+        
+        @app.route('/api/logging', methods=['GET'])
+        def get_logging():
+            """List manager loggers and their effective levels"""
+            return jsonify({'loggers': get_levels()})
+        
+        @app.route('/api/logging', methods=['POST'])
+        def update_logging():
+            """Change a manager logger's level at runtime"""
+            data = request.json or {}
+            name = data.get('logger', 'root')
+            try:
+                level = set_level(name, data.get('level', ''))
+                logger.info("Log level of %s set to %s", name, level)
+                return jsonify({'success': True, 'logger': name, 'level': level})
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)})
+        
         @app.route('/api/config', methods=['GET'])
         def get_config():
             """Get the server.properties file content"""
@@ -1486,55 +1731,91 @@ class WebUIManager:
             
             try:
                 config_path = os.path.join(server_path, 'server.properties')
-                print(f"Reading config from: {config_path}")
+                logger.debug("Reading config from: %s", config_path)
                 
                 if os.path.exists(config_path):
-                    with open(config_path, 'r') as f:
-                        content = f.read()
-                    print(f"Successfully read config ({len(content)} bytes)")
-                    return jsonify({'content': content})
+                    # Validators come from the file itself, so unchanged files are never read
+                    stat = os.stat(config_path)
+                    etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+                    last_modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+                    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                        response = app.response_class(status=304)
+                    else:
+                        with open(config_path, 'r') as f:
+                            content = f.read()
+                        logger.debug("Successfully read config (%s bytes)", len(content))
+                        response = jsonify({'content': content})
+                    response.set_etag(etag)
+                    response.last_modified = last_modified
+                    response.headers['Cache-Control'] = 'no-cache'
+                    return response
                 else:
-                    print(f"Config file not found: {config_path}")
+                    logger.warning("Config file not found: %s", config_path)
                     return jsonify({'error': f'Config file not found: {config_path}', 'content': ''})
             except Exception as e:
-                print(f"Error reading config: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error reading config: %s", e)
                 return jsonify({'error': f'Error reading config: {str(e)}', 'content': ''})
                 
         return app
 
     def run_server(self):
         try:
-            # Create app in the thread context
-            app = self.setup_app()
             # Run app (this will block until the server is shut down)
-            app.run(host='0.0.0.0', port=8080, debug=False)
+            self.server.serve_forever()
         except Exception as e:
-            print(f"WebUI server error: {e}")
+            logger.error("WebUI server error: %s", e)
 
     def start(self):
         if self.thread and self.thread.is_alive():
             return  # Already running
+        
+        host = self.settings['host']
+        port = self.settings['port']
+        try:
+            # Bind here so a busy port is reported right away
+            self.app = self.setup_app()
+            self.server = create_backend(self.app, self.settings, self.async_routes())
+        except OSError as e:
+            logger.error("WebUI could not listen on %s:%s: %s", host, port, e)
+            return
             
         self.running = True
-        self.thread = threading.Thread(target=self.run_server)
+        self.thread = threading.Thread(target=self.run_server, name='webui-server')
         self.thread.daemon = True  # Make thread terminate when main process exits
         self.thread.start()
         
-        # Wait a moment for server to start
-        time.sleep(0.5)
+        self.sampler.start()
+        self.pinger.start()
         
         # Log that the server started with proper IP
         import socket
         hostname = socket.gethostname()
         try:
-            local_ip = socket.gethostbyname(hostname)
-            print(f"WebUI started at http://{local_ip}:8080 and http://localhost:8080")
+            local_ip = socket.gethostbyname(hostname) if host == '0.0.0.0' else host
+            logger.info("WebUI started at http://%s:%s (%s backend)", local_ip, port, self.settings['backend'])
         except:
-            print("WebUI started at http://localhost:8080")
+            logger.info("WebUI started at http://localhost:%s", port)
 
     def stop(self):
-        self.running = False
-        # Flask doesn't offer a clean shutdown method
-        # The thread will terminate when the application exits
\ No newline at end of file
+        """Stop serving, end open console streams and close the console logs"""
+        self.sampler.stop()
+        self.pinger.stop()
+        if self.running:
+            self.running = False
+            # Wake console streams and status long-polls so their workers can finish
+            for buffer in self.console_buffers.values():
+                for subscriber in buffer.subscribers:
+                    subscriber.push(('close',))
+            for watch in list(self.state_watches.values()):
+                watch.notify()
+            if self.server and self.thread and self.thread.is_alive():
+                try:
+                    self.server.shutdown()
+                except Exception as e:
+                    logger.error("Error stopping WebUI server: %s", e)
+            if self.thread:
+                self.thread.join(self.settings['shutdown_timeout'])
+            logger.info("WebUI stopped")
+        for console_log in self.console_logs.values():
+            console_log.close()
+        self.save_histories()
\ No newline at end of file
@@ -1,21 +1,31 @@
 import requests
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QDialog,
                             QScrollArea, QLabel, QPushButton, QHBoxLayout,
-                            QTextEdit, QSplitter, QFileDialog, QSlider, QLineEdit, QMessageBox)
-from PyQt5.QtCore import Qt, QProcess
-from PyQt5.QtGui import QPalette, QBrush, QPixmap
+                            QSplitter, QFileDialog, QSlider, QLineEdit, QMessageBox,
+                            QPlainTextEdit, QApplication)
+from PyQt5.QtCore import Qt, QProcess, QTimer
+from PyQt5.QtGui import QPalette, QBrush, QPixmap, QTextCursor, QTextCharFormat, QColor, QFont
 import os
+import logging
 import psutil
 # Add this import line for WebUIManager
 from gui.webui import WebUIManager
+from gui.output import ProcessOutputHub
+from utils.render import COLOR_HEX
+
+logger = logging.getLogger(__name__)
 
 # Make sure this is outside all classes
 web_ui_manager = None
 
+# Desktop console limits
+CONSOLE_MAX_LINES = 5000   # Oldest lines are dropped beyond this
+CONSOLE_FLUSH_MS = 16      # Pending output is drawn at most once per frame
+
 def initialize_web_ui():
     global web_ui_manager
     if (web_ui_manager is None):
-        print("Initializing WebUI Manager")
+        logger.info("Initializing WebUI Manager")
         web_ui_manager = WebUIManager()
         
         # Connect signals to slots using Qt.QueuedConnection to ensure thread safety
@@ -31,10 +41,15 @@ def initialize_web_ui():
             web_ui_manager.process_handler.send_command,
             type=Qt.QueuedConnection
         )
+        web_ui_manager.process_handler.batch_signal.connect(
+            web_ui_manager.process_handler.run_batch,
+            type=Qt.QueuedConnection
+        )
         
-        # Start the web UI server
+        # Start the web UI server, and stop it cleanly when the application quits
         web_ui_manager.start()
-        print("WebUI Manager initialized")
+        QApplication.instance().aboutToQuit.connect(web_ui_manager.stop)
+        logger.info("WebUI Manager initialized")
     return web_ui_manager
 
 class Styles:
@@ -123,7 +138,7 @@ class Styles:
     """
     
     CONSOLE = """
-        QTextEdit {
+        QPlainTextEdit {
             background-color: #1e1e1e;
             color: #ffffff;
             border: none;
@@ -527,6 +542,118 @@ class ServerTypeDialog(QDialog):
         dialog = VanillaVersionDialog(self)
         dialog.exec_()
 
+class ConsoleView(QPlainTextEdit):
+    """Read-only console that batches incoming text and draws it once per frame.
+    
+    The document is plain text capped at max_lines blocks; stderr and colour
+    codes are drawn with cached character formats instead of HTML.
+    """
+    def __init__(self, max_lines=CONSOLE_MAX_LINES, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(max_lines)
+        self.pending = []  # (segments, is_error) waiting for the next flush
+        
+        self.normal_format = QTextCharFormat()
+        self.error_format = QTextCharFormat()
+        self.error_format.setForeground(QColor('#ff5555'))
+        self.formats = {}  # (style, is_error) -> QTextCharFormat
+        
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(CONSOLE_FLUSH_MS)
+        self.flush_timer.timeout.connect(self.flush)
+    
+    def append(self, text):
+        """Queue text as one or more new lines"""
+        self._queue(text, False)
+    
+    def append_error(self, text):
+        """Queue stderr text as one or more new lines"""
+        self._queue(text, True)
+    
+    def append_line(self, line):
+        """Queue an OutputLine, reusing the styled runs rendered at ingest"""
+        if line.segments is None:
+            self._queue(line.text, line.is_error)
+        else:
+            self._enqueue(line.segments, line.is_error)
+    
+    def _queue(self, text, is_error):
+        text = text.replace('\r\n', '\n').rstrip('\n')
+        if text:
+            self._enqueue(((text, None),), is_error)
+    
+    def _enqueue(self, segments, is_error):
+        self.pending.append((segments, is_error))
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+    
+    def _format(self, style, is_error):
+        if style is None:
+            return self.error_format if is_error else self.normal_format
+        key = (style, is_error)
+        char_format = self.formats.get(key)
+        if char_format is None:
+            color, bold, italic, underline, strike = style
+            char_format = QTextCharFormat()
+            if color:
+                char_format.setForeground(QColor(COLOR_HEX.get(color, color)))
+            elif is_error:
+                char_format.setForeground(QColor('#ff5555'))
+            if bold:
+                char_format.setFontWeight(QFont.Bold)
+            char_format.setFontItalic(italic)
+            char_format.setFontUnderline(underline)
+            char_format.setFontStrikeOut(strike)
+            self.formats[key] = char_format
+        return char_format
+    
+    def flush(self):
+        if not self.pending:
+            return
+        pending = self.pending
+        self.pending = []
+
+        # During bursts only the newest max_lines lines can survive anyway
+        kept = 0
+        for position in range(len(pending) - 1, -1, -1):
+            kept += sum(text.count('\n') for text, _ in pending[position][0]) + 1
+            if kept >= self.maximumBlockCount():
+                pending = pending[position:]
+                break
+
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        
+        # Insert runs of same-styled text in one call each
+        run = ['\n'] if not self.document().isEmpty() else []
+        run_format = self.normal_format
+        first = True
+        for segments, is_error in pending:
+            if not first:
+                run.append('\n')
+            first = False
+            for text, style in segments:
+                char_format = self._format(style, is_error)
+                if char_format is not run_format:
+                    if run:
+                        cursor.insertText(''.join(run), run_format)
+                    run = []
+                    run_format = char_format
+                run.append(text)
+        if run:
+            cursor.insertText(''.join(run), run_format)
+        cursor.endEditBlock()
+        
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
 class ServerControlPanel(QDialog):
     def __init__(self, server_path, parent=None):
         super().__init__(parent)
@@ -535,14 +662,13 @@ class ServerControlPanel(QDialog):
         self.parent_window = parent
         self.server_running = False
         
-        # Setup process signals first
-        self.process.readyReadStandardOutput.connect(self.handle_output)
-        self.process.readyReadStandardError.connect(self.handle_error)
+        # Setup process signals first; the hub is the only reader of process output
+        self.output_hub = ProcessOutputHub(self.process, self)
         self.process.finished.connect(self.handle_finished)
         
         # Register with web UI manager if parent window has one
         if hasattr(parent, 'webui_manager'):
-            print(f"Registering server panel for {server_path} with WebUIManager")
+            logger.debug("Registering server panel for %s with WebUIManager", server_path)
             parent.webui_manager.add_server_profile(server_path, self)
         
         self.setWindowTitle(f"Server Control - {os.path.basename(server_path)}")
@@ -571,6 +697,14 @@ class ServerControlPanel(QDialog):
         button_layout.addWidget(self.modrinth_btn)
         button_layout.addStretch()
         
+        # Resource usage, read from the web UI's process sampler
+        self.usage_label = QLabel("")
+        self.usage_label.setStyleSheet(Styles.LABEL)
+        button_layout.addWidget(self.usage_label)
+        self.usage_timer = QTimer(self)
+        self.usage_timer.timeout.connect(self.update_usage)
+        self.usage_timer.start(1000)
+        
         layout.addLayout(button_layout)
         
         # Add memory slider
@@ -595,53 +729,44 @@ class ServerControlPanel(QDialog):
         layout.addLayout(memory_layout)
         
         # Server console
-        self.console = QTextEdit()
-        self.console.setReadOnly(True)
+        self.console = ConsoleView(CONSOLE_MAX_LINES)
         self.console.setStyleSheet(Styles.CONSOLE)
         layout.addWidget(self.console)
+        self.output_hub.subscribe('console', self.handle_output)
         
         self.setLayout(layout)
     
-    def handle_output(self):
-        try:
-            data = self.process.readAllStandardOutput().data().decode('utf-8', errors='replace')
-            
-            # Update desktop UI console
-            if hasattr(self, 'console'):
-                self.console.append(data)
-            
-            # Send to web UI console if we have a parent with web UI
-            if hasattr(self.parent_window, 'webui_manager'):
-                webui = self.parent_window.webui_manager
-                if self.server_path in webui.console_buffers:
-                    for line in data.splitlines():
-                        if line.strip():  # Only add non-empty lines
-                            webui.console_buffers[self.server_path].add_line(line)
-                            # Also print for debugging
-                            print(f"Server output: {line}")
-        except Exception as e:
-            print(f"Error handling process output: {str(e)}")
-
-    def handle_error(self):
-        try:
-            data = self.process.readAllStandardError().data().decode('utf-8', errors='replace')
-            
-            # Update desktop UI console
-            if hasattr(self, 'console'):
-                self.console.append(f"<span style='color: #ff5555'>{data}</span>")
-            
-            # Send to web UI console if we have a parent with web UI
-            if hasattr(self.parent_window, 'webui_manager'):
-                webui = self.parent_window.webui_manager
-                if self.server_path in webui.console_buffers:
-                    for line in data.splitlines():
-                        if line.strip():  # Only add non-empty lines
-                            webui.console_buffers[self.server_path].add_line(f"[ERROR] {line}")
-                            # Also print for debugging
-                            print(f"Server error: {line}")
-        except Exception as e:
-            print(f"Error handling process error output: {str(e)}")
+    def handle_output(self, lines):
+        """Show a batch of process output lines in the desktop console"""
+        for line in lines:
+            self.console.append_line(line)
 
+    def update_usage(self):
+        """Show the latest sampled CPU and memory of the server process, its tick rate and ping"""
+        webui = getattr(self.parent_window, 'webui_manager', None)
+        sample = None
+        if webui is not None:
+            status, sample = webui.get_usage(self.server_path)
+        if sample is None:
+            self.usage_label.setText("")
+            return
+        cpu = f"{sample.cpu:.0f}%" if sample.cpu is not None else "–"
+        text = f"CPU {cpu} · RAM {sample.rss / 1024 / 1024:.0f} MB · {sample.threads} threads"
+        tick = webui.tick_health.get(self.server_path)
+        if tick is not None and tick.tps is not None:
+            text += f" · TPS {tick.tps:.1f}"
+        if tick is not None and tick.mspt is not None:
+            text += f" · MSPT {tick.mspt:.1f}"
+        state = webui.get_state(self.server_path)
+        if state.lagging:
+            text += " · ⚠ Lagging"
+        ping = webui.pinger.get(self.server_path)
+        if state.hung:
+            text += " · ⚠ Not responding"
+        elif ping is not None and ping.online:
+            text += f" · Ping {ping.latency:.0f} ms"
+        self.usage_label.setText(text)
+    
     def handle_finished(self):
         self.server_running = False
         
@@ -662,7 +787,7 @@ class ServerControlPanel(QDialog):
 
     def start_from_web(self):
         """Method to allow web UI to start the server"""
-        print("Server start requested from web UI")
+        logger.debug("Server start requested from web UI")
         if not self.server_running:
             self.toggle_server()
             return True
@@ -726,7 +851,7 @@ class ServerControlPanel(QDialog):
             if not self.server_running:
                 # Find Java path
                 java_path = self.find_java_path()
-                print(f"Starting server with Java path: {java_path}")
+                logger.debug("Starting server with Java path: %s", java_path)
                 
                 # Update UI if we have a power button
                 if hasattr(self, 'power_btn'):
@@ -740,18 +865,6 @@ class ServerControlPanel(QDialog):
                 
                 # Ensure process is connected to signal handlers
                 # Use try/except instead of the receivers() method
-                try:
-                    self.process.readyReadStandardOutput.disconnect(self.handle_output)
-                    self.process.readyReadStandardOutput.connect(self.handle_output)
-                except TypeError:
-                    self.process.readyReadStandardOutput.connect(self.handle_output)
-                    
-                try:
-                    self.process.readyReadStandardError.disconnect(self.handle_error)
-                    self.process.readyReadStandardError.connect(self.handle_error)
-                except TypeError:
-                    self.process.readyReadStandardError.connect(self.handle_error)
-                    
                 try:
                     self.process.finished.disconnect(self.handle_finished)
                     self.process.finished.connect(self.handle_finished)
@@ -760,11 +873,11 @@ class ServerControlPanel(QDialog):
                     
                 java_cmd = [f"-Xmx{memory}G", "-jar", "server.jar", "nogui"]
                 
-                print(f"Setting working directory: {self.server_path}")
+                logger.debug("Setting working directory: %s", self.server_path)
                 self.process.setWorkingDirectory(self.server_path)
                 
                 cmd_str = f"{java_path} {' '.join(java_cmd)}"
-                print(f"Starting process with command: {cmd_str}")
+                logger.info("Starting process with command: %s", cmd_str)
                 
                 # Add the command to both desktop UI and web UI console
                 if hasattr(self, 'console'):
@@ -780,12 +893,12 @@ class ServerControlPanel(QDialog):
                 self.process.start(java_path, java_cmd)
                 
                 self.server_running = True
-                print(f"Server marked as running: {self.server_path}")
+                logger.debug("Server marked as running: %s", self.server_path)
                 
                 return True
             else:
                 # Stop server
-                print(f"Stopping server: {self.server_path}")
+                logger.info("Stopping server: %s", self.server_path)
                 if hasattr(self, 'process') and self.process:
                     # Send stop command to server
                     stop_cmd = "stop\n"
@@ -810,9 +923,7 @@ class ServerControlPanel(QDialog):
                         
                     return True
         except Exception as e:
-            print(f"Error in toggle_server: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in toggle_server: %s", e)
             return False
     
     def open_config(self):
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import socket
+import time
+
+from utils import slp
+
+STATUS = {
+    'version': {'name': '1.20.4', 'protocol': 765},
+    'players': {'max': 20, 'online': 3},
+    'description': {'text': '§aA ', 'extra': [{'text': 'Minecraft'}, ' Server']},
+}
+
+
+async def serve_status(handler, check):
+    """Run check(port) against a stub server on a free loopback port"""
+    server = await asyncio.start_server(handler, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await check(port)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def status_server(pong=True, delay=0.0):
+    async def handler(reader, writer):
+        try:
+            packet_id, handshake = await slp.read_packet(reader)
+            assert packet_id == 0x00
+            # Protocol version -1 as an unsigned VarInt
+            assert slp.unpack_varint(handshake)[0] == slp.PROTOCOL_VERSION & 0xFFFFFFFF
+            assert await slp.read_packet(reader) == (0x00, b'')
+            await asyncio.sleep(delay)
+            writer.write(slp.pack_packet(0x00, slp.pack_string(json.dumps(STATUS))))
+            await writer.drain()
+            packet_id, payload = await slp.read_packet(reader)
+            if pong and packet_id == 0x01:
+                writer.write(slp.pack_packet(0x01, payload))
+                await writer.drain()
+            await reader.read()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    return handler
+
+
+def free_port():
+    """A loopback port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_varint_round_trip():
+    for value in (0, 1, 127, 128, 25565, 2 ** 31 - 1):
+        assert slp.unpack_varint(slp.pack_varint(value)) == (value, len(slp.pack_varint(value)))
+    # Negative numbers are sent as their 32 bit two's complement
+    assert slp.pack_varint(-1) == b'\xff\xff\xff\xff\x0f'
+
+
+def test_describe():
+    assert slp.describe('§6Gold §rplain') == 'Gold plain'
+    assert slp.describe(STATUS['description']) == 'A Minecraft Server'
+    assert slp.describe([{'text': 'a'}, 'b']) == 'ab'
+    assert slp.describe(None) == ''
+
+
+def test_status_reply():
+    result = asyncio.run(serve_status(status_server(), lambda port: slp.ping('127.0.0.1', port)))
+    assert result.online
+    assert result.motd == 'A Minecraft Server'
+    assert (result.players_online, result.players_max) == (3, 20)
+    assert (result.version, result.protocol) == ('1.20.4', 765)
+    assert result.latency is not None and result.latency >= 0
+
+
+def test_latency_from_pong():
+    # The status reply is slow but the pong is not, so the latency must come from the pong
+    handler = status_server(delay=0.3)
+    result = asyncio.run(serve_status(handler, lambda port: slp.ping('127.0.0.1', port)))
+    assert result.online
+    assert result.latency < 250
+
+
+def test_latency_without_pong():
+    # Servers that never answer the ping get the status round trip instead
+    handler = status_server(pong=False, delay=0.3)
+    started = time.perf_counter()
+    result = asyncio.run(serve_status(handler, lambda port: slp.ping('127.0.0.1', port, timeout=5)))
+    assert result.online
+    assert result.latency >= 250
+    assert time.perf_counter() - started < slp.PONG_TIMEOUT + 2
+
+
+def test_refused_connection():
+    try:
+        asyncio.run(slp.ping('127.0.0.1', free_port()))
+    except OSError:
+        pass
+    else:
+        raise AssertionError("ping of a closed port succeeded")
+
+
+def test_ping_one_backs_off_to_max():
+    address = ('127.0.0.1', free_port())
+    pinger = slp.ServerPinger(lambda: {'server': address}, interval=1.0, timeout=1.0, max_backoff=5.0)
+
+    async def ping_repeatedly():
+        delays = []
+        for _ in range(5):
+            path, result = await pinger.ping_one('server', address)
+            assert path == 'server' and not result.online and result.error
+            delays.append(pinger.next_ping['server'] - time.monotonic())
+        return delays, result
+
+    delays, result = asyncio.run(ping_repeatedly())
+    assert [round(delay) for delay in delays] == [1, 2, 4, 5, 5]
+    assert result.failures == 5 == pinger.failures['server']
+
+
+def test_ping_one_success_resets_backoff():
+    pinger = slp.ServerPinger(lambda: {}, interval=1.0, max_backoff=5.0)
+    pinger.failures['server'] = 3
+
+    async def check(port):
+        return await pinger.ping_one('server', ('127.0.0.1', port))
+
+    path, result = asyncio.run(serve_status(status_server(), check))
+    assert result.online and result.failures == 0
+    assert pinger.failures['server'] == 0
+    assert round(pinger.next_ping['server'] - time.monotonic()) == 1
@@ -0,0 +1,89 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Fingerprinted URLs never change content, so browsers may keep them for a year
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 256
+
+
+class Asset:
+    """One static file, read, hashed and compressed once"""
+    def __init__(self, name, data):
+        self.name = name
+        self.digest = hashlib.sha256(data).hexdigest()[:12]
+        base, ext = os.path.splitext(name)
+        self.url_name = f"{base}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if self.mimetype.startswith('text/') or self.mimetype in ('application/javascript', 'application/json'):
+            self.mimetype += '; charset=utf-8'
+        self.variants = {'identity': data}
+        if len(data) >= MIN_COMPRESS_BYTES:
+            compressed = gzip.compress(data, 9, mtime=0)
+            if len(compressed) < len(data):
+                self.variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    self.variants['br'] = compressed
+
+    def select(self, accept_encodings):
+        """Return (encoding, body) for the smallest variant the client accepts"""
+        best = 'identity'
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding] > 0:
+                if len(self.variants[encoding]) < len(self.variants[best]):
+                    best = encoding
+        return best, self.variants[best]
+
+
+class StaticAssets:
+    """Static files served under fingerprinted URLs.
+
+    Everything is loaded and precompressed at startup; templates link to
+    url(name), which changes whenever the file's content does.
+    """
+    def __init__(self, directory=None, prefix='/static/'):
+        self.prefix = prefix
+        self.by_name = {}  # Logical name -> Asset
+        self.by_url = {}   # Fingerprinted name -> Asset
+        if directory and os.path.isdir(directory):
+            self.load(directory)
+
+    def load(self, directory):
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, directory).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    self.add(name, f.read())
+        logger.debug("Loaded %d static assets from %s", len(self.by_name), directory)
+
+    def add(self, name, data):
+        """Register an asset from memory, e.g. generated CSS"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        asset = Asset(name, data)
+        previous = self.by_name.get(name)
+        if previous:
+            self.by_url.pop(previous.url_name, None)
+        self.by_name[name] = asset
+        self.by_url[asset.url_name] = asset
+        return asset
+
+    def url(self, name):
+        return self.prefix + self.by_name[name].url_name
+
+    def get(self, url_name):
+        return self.by_url.get(url_name)
@@ -0,0 +1,330 @@
+import asyncio
+import io
+import logging
+import socket
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class Request:
+    """A parsed HTTP request as seen by native async handlers"""
+    def __init__(self, method, path, query_string, version, headers, body, remote_addr):
+        self.method = method
+        self.path = path
+        self.query_string = query_string
+        self.version = version
+        self.headers = headers  # Lower-case name -> value
+        self.body = body
+        self.remote_addr = remote_addr
+        self.args = {name: values[0] for name, values in parse_qs(query_string, keep_blank_values=True).items()}
+
+    def arg(self, name, default=None, type=None):
+        """Query argument like Flask's request.args.get(name, default, type)"""
+        value = self.args.get(name)
+        if value is None:
+            return default
+        if type is None:
+            return value
+        try:
+            return type(value)
+        except (TypeError, ValueError):
+            return default
+
+    def header(self, name, default=None):
+        return self.headers.get(name.lower(), default)
+
+
+class Response:
+    """A complete response from a native handler"""
+    def __init__(self, body=b'', status=200, content_type='application/json', headers=None):
+        self.body = body.encode('utf-8') if isinstance(body, str) else body
+        self.status = status
+        self.headers = [('Content-Type', content_type)] + list(headers or [])
+
+
+class StreamResponse:
+    """A response whose body is produced by an async iterator of str/bytes chunks"""
+    def __init__(self, chunks, status=200, content_type='text/event-stream', headers=None):
+        self.chunks = chunks
+        self.status = status
+        self.headers = [('Content-Type', content_type)] + list(headers or [])
+
+
+def status_line(status):
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ''
+    return f"HTTP/1.1 {status} {reason}\r\n"
+
+
+class Connection:
+    def __init__(self, task=None):
+        self.task = task
+        self.idle = True
+
+
+class AsyncHTTPServer:
+    """HTTP/1.1 server running on a single asyncio event loop.
+
+    Native async handlers (streams, long-polls) run on the loop itself and
+    hold no thread while they wait, so thousands of idle or streaming
+    connections cost only memory. Every other request is handed to the
+    WSGI app on a small thread pool.
+    """
+    def __init__(self, host, port, wsgi_app, routes=None, workers=8, backlog=128,
+                 keep_alive=True, request_timeout=30, shutdown_timeout=5):
+        self.host = host
+        self.port = port
+        self.wsgi_app = wsgi_app
+        self.routes = dict(routes or {})  # Path -> async handler(request)
+        self.keep_alive = keep_alive
+        self.request_timeout = request_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.connections = set()
+        self.loop = asyncio.new_event_loop()
+        self.stopping = None
+        self.stop_requested = False
+        self.stopped = threading.Event()
+
+        # Bind now so a busy port is reported to the caller
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        # IPPROTO_TCP so asyncio turns Nagle off on accepted connections; otherwise each
+        # keep-alive response waits for the client's delayed ACK
+        self.sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind((host, port))
+            self.sock.listen(backlog)
+            self.sock.setblocking(False)
+        except OSError:
+            self.sock.close()
+            raise
+        self.backlog = backlog
+
+    def serve_forever(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        finally:
+            self.executor.shutdown(wait=False)
+            self.loop.close()
+            self.stopped.set()
+
+    def shutdown(self):
+        """Stop accepting, finish in-flight requests and end idle connections"""
+        try:
+            self.loop.call_soon_threadsafe(self._request_stop)
+        except RuntimeError:
+            return  # Loop already closed
+        self.stopped.wait(self.shutdown_timeout + 1)
+
+    def _request_stop(self):
+        self.stop_requested = True
+        if self.stopping:
+            self.stopping.set()
+
+    async def _serve(self):
+        self.stopping = asyncio.Event()
+        server = await asyncio.start_server(self._accept, sock=self.sock, limit=MAX_HEADER_BYTES,
+                                            backlog=self.backlog)
+        if not self.stop_requested:
+            await self.stopping.wait()
+        server.close()
+        await server.wait_closed()
+
+        # Idle keep-alive connections can go at once; busy ones get a grace period
+        for connection in list(self.connections):
+            if connection.idle:
+                connection.task.cancel()
+        tasks = [connection.task for connection in self.connections]
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=self.shutdown_timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending, timeout=1)
+
+    async def _accept(self, reader, writer):
+        connection = Connection()
+        connection.task = asyncio.ensure_future(self._serve_connection(reader, writer, connection))
+        self.connections.add(connection)
+        try:
+            await connection.task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.connections.discard(connection)
+            writer.close()
+
+    async def _serve_connection(self, reader, writer, connection):
+        sock = writer.get_extra_info('socket')
+        if sock is not None and sock.family != socket.AF_UNIX:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        peer = writer.get_extra_info('peername')
+        remote_addr = peer[0] if peer else ''
+        while not self.stopping.is_set():
+            connection.idle = True
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.request_timeout)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                return
+            connection.idle = False
+
+            try:
+                request = await self._read_request(head, reader, writer, remote_addr)
+            except ValueError as e:
+                await self._send(writer, None, Response(str(e), 400, 'text/plain'), False)
+                return
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                return
+
+            keep_alive = (self.keep_alive and request.version == 'HTTP/1.1'
+                          and request.header('connection', '').lower() != 'close')
+            try:
+                handler = self.routes.get(request.path)
+                if handler:
+                    response = await handler(request)
+                else:
+                    response = await self.loop.run_in_executor(self.executor, self._call_wsgi, request)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error handling %s %s", request.method, request.path)
+                response = Response('Internal Server Error', 500, 'text/plain')
+                keep_alive = False
+
+            try:
+                keep_alive = await self._send(writer, request, response, keep_alive)
+            except (asyncio.TimeoutError, ConnectionError):
+                return
+            if not keep_alive:
+                return
+
+    async def _read_request(self, head, reader, writer, remote_addr):
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise ValueError("Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, sep, value = line.partition(':')
+            if not sep:
+                raise ValueError("Malformed header")
+            headers[name.strip().lower()] = value.strip()
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            raise ValueError("Chunked request bodies are not supported")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise ValueError("Invalid Content-Length")
+        if length < 0 or length > MAX_BODY_BYTES:
+            raise ValueError("Request body too large")
+        body = b''
+        if length:
+            if headers.get('expect', '').lower() == '100-continue':
+                writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+            body = await asyncio.wait_for(reader.readexactly(length), self.request_timeout)
+
+        path, _, query_string = target.partition('?')
+        return Request(method.upper(), path, query_string, version, headers, body, remote_addr)
+
+    def _call_wsgi(self, request):
+        """Run the WSGI app for one request; called on the thread pool"""
+        environ = {
+            'REQUEST_METHOD': request.method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': unquote(request.path, 'latin-1'),
+            'QUERY_STRING': request.query_string,
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': str(self.port),
+            'SERVER_PROTOCOL': request.version,
+            'REMOTE_ADDR': request.remote_addr,
+            'CONTENT_TYPE': request.headers.get('content-type', ''),
+            'CONTENT_LENGTH': str(len(request.body)) if request.body else '',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(request.body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in request.headers.items():
+            if name not in ('content-type', 'content-length'):
+                environ['HTTP_' + name.upper().replace('-', '_')] = value
+
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = headers
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            body = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        response = Response(body, started['status'])
+        response.headers = list(started['headers'])
+        return response
+
+    async def _send(self, writer, request, response, keep_alive):
+        """Write a response; returns whether the connection may be reused"""
+        head = [status_line(response.status)]
+        for name, value in response.headers:
+            if name.lower() in ('connection', 'transfer-encoding', 'content-length'):
+                continue
+            head.append(f"{name}: {value}\r\n")
+        head.append('Connection: keep-alive\r\n' if keep_alive else 'Connection: close\r\n')
+        head_only = request is not None and request.method == 'HEAD'
+
+        if isinstance(response, StreamResponse):
+            head.append('Transfer-Encoding: chunked\r\n\r\n')
+            writer.write(''.join(head).encode('latin-1'))
+            await asyncio.wait_for(writer.drain(), self.request_timeout)
+            chunks = response.chunks
+            try:
+                async for chunk in chunks:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode('utf-8')
+                    if chunk:
+                        writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                        # A client that stops reading is dropped rather than buffered for
+                        await asyncio.wait_for(writer.drain(), self.request_timeout)
+                writer.write(b'0\r\n\r\n')
+                await asyncio.wait_for(writer.drain(), self.request_timeout)
+            finally:
+                if hasattr(chunks, 'aclose'):
+                    await chunks.aclose()
+            return keep_alive
+
+        if response.status in (204, 304):
+            head.append('\r\n')
+        elif head_only:
+            # Report the length a GET would have had, as the app computed it
+            length = next((value for name, value in response.headers if name.lower() == 'content-length'), 0)
+            head.append(f"Content-Length: {length}\r\n\r\n")
+        else:
+            head.append(f"Content-Length: {len(response.body)}\r\n\r\n")
+        # Head and body in one write, so they leave in one segment
+        data = ''.join(head).encode('latin-1')
+        if response.body and not head_only and response.status not in (204, 304):
+            data += response.body
+        writer.write(data)
+        await asyncio.wait_for(writer.drain(), self.request_timeout)
+        return keep_alive
@@ -0,0 +1,52 @@
+import gzip
+import zlib
+
+# Responses smaller than this are sent as they are; compressing them saves less than the headers cost
+MIN_COMPRESS_BYTES = 1024
+COMPRESS_LEVEL = 6
+
+# Only text-like bodies are worth compressing
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+
+def choose_encoding(accept_encodings):
+    """Pick gzip or deflate from a werkzeug Accept-Encoding header, or None"""
+    best = None
+    best_quality = 0
+    for encoding in ('gzip', 'deflate'):
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_response(response, accept_encodings, min_size=MIN_COMPRESS_BYTES, level=COMPRESS_LEVEL):
+    """Compress a finished Flask response in place if the client accepts it and it is worth it"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers):
+        return response
+    if not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+
+    if encoding == 'gzip':
+        body = gzip.compress(body, level, mtime=0)
+    else:
+        body = zlib.compress(body, level)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+
+    # The encoded bytes differ from what a strong ETag promised; If-None-Match
+    # compares weakly, so conditional requests keep matching
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
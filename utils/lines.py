@@ -0,0 +1,85 @@
+import codecs
+import time
+
+# A line that never ends is emitted in pieces of this size rather than buffered forever
+MAX_LINE_BYTES = 1024 * 1024
+
+
+class LineAssembler:
+    """Turns a stream of byte chunks into complete text lines.
+
+    Bytes after the last newline of a chunk are carried over in a bytearray
+    until the rest of the line arrives, so lines and multibyte characters
+    split across reads come out whole. Each line is stamped with the arrival
+    time of its first byte.
+    """
+    def __init__(self, encoding='utf-8', errors='replace', max_line_bytes=MAX_LINE_BYTES, skip_blank=True):
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors)
+        self.max_line_bytes = max_line_bytes
+        self.skip_blank = skip_blank
+        self.carry = bytearray()
+        self.carry_since = None  # Arrival time of the first carried byte
+
+    def __len__(self):
+        return len(self.carry)
+
+    def feed(self, data, timestamp=None):
+        """Add a chunk and return [(timestamp, line), ...] for every line it completes"""
+        if not data:
+            return []
+        now = time.time() if timestamp is None else timestamp
+        end = data.rfind(b'\n') + 1
+
+        if not end:
+            if not self.carry:
+                self.carry_since = now
+            self.carry += data
+            if len(self.carry) >= self.max_line_bytes:
+                return self._split(self._take_carry(), self.carry_since, now, final=False)
+            return []
+
+        if self.carry:
+            # Only the tail of the carried line needs joining; the rest of
+            # the chunk is decoded straight from the caller's buffer
+            first = data.find(b'\n') + 1
+            self.carry += data[:first]
+            since = self.carry_since
+            lines = self._split(self._take_carry(), since, since, final=False)
+            if first < end:
+                lines.extend(self._split(memoryview(data)[first:end], now, now, final=False))
+        else:
+            lines = self._split(memoryview(data)[:end], now, now, final=False)
+
+        if end < len(data):
+            self.carry += data[end:]
+            self.carry_since = now
+        return lines
+
+    def flush(self, timestamp=None):
+        """Return the unterminated last line, if any, and reset the decoder"""
+        now = time.time() if timestamp is None else timestamp
+        since = self.carry_since or now
+        return self._split(self._take_carry(), since, now, final=True)
+
+    def _take_carry(self):
+        data = bytes(self.carry)
+        self.carry.clear()
+        return data
+
+    def _split(self, data, first_ts, rest_ts, final):
+        text = self.decoder.decode(data, final)
+        if not text:
+            return []
+        lines = text.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        if '\r' in text:
+            # Drop CRLF endings; progress output that redraws a line in place keeps what was drawn last
+            lines = [line.rstrip('\r').rsplit('\r', 1)[-1] for line in lines]
+        first = lines[0] if lines else ''
+        if self.skip_blank:
+            lines = [line for line in lines if line.strip()]
+        result = [(rest_ts, line) for line in lines]
+        if result and first_ts != rest_ts and result[0][1] is first:
+            result[0] = (first_ts, first)
+        return result
@@ -0,0 +1,112 @@
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+# Logger hierarchies that belong to the manager and can be tuned at runtime
+MANAGER_LOGGERS = ('gui', 'utils', 'werkzeug')
+LEVEL_NAMES = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+LOG_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(level=logging.INFO, stream=None):
+    """Route all logging through a queue so callers never wait on terminal I/O.
+
+    Records are put on an unbounded in-memory queue by a QueueHandler and
+    written by a QueueListener thread. Safe to call more than once.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        records = queue.SimpleQueue() if hasattr(queue, 'SimpleQueue') else queue.Queue()
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(logging.Formatter(LOG_FORMAT, '%H:%M:%S'))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(records))
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def queue_depth():
+    """Records waiting to be written by the logging thread"""
+    listener = _listener
+    return listener.queue.qsize() if listener is not None else 0
+
+
+def get_levels():
+    """Return {logger name: level name} for the root logger and every manager logger"""
+    levels = {'root': logging.getLevelName(logging.getLogger().level)}
+    for name in sorted(logging.root.manager.loggerDict):
+        if name.split('.', 1)[0] in MANAGER_LOGGERS:
+            logger = logging.getLogger(name)
+            levels[name] = logging.getLevelName(logger.getEffectiveLevel())
+    return levels
+
+
+def set_level(name, level):
+    """Change a logger's level at runtime; raises ValueError for unknown names"""
+    level = str(level).upper()
+    if level not in LEVEL_NAMES:
+        raise ValueError(f"Unknown log level: {level}")
+    if name in ('', 'root'):
+        logger = logging.getLogger()
+    elif name.split('.', 1)[0] in MANAGER_LOGGERS:
+        logger = logging.getLogger(name)
+    else:
+        raise ValueError(f"Unknown logger: {name}")
+    logger.setLevel(level)
+    return logging.getLevelName(logger.getEffectiveLevel())
+
+
+class OutputTracer:
+    """Rate-limited debug tracing of server output lines.
+
+    Costs one isEnabledFor() check per batch while debug logging is off;
+    when it is on, at most per_second lines are logged and the rest are
+    summarised as a count.
+    """
+    def __init__(self, logger, per_second=20):
+        self.logger = logger
+        self.per_second = per_second
+        self.tokens = float(per_second)
+        self.updated = time.monotonic()
+        self.suppressed = 0
+        self.lock = threading.Lock()
+
+    def trace(self, server, lines):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.per_second, self.tokens + (now - self.updated) * self.per_second)
+            self.updated = now
+            allowed = min(int(self.tokens), len(lines))
+            self.tokens -= allowed
+            if allowed and self.suppressed:
+                self.logger.debug("%s: %d output lines not traced", server, self.suppressed)
+                self.suppressed = 0
+            self.suppressed += len(lines) - allowed
+        for line in lines[:allowed]:
+            self.logger.debug("%s %s: %s", server, line.stream, line.text)
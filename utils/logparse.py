@@ -0,0 +1,130 @@
+import re
+
+# Severity order used for "this level and above" filters
+LEVEL_RANKS = {'trace': 0, 'debug': 1, 'info': 2, 'warn': 3, 'error': 4}
+LEVEL_ALIASES = {'warning': 'warn', 'severe': 'error', 'fatal': 'error', 'err': 'error'}
+
+ANSI_PATTERN = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+# [12:00:00] [Server thread/INFO]: message
+# [12:00:00] [Server thread/INFO] [net.minecraft.server.MinecraftServer/]: message  (Forge)
+# [12:00:00] [main/INFO] (FabricLoader) message                                    (Fabric)
+# [02Jan2024 12:00:00.123] [Server thread/INFO] [minecraft/DedicatedServer]: message
+LOG4J_PATTERN = re.compile(
+    r'^\[(?P<time>[^\]]+)\] \[(?P<thread>[^\]]+)/(?P<level>[A-Za-z]+)\]'
+    r'(?: \[(?P<logger>[^\]]*)\]| \((?P<logger_paren>[^)]*)\))?:? ?(?P<message>.*)$'
+)
+
+# [12:00:00 INFO]: [Essentials] message  (Paper/Spigot console)
+PAPER_PATTERN = re.compile(
+    r'^\[(?P<time>\d{1,2}:\d{2}:\d{2}) (?P<level>[A-Za-z]+)\]:? ?'
+    r'(?:\[(?P<logger>[^\]]+)\] )?(?P<message>.*)$'
+)
+
+# Loggers Forge prints for the game's own messages
+GAME_LOGGERS = ('minecraft/', 'net.minecraft.')
+
+# Stack trace and other lines that belong to the entry before them
+CONTINUATION_PATTERN = re.compile(
+    r'^(?:\s|Caused by: |Suppressed: |[\w.$]+(?:Exception|Error|Throwable)\b)'
+)
+
+
+def normalize_level(name):
+    """Map a level name to one of LEVEL_RANKS, or None if it is not one"""
+    if not name:
+        return None
+    name = name.strip().lower()
+    name = LEVEL_ALIASES.get(name, name)
+    return name if name in LEVEL_RANKS else None
+
+
+def level_rank(name):
+    level = normalize_level(name)
+    return LEVEL_RANKS[level] if level else None
+
+
+class LogEntry:
+    """A console line split into its log fields"""
+    __slots__ = ('time', 'thread', 'level', 'logger', 'message')
+
+    def __init__(self, time, thread, level, logger, message):
+        self.time = time
+        self.thread = thread
+        self.level = level
+        self.logger = logger
+        self.message = message
+
+    @property
+    def rank(self):
+        return LEVEL_RANKS.get(self.level, LEVEL_RANKS['info'])
+
+    def to_dict(self):
+        return {
+            'time': self.time,
+            'thread': self.thread,
+            'level': self.level,
+            'logger': self.logger,
+            'message': self.message,
+        }
+
+
+def match_line(text):
+    """Return a LogEntry for a line in a known log format, else None"""
+    if '\x1b' in text:
+        text = ANSI_PATTERN.sub('', text)
+    match = LOG4J_PATTERN.match(text)
+    if match:
+        logger = match.group('logger') or match.group('logger_paren')
+        return LogEntry(match.group('time'), match.group('thread'),
+                        normalize_level(match.group('level')) or 'info', logger, match.group('message'))
+    match = PAPER_PATTERN.match(text)
+    if match:
+        level = normalize_level(match.group('level'))
+        if level:
+            return LogEntry(match.group('time'), None, level, match.group('logger'), match.group('message'))
+    return None
+
+
+def is_game_entry(entry, threads=('Server thread',)):
+    """Whether a match_line() entry was logged by the game itself on a thread starting with one of threads.
+
+    Plugins and /say ("[Server] ...") do not count. Paper's console format
+    has no thread; vanilla and Fabric name no logger, Forge names the
+    game's own.
+    """
+    if entry is None:
+        return False
+    if entry.thread is not None and not entry.thread.startswith(threads):
+        return False
+    return entry.logger is None or entry.logger.startswith(GAME_LOGGERS)
+
+
+def parse_level(text, stream='stdout'):
+    """Level of a single line without any context"""
+    entry = match_line(text)
+    if entry:
+        return entry.level
+    return 'error' if stream == 'stderr' else 'info'
+
+
+class LogParser:
+    """Parses the console lines of one server process.
+
+    Lines that do not match a known format but continue the previous entry
+    (stack traces) inherit its level and thread, so filtering keeps them
+    together.
+    """
+    def __init__(self):
+        self.last = {}  # Stream -> last parsed LogEntry
+
+    def parse(self, text, stream='stdout'):
+        entry = match_line(text)
+        if entry:
+            self.last[stream] = entry
+            return entry
+
+        previous = self.last.get(stream)
+        if previous and CONTINUATION_PATTERN.match(text):
+            return LogEntry(previous.time, previous.thread, previous.level, previous.logger, text)
+        return LogEntry(None, None, 'error' if stream == 'stderr' else 'info', None, text)
@@ -0,0 +1,462 @@
+import atexit
+import bisect
+import gzip
+import logging
+import os
+import shutil
+import struct
+import threading
+import time
+from collections import deque
+
+from utils.search import SearchIndex, tokenize, level_tokens
+
+logger = logging.getLogger(__name__)
+
+# Segment tuning
+SEGMENT_BYTES = 8 * 1024 * 1024  # Rotate the active segment after this many bytes
+INDEX_EVERY = 256                # Lines between sparse index entries
+KEEP_SEGMENTS = 64               # Oldest segments beyond this are deleted
+FLUSH_INTERVAL = 0.2             # Seconds the writer waits between batches
+
+# Index entries are (byte offset, timestamp) for every INDEX_EVERY-th line
+INDEX_ENTRY = struct.Struct('<Qd')
+
+STREAM_CODES = {'stdout': 'o', 'stderr': 'e'}
+STREAM_NAMES = {'o': 'stdout', 'e': 'stderr'}
+
+
+class LogRecord:
+    __slots__ = ('timestamp', 'stream', 'text')
+
+    def __init__(self, timestamp, stream, text):
+        self.timestamp = timestamp
+        self.stream = stream
+        self.text = text
+
+    def to_dict(self):
+        return {'time': self.timestamp, 'stream': self.stream, 'text': self.text}
+
+
+def encode_record(timestamp, stream, text):
+    text = text.replace('\n', ' ')
+    return f"{timestamp:.3f}\t{STREAM_CODES.get(stream, 'o')}\t{text}\n".encode('utf-8', errors='replace')
+
+
+def decode_record(raw):
+    parts = raw.decode('utf-8', errors='replace').rstrip('\n').split('\t', 2)
+    if len(parts) != 3:
+        return None
+    try:
+        return LogRecord(float(parts[0]), STREAM_NAMES.get(parts[1], 'stdout'), parts[2])
+    except ValueError:
+        return None
+
+
+class Segment:
+    """One segment file plus its sparse offset index"""
+    def __init__(self, directory, number):
+        self.number = number
+        self.base = os.path.join(directory, f"{number:08d}")
+        self.index = []       # (offset, timestamp) for every INDEX_EVERY-th line
+        self.timestamps = []  # Timestamps of the index entries, for bisecting
+        self.lines = 0
+        self.size = 0
+
+    @property
+    def log_path(self):
+        return self.base + '.log'
+
+    @property
+    def gz_path(self):
+        return self.base + '.log.gz'
+
+    @property
+    def index_path(self):
+        return self.base + '.idx'
+
+    @property
+    def postings_path(self):
+        return self.base + '.tok'
+
+    @property
+    def compressed(self):
+        return not os.path.exists(self.log_path) and os.path.exists(self.gz_path)
+
+    @property
+    def first_timestamp(self):
+        return self.timestamps[0] if self.timestamps else None
+
+    def load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        self.index = [INDEX_ENTRY.unpack_from(data, pos) for pos in range(0, usable, INDEX_ENTRY.size)]
+        self.timestamps = [ts for _, ts in self.index]
+
+    def count_lines(self, index_every):
+        """Work out the line count from the index and the lines after its last entry"""
+        if not self.index:
+            return 0
+        with self.open_reader() as f:
+            f.seek(self.index[-1][0])
+            tail = sum(1 for raw in f if raw.endswith(b'\n'))
+        self.lines = (len(self.index) - 1) * index_every + tail
+        return self.lines
+
+    def open_reader(self):
+        if self.compressed:
+            return gzip.open(self.gz_path, 'rb')
+        return open(self.log_path, 'rb')
+
+    def read_from(self, entry):
+        """Yield records starting at index entry number entry"""
+        if not self.index:
+            return
+        offset = self.index[entry][0]
+        with self.open_reader() as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break  # Partially written line
+                record = decode_record(raw)
+                if record:
+                    yield record
+
+    def scan(self):
+        """Yield (offset, record) for every complete line"""
+        offset = 0
+        with self.open_reader() as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                record = decode_record(raw)
+                if record:
+                    yield offset, record
+                offset += len(raw)
+
+    def read_at(self, offsets):
+        """Yield the records starting at the given ascending offsets"""
+        with self.open_reader() as f:
+            for offset in offsets:
+                f.seek(offset)
+                record = decode_record(f.readline())
+                if record:
+                    yield record
+
+    def offset_range(self, start=None, end=None):
+        """Byte range that can hold lines between start and end, from the sparse index"""
+        low, high = 0, None
+        if start is not None and self.timestamps:
+            entry = bisect.bisect_right(self.timestamps, start) - 1
+            if entry > 0:
+                low = self.index[entry][0]
+        if end is not None and self.timestamps:
+            entry = bisect.bisect_right(self.timestamps, end)
+            if entry < len(self.index):
+                high = self.index[entry][0]
+        return low, high
+
+
+class ConsoleLog:
+    """Persistent console history for one server profile.
+
+    append() only queues the line; a background thread writes batches to
+    rotating segment files, keeps a sparse offset index next to each one and
+    gzips segments once they are full.
+    """
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES, index_every=INDEX_EVERY,
+                 keep_segments=KEEP_SEGMENTS, searchable=True):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.index_every = index_every
+        self.keep_segments = keep_segments
+        self.pending = deque()
+        self.segments = []
+        self.lock = threading.Lock()  # Guards self.segments and line counts
+        self.write_lock = threading.Lock()  # Serialises the writer and flush()
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.active_file = None
+        self.index_file = None
+        self.search_index = SearchIndex() if searchable else None
+        self.unindexed = deque()  # Sealed segments still waiting for postings
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_segments()
+
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def append(self, line, stream='stdout', timestamp=None, level=None):
+        """Queue a line for writing; never touches the disk.
+        
+        level is the parsed log level if the caller already knows it; it is
+        used for the search index and not stored in the segment.
+        """
+        self.pending.append((timestamp or time.time(), stream, line, level))
+
+    # Writer side
+
+    def _load_segments(self):
+        numbers = set()
+        for name in os.listdir(self.directory):
+            stem = name.split('.', 1)[0]
+            if stem.isdigit() and (name.endswith('.log') or name.endswith('.log.gz')):
+                numbers.add(int(stem))
+        for number in sorted(numbers):
+            segment = Segment(self.directory, number)
+            segment.load_index()
+            segment.lines = None  # Counted on first use
+            self.segments.append(segment)
+
+        if self.segments and not self.segments[-1].compressed:
+            self._resume_active(self.segments[-1])
+        else:
+            self._open_segment(self.segments[-1].number + 1 if self.segments else 1)
+
+    def _resume_active(self, segment):
+        segment.size = os.path.getsize(segment.log_path)
+        segment.count_lines(self.index_every)
+        self.active_file = open(segment.log_path, 'ab')
+        self.index_file = open(segment.index_path, 'ab')
+
+    def _open_segment(self, number):
+        segment = Segment(self.directory, number)
+        self.active_file = open(segment.log_path, 'ab')
+        self.index_file = open(segment.index_path, 'ab')
+        with self.lock:
+            self.segments.append(segment)
+
+    def _prepare_search_index(self):
+        # The active segment must be indexed before anything new is written to it
+        with self.write_lock:
+            for segment in self.segments[:-1]:
+                if not os.path.exists(segment.postings_path):
+                    self.unindexed.append(segment)
+            self.search_index.rebuild(self.segments[-1], active=True)
+
+    def _writer(self):
+        if self.search_index:
+            try:
+                self._prepare_search_index()
+            except Exception as e:
+                logger.error("Error indexing console log %s: %s", self.directory, e)
+        while not self.closed:
+            self.wakeup.wait(FLUSH_INTERVAL)
+            self.wakeup.clear()
+            try:
+                self._drain()
+                # Catch up on old segments one at a time between batches
+                if self.unindexed and not self.pending:
+                    segment = self.unindexed.popleft()
+                    if segment in self.segments:
+                        self.search_index.rebuild(segment)
+            except Exception as e:
+                logger.error("Error writing console log %s: %s", self.directory, e)
+
+    def _drain(self):
+        with self.write_lock:
+            while self.pending:
+                segment = self.segments[-1]
+                full, written = self._write_batch()
+                if self.search_index:
+                    for offset, timestamp, stream, line, level in written:
+                        self.search_index.add(segment, offset, timestamp, stream, line, level)
+                if full:
+                    self._rotate()
+
+    def _write_batch(self):
+        """Write queued lines to the active segment.
+        
+        Returns (full, written) where written lists (offset, timestamp, stream, line, level).
+        """
+        with self.lock:
+            segment = self.segments[-1]
+            chunks = []
+            written = []
+            index_entries = []
+            offset = segment.size
+            while self.pending and offset < self.segment_bytes:
+                timestamp, stream, line, level = self.pending.popleft()
+                raw = encode_record(timestamp, stream, line)
+                if segment.lines % self.index_every == 0:
+                    index_entries.append((offset, timestamp))
+                chunks.append(raw)
+                written.append((offset, timestamp, stream, line, level))
+                offset += len(raw)
+                segment.lines += 1
+
+            self.active_file.write(b''.join(chunks))
+            self.active_file.flush()
+            if index_entries:
+                self.index_file.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in index_entries))
+                self.index_file.flush()
+                segment.index.extend(index_entries)
+                segment.timestamps.extend(ts for _, ts in index_entries)
+            segment.size = offset
+            return offset >= self.segment_bytes, written
+
+    def _rotate(self):
+        sealed = self.segments[-1]
+        self.active_file.close()
+        self.index_file.close()
+        self._open_segment(sealed.number + 1)
+        if self.search_index:
+            self.search_index.seal(sealed)
+        self._compress(sealed)
+        self._prune()
+
+    def _compress(self, segment):
+        # Readers may hold the plain file open; the gz appears before it goes away
+        tmp_path = segment.gz_path + '.tmp'
+        try:
+            with open(segment.log_path, 'rb') as src, gzip.open(tmp_path, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(tmp_path, segment.gz_path)
+            os.remove(segment.log_path)
+        except OSError as e:
+            # The plain segment stays readable; it is simply not compressed
+            logger.error("Error compressing console log segment %s: %s", segment.log_path, e)
+
+    def _prune(self):
+        with self.lock:
+            expired = self.segments[:-self.keep_segments] if len(self.segments) > self.keep_segments else []
+            self.segments = self.segments[len(expired):]
+        for segment in expired:
+            if self.search_index:
+                self.search_index.drop(segment)
+            for path in (segment.log_path, segment.gz_path, segment.index_path, segment.postings_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def flush(self):
+        """Write everything queued so far (blocks the caller)"""
+        self._drain()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.wakeup.set()
+        self.thread.join(timeout=2)
+        try:
+            self._drain()
+        finally:
+            with self.lock:
+                self.active_file.close()
+                self.index_file.close()
+
+    # Reader side
+
+    def tail(self, count):
+        """Return the last count records, newest last"""
+        if count <= 0:
+            return []
+        # Snapshot the queue and the line counts together so nothing is counted twice
+        with self.lock:
+            pending = list(self.pending)
+            segments = list(self.segments)
+            lines = {segment.number: segment.lines for segment in segments}
+        records = [LogRecord(ts, stream, line) for ts, stream, line, _ in pending[-count:]]
+
+        for segment in reversed(segments):
+            wanted = count - len(records)
+            if wanted <= 0:
+                break
+            total = lines[segment.number]
+            if total is None:
+                total = segment.count_lines(self.index_every)
+            if total == 0 or not segment.index:
+                continue
+            first = max(total - wanted, 0)
+            entry = min(first // self.index_every, len(segment.index) - 1)
+            skip = first - entry * self.index_every
+            chunk = []
+            for record in segment.read_from(entry):
+                if skip:
+                    skip -= 1
+                    continue
+                chunk.append(record)
+                if len(chunk) >= total - first:
+                    break
+            records = chunk + records
+        return records[-count:]
+
+    def since(self, timestamp, limit=1000):
+        """Return up to limit records written at or after timestamp, oldest first"""
+        with self.lock:
+            pending = list(self.pending)
+            segments = [segment for segment in self.segments if segment.index]
+            lines = {segment.number: segment.lines for segment in segments}
+
+        # The last segment that started before timestamp may still hold matches
+        starts = [segment.first_timestamp for segment in segments]
+        first = max(bisect.bisect_right(starts, timestamp) - 1, 0)
+
+        records = []
+        for position, segment in enumerate(segments[first:]):
+            entry = 0
+            if position == 0:
+                entry = max(bisect.bisect_right(segment.timestamps, timestamp) - 1, 0)
+            # Stop where the snapshot ended; later lines are still in pending
+            remaining = lines[segment.number]
+            if remaining is not None:
+                remaining -= entry * self.index_every
+            for record in segment.read_from(entry):
+                if remaining is not None:
+                    if remaining <= 0:
+                        break
+                    remaining -= 1
+                if record.timestamp < timestamp:
+                    continue
+                records.append(record)
+                if len(records) >= limit:
+                    return records
+
+        # Lines the writer has not reached yet
+        for ts, stream, line, _ in pending:
+            if ts >= timestamp and len(records) < limit:
+                records.append(LogRecord(ts, stream, line))
+        return records
+
+    def search(self, query, level=None, start=None, end=None, limit=100):
+        """Return up to limit records matching every word of query, newest first.
+        
+        level keeps lines of that level and above, like the live console filter.
+        """
+        if not self.search_index:
+            return []
+        tokens = tokenize(query)
+        levels = level_tokens(level)
+        if not tokens and not levels:
+            return []
+
+        with self.lock:
+            segments = list(self.segments)
+
+        records = []
+        for segment in reversed(segments):
+            offsets = self.search_index.matching_offsets(segment, tokens, start, end, levels)
+            if not offsets:
+                continue
+            low, high = segment.offset_range(start, end)
+            offsets = [offset for offset in offsets if offset >= low and (high is None or offset < high)]
+            # Lines near the range edges may still fall outside it, so read a little extra
+            offsets = offsets[-(limit - len(records) + self.index_every):]
+
+            matched = []
+            for record in segment.read_at(offsets):
+                if start is not None and record.timestamp < start:
+                    continue
+                if end is not None and record.timestamp > end:
+                    continue
+                matched.append(record)
+            matched.reverse()
+            records.extend(matched[:limit - len(records)])
+            if len(records) >= limit:
+                break
+        return records
@@ -0,0 +1,300 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from utils.logparse import match_line, is_game_entry
+from utils.render import strip_codes
+
+logger = logging.getLogger(__name__)
+
+FILE_VERSION = 1
+SESSIONS_PER_PLAYER = 100  # Most recent sessions kept per player; totals cover all of them
+REPLAY_PAGE = 5000         # Console log records read at a time when catching up
+
+# Matched against the whole message of INFO entries the game itself logged, so chat
+# ("<Alex> Steve joined the game") and /say ("[Server] ...") cannot fake them
+# [12:00:00] [Server thread/INFO]: Steve joined the game
+JOIN_PATTERN = re.compile(r'^(\w{1,16}) joined the game$')
+LEAVE_PATTERN = re.compile(r'^(\w{1,16}) left the game$')
+# [12:00:00] [User Authenticator #1/INFO]: UUID of player Steve is 8667ba71-b85a-4004-af54-457a9734eed7
+UUID_PATTERN = re.compile(r'^UUID of player (\w{1,16}) is ([0-9a-fA-F-]{32,36})$')
+# A new server run; anyone still online was disconnected when the previous one ended
+START_MARKER = 'Starting minecraft server version'
+# Threads that log the lines above
+GAME_THREADS = ('Server thread', 'User Authenticator')
+
+MARKERS = (' the game', 'UUID of player', START_MARKER)
+
+
+class PlayerHistory:
+    """Sessions of one player on one server"""
+    __slots__ = ('name', 'uuid', 'sessions', 'session_count', 'total_seconds', 'first_seen', 'last_seen')
+
+    def __init__(self, name, uuid=None):
+        self.name = name
+        self.uuid = uuid
+        self.sessions = deque(maxlen=SESSIONS_PER_PLAYER)  # (joined, left), oldest first
+        self.session_count = 0
+        self.total_seconds = 0.0
+        self.first_seen = None
+        self.last_seen = None
+
+    def add_session(self, joined, left):
+        self.sessions.append((joined, left))
+        self.session_count += 1
+        self.total_seconds += max(0.0, left - joined)
+        if self.first_seen is None or joined < self.first_seen:
+            self.first_seen = joined
+        if self.last_seen is None or left > self.last_seen:
+            self.last_seen = left
+
+    def summary(self):
+        return {
+            'name': self.name,
+            'uuid': self.uuid,
+            'sessions': self.session_count,
+            'total_seconds': round(self.total_seconds),
+            'first_seen': self.first_seen,
+            'last_seen': self.last_seen,
+        }
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'uuid': self.uuid,
+            'sessions': [list(session) for session in self.sessions],
+            'session_count': self.session_count,
+            'total_seconds': self.total_seconds,
+            'first_seen': self.first_seen,
+            'last_seen': self.last_seen,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        history = cls(data['name'], data.get('uuid'))
+        history.sessions.extend(tuple(session) for session in data.get('sessions', ()))
+        history.session_count = data.get('session_count', len(history.sessions))
+        history.total_seconds = data.get('total_seconds', 0.0)
+        history.first_seen = data.get('first_seen')
+        history.last_seen = data.get('last_seen')
+        return history
+
+
+class PlayerTracker:
+    """Who is online on one server and the session history of everyone who has been.
+
+    feed() takes console lines as they are captured. The state is saved to
+    path together with a checkpoint: the timestamp of the last line fed and
+    how many lines with that timestamp were seen. On startup, catch_up()
+    reads the persisted console log from that checkpoint on, through its
+    sparse time index, instead of rescanning every segment; lines captured
+    meanwhile are held back and applied once it is done.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.online = {}  # Player name -> joined at
+        self.uuids = {}  # Player name -> UUID, from the login that precedes a join
+        self.players = {}  # Player name -> PlayerHistory
+        self.checkpoint = (0.0, 0)  # (timestamp, lines at that timestamp already fed)
+        self.last_seen = None  # Timestamp of the last line fed
+        self.deferred = None  # Lines and stops that arrived during catch-up, while it runs
+        self.lock = threading.Lock()
+        if path:
+            self.load()
+
+    def feed(self, lines):
+        """Apply joins and leaves in lines (anything with .text and .timestamp); returns whether the online set changed"""
+        with self.lock:
+            if self.deferred is not None:
+                self.deferred.append(lines)
+                return False
+            return self._feed(lines)
+
+    def _feed(self, lines):
+        changed = False
+        for line in lines:
+            timestamp = round(line.timestamp, 3)  # As stored in the console log
+            if timestamp == self.checkpoint[0]:
+                self.checkpoint = (timestamp, self.checkpoint[1] + 1)
+            else:
+                self.checkpoint = (timestamp, 1)
+            self.last_seen = timestamp
+            if not any(marker in line.text for marker in MARKERS):
+                continue
+            # Parsed afresh rather than taken from line.entry, so console log records read the same
+            entry = match_line(line.text)
+            if entry is None or entry.level != 'info' or not is_game_entry(entry, GAME_THREADS):
+                continue
+            changed = self._apply(strip_codes(entry.message).strip(), timestamp) or changed
+        return changed
+
+    def _apply(self, text, timestamp):
+        match = JOIN_PATTERN.match(text)
+        if match:
+            name = match.group(1)
+            if name in self.online:
+                return False
+            self.online[name] = timestamp
+            return True
+        match = LEAVE_PATTERN.match(text)
+        if match:
+            return self._leave(match.group(1), timestamp)
+        match = UUID_PATTERN.match(text)
+        if match:
+            self.uuids[match.group(1)] = match.group(2).lower()
+            return False
+        if text.startswith(START_MARKER) and self.online:
+            self._leave_all(timestamp)
+            return True
+        return False
+
+    def _leave(self, name, timestamp):
+        joined = self.online.pop(name, None)
+        if joined is None:
+            return False
+        history = self.players.get(name)
+        if history is None:
+            history = self.players[name] = PlayerHistory(name)
+        if name in self.uuids:
+            history.uuid = self.uuids[name]
+        history.add_session(joined, timestamp)
+        return True
+
+    def _leave_all(self, timestamp):
+        for name in list(self.online):
+            self._leave(name, timestamp)
+
+    def server_stopped(self, timestamp=None):
+        """End every open session, at timestamp or else at the last line seen"""
+        with self.lock:
+            if self.deferred is not None:
+                self.deferred.append(timestamp)
+            else:
+                self._stopped(timestamp)
+
+    def _stopped(self, timestamp):
+        timestamp = round(timestamp, 3) if timestamp else self.last_seen
+        if self.online and timestamp:
+            self._leave_all(timestamp)
+
+    def count(self):
+        return len(self.online)
+
+    @property
+    def catching_up(self):
+        return self.deferred is not None
+
+    def online_players(self):
+        with self.lock:
+            return [{'name': name, 'uuid': self.uuids.get(name), 'since': joined}
+                    for name, joined in sorted(self.online.items(), key=lambda item: item[1])]
+
+    def summaries(self, limit=None):
+        """Everyone who has played, most recently seen first"""
+        with self.lock:
+            players = sorted(self.players.values(), key=lambda history: history.last_seen or 0, reverse=True)
+            return [history.summary() for history in players[:limit]]
+
+    def sessions(self, name):
+        """Summary and recent sessions of one player, or None if they never played"""
+        with self.lock:
+            history = self.players.get(name)
+            joined = self.online.get(name)
+            if history is None and joined is None:
+                return None
+            summary = history.summary() if history else PlayerHistory(name, self.uuids.get(name)).summary()
+            sessions = [{'joined': start, 'left': end, 'seconds': round(end - start)}
+                        for start, end in (history.sessions if history else ())]
+            if joined is not None:
+                sessions.append({'joined': joined, 'left': None, 'seconds': None})
+            return dict(summary, online=joined is not None, history=sessions)
+
+    def catch_up(self, console_log, until):
+        """Start feeding the console log records written after the checkpoint and before until.
+
+        Runs on its own thread; feed() and server_stopped() calls made in
+        the meantime are applied in order when it finishes.
+        """
+        with self.lock:
+            self.deferred = []
+        thread = threading.Thread(target=self._catch_up, args=(console_log, until),
+                                  name='player-catch-up', daemon=True)
+        thread.start()
+        return thread
+
+    def _catch_up(self, console_log, until):
+        try:
+            fed = self.replay(console_log, until)
+            logger.debug("Replayed %d console lines into player history of %s", fed, console_log.directory)
+        except Exception:
+            logger.exception("Error rebuilding player history from %s", console_log.directory)
+        with self.lock:
+            for item in self.deferred:
+                if isinstance(item, list):
+                    self._feed(item)
+                else:
+                    self._stopped(item)
+            self.deferred = None
+
+    def replay(self, console_log, until):
+        """Feed the records after the checkpoint and before until; returns how many were fed"""
+        start, skip = self.checkpoint
+        fed = 0
+        while True:
+            limit = skip + REPLAY_PAGE
+            records = console_log.since(start, limit)
+            # Records at the checkpoint's own timestamp come first; the first skip of them were fed already
+            tied = 0
+            while tied < len(records) and records[tied].timestamp == start:
+                tied += 1
+            fresh = [record for record in records[min(skip, tied):] if record.timestamp < until]
+            with self.lock:
+                self._feed(fresh)
+            fed += len(fresh)
+            if len(records) < limit or len(fresh) < len(records) - min(skip, tied):
+                return fed
+            start, skip = self.checkpoint
+
+    def to_dict(self):
+        """Copy of the state for saving; nothing in it is shared with the tracker"""
+        with self.lock:
+            return {
+                'version': FILE_VERSION,
+                'checkpoint': list(self.checkpoint),
+                'last_seen': self.last_seen,
+                'online': dict(self.online),
+                'uuids': dict(self.uuids),
+                'players': [history.to_dict() for history in self.players.values()],
+            }
+
+    def save(self):
+        if not self.path:
+            return
+        temporary = self.path + '.tmp'
+        try:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, separators=(',', ':'))
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning("Could not save player history to %s: %s", self.path, e)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != FILE_VERSION:
+                return
+            players = {item['name']: PlayerHistory.from_dict(item) for item in data.get('players', ())}
+            checkpoint = tuple(data.get('checkpoint', (0.0, 0)))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable player history %s: %s", self.path, e)
+            return
+        self.players = players
+        self.online = dict(data.get('online', {}))
+        self.uuids = dict(data.get('uuids', {}))
+        self.checkpoint = (float(checkpoint[0]), int(checkpoint[1]))
+        self.last_seen = data.get('last_seen')
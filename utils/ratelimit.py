@@ -0,0 +1,107 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# Buckets kept for this many distinct (client, route) pairs; the least recently used go first
+MAX_BUCKETS = 10000
+
+
+class TokenBucket:
+    """Allows rate requests per second on average and bursts of up to burst"""
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now):
+        """Spend one token; returns 0 if allowed, else seconds until one is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets per client and route.
+
+    limits maps a route to (requests per second, burst); routes without an
+    entry are not limited.
+    """
+    def __init__(self, limits, max_buckets=MAX_BUCKETS):
+        self.limits = {route: (float(rate), float(burst)) for route, (rate, burst) in (limits or {}).items()}
+        self.max_buckets = max_buckets
+        self.buckets = OrderedDict()  # (client, route) -> TokenBucket
+        self.lock = threading.Lock()
+
+    def check(self, client, route):
+        """Return 0 if the request may go ahead, else the whole seconds to wait before retrying"""
+        limit = self.limits.get(route)
+        if limit is None:
+            return 0
+        key = (client, route)
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(limit[0], limit[1], now)
+                if len(self.buckets) > self.max_buckets:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+            wait = bucket.take(now)
+        return max(1, math.ceil(wait)) if wait else 0
+
+
+class CoalescingCache:
+    """Shares one computation between identical requests made within window seconds.
+
+    The first caller for a key computes the value; callers arriving while it
+    runs wait for it instead of starting their own, and callers within window
+    seconds afterwards get the same value.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.entries = {}  # Key -> (finished at, value)
+        self.pending = {}  # Key -> Event set when the running computation finishes
+        self.lock = threading.Lock()
+
+    def get(self, key, compute):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                entry = self.entries.get(key)
+                if entry is not None and now - entry[0] < self.window:
+                    return entry[1]
+                done = self.pending.get(key)
+                if done is None:
+                    done = self.pending[key] = threading.Event()
+                    break
+            done.wait()
+            with self.lock:
+                entry = self.entries.get(key)
+            if entry is not None:
+                return entry[1]
+            # The computation failed; try it ourselves
+
+        try:
+            value = compute()
+        except BaseException:
+            with self.lock:
+                self.pending.pop(key, None)
+            done.set()
+            raise
+        with self.lock:
+            now = time.monotonic()
+            self.entries[key] = (now, value)
+            self.pending.pop(key, None)
+            # Drop expired entries so distinct keys do not pile up
+            if len(self.entries) > 256:
+                self.entries = {k: e for k, e in self.entries.items() if now - e[0] < self.window}
+        done.set()
+        return value
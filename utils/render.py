@@ -0,0 +1,168 @@
+import functools
+import html
+import re
+
+# Minecraft § colour codes and the colours the vanilla client draws them with
+COLOR_CODES = {
+    '0': 'black', '1': 'dark_blue', '2': 'dark_green', '3': 'dark_aqua',
+    '4': 'dark_red', '5': 'dark_purple', '6': 'gold', '7': 'gray',
+    '8': 'dark_gray', '9': 'blue', 'a': 'green', 'b': 'aqua',
+    'c': 'red', 'd': 'light_purple', 'e': 'yellow', 'f': 'white',
+}
+COLOR_HEX = {
+    'black': '#000000', 'dark_blue': '#0000aa', 'dark_green': '#00aa00', 'dark_aqua': '#00aaaa',
+    'dark_red': '#aa0000', 'dark_purple': '#aa00aa', 'gold': '#ffaa00', 'gray': '#aaaaaa',
+    'dark_gray': '#555555', 'blue': '#5555ff', 'green': '#55ff55', 'aqua': '#55ffff',
+    'red': '#ff5555', 'light_purple': '#ff55ff', 'yellow': '#ffff55', 'white': '#ffffff',
+}
+# § format codes -> index into a style tuple
+FORMAT_CODES = {'l': 1, 'o': 2, 'n': 3, 'm': 4}
+
+# ANSI SGR foreground colours mapped onto the nearest Minecraft colour
+ANSI_COLORS = {
+    30: 'black', 31: 'dark_red', 32: 'dark_green', 33: 'gold',
+    34: 'dark_blue', 35: 'dark_purple', 36: 'dark_aqua', 37: 'gray',
+    90: 'dark_gray', 91: 'red', 92: 'green', 93: 'yellow',
+    94: 'blue', 95: 'light_purple', 96: 'aqua', 97: 'white',
+}
+ANSI_SET = {1: 1, 3: 2, 4: 3, 9: 4}
+ANSI_UNSET = {22: 1, 23: 2, 24: 3, 29: 4}
+
+# A style is (colour, bold, italic, underline, strikethrough); colour is a
+# name from COLOR_HEX, a '#rrggbb' string or None
+PLAIN = (None, False, False, False, False)
+STYLE_CLASSES = ('mc-bold', 'mc-italic', 'mc-underline', 'mc-strike')
+
+CODE_PATTERN = re.compile(r'\x1b\[([0-9;?]*)([A-Za-z])|§(x(?:§[0-9a-fA-F]){6}|[0-9a-fA-Fk-oK-OrR])')
+
+RENDER_CACHE_LINES = 4096
+
+
+def has_codes(text):
+    return '§' in text or '\x1b' in text
+
+
+def _apply_sgr(style, params):
+    style = list(style)
+    codes = [int(p) if p.isdigit() else 0 for p in params.split(';')] if params else [0]
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code == 0:
+            style = list(PLAIN)
+        elif code in ANSI_COLORS:
+            style[0] = ANSI_COLORS[code]
+        elif code == 39:
+            style[0] = None
+        elif code in ANSI_SET:
+            style[ANSI_SET[code]] = True
+        elif code in ANSI_UNSET:
+            style[ANSI_UNSET[code]] = False
+        elif code == 38 and i + 1 < len(codes):
+            # 38;2;r;g;b is a true colour; 38;5;n has no sensible mapping and is skipped
+            if codes[i + 1] == 2 and i + 4 < len(codes):
+                style[0] = '#%02x%02x%02x' % tuple(min(c, 255) for c in codes[i + 2:i + 5])
+                i += 4
+            else:
+                i += 2
+        i += 1
+    return tuple(style)
+
+
+def _apply_section(style, code):
+    code = code.lower()
+    if code in COLOR_CODES:
+        # Like the client, a colour code also clears bold/italic/etc.
+        return (COLOR_CODES[code], False, False, False, False)
+    if code.startswith('x'):
+        return ('#' + code[2::2], False, False, False, False)
+    if code == 'r':
+        return PLAIN
+    if code in FORMAT_CODES:
+        style = list(style)
+        style[FORMAT_CODES[code]] = True
+        return tuple(style)
+    return style  # §k (obfuscated) is not drawn
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_LINES)
+def render_segments(text):
+    """Split a line into ((text, style), ...) runs, with colour codes removed.
+
+    Returns None for lines without any § or ANSI codes.
+    """
+    if not has_codes(text):
+        return None
+    segments = []
+    style = PLAIN
+    position = 0
+    for match in CODE_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append((text[position:match.start()], style))
+        position = match.end()
+        if match.group(3):
+            style = _apply_section(style, match.group(3))
+        elif match.group(2) == 'm':
+            style = _apply_sgr(style, match.group(1))
+        # Other escape sequences (cursor movement etc.) are dropped
+    if position < len(text):
+        segments.append((text[position:], style))
+
+    # Merge neighbours that ended up with the same style
+    merged = []
+    for segment in segments:
+        if merged and merged[-1][1] == segment[1]:
+            merged[-1] = (merged[-1][0] + segment[0], segment[1])
+        else:
+            merged.append(segment)
+    return tuple(merged)
+
+
+def strip_codes(text):
+    """The text of a line without § or ANSI codes"""
+    segments = render_segments(text)
+    if segments is None:
+        return text
+    return ''.join(segment for segment, _ in segments)
+
+
+def style_html(text, style):
+    text = html.escape(text, quote=False)
+    if style == PLAIN:
+        return text
+    color = style[0]
+    classes = [name for name, enabled in zip(STYLE_CLASSES, style[1:]) if enabled]
+    attributes = ''
+    if color and not color.startswith('#'):
+        classes.insert(0, 'mc-' + color.replace('_', '-'))
+    elif color:
+        attributes = f' style="color:{color}"'
+    if classes:
+        attributes = f' class="{" ".join(classes)}"' + attributes
+    return f'<span{attributes}>{text}</span>'
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_LINES)
+def render_html(text):
+    """Escaped HTML for a line, with § and ANSI colours turned into mc-* classes"""
+    segments = render_segments(text)
+    if segments is None:
+        return html.escape(text, quote=False)
+    return ''.join(style_html(segment, style) for segment, style in segments)
+
+
+def error_html(line_html):
+    return f'<span class="console-error">[ERROR] {line_html}</span>'
+
+
+def stylesheet():
+    """CSS rules for the classes render_html emits"""
+    rules = [f'.mc-{name.replace("_", "-")} {{ color: {color}; }}' for name, color in COLOR_HEX.items()]
+    rules += [
+        '.mc-bold { font-weight: bold; }',
+        '.mc-italic { font-style: italic; }',
+        '.mc-underline { text-decoration: underline; }',
+        '.mc-strike { text-decoration: line-through; }',
+        '.console-error { color: #ff5555; }',
+    ]
+    return '\n'.join(rules)
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Seconds between samples of every running server
+SAMPLE_INTERVAL = 1.0
+
+
+class ProcessSample:
+    """Resource usage of one server process at one moment; never modified once built"""
+    __slots__ = ('time', 'pid', 'cpu', 'rss', 'threads', 'fds', 'read_bytes', 'write_bytes')
+
+    def __init__(self, time, pid, cpu, rss, threads, fds=None, read_bytes=None, write_bytes=None):
+        self.time = time
+        self.pid = pid
+        self.cpu = cpu  # Percent of one core since the previous sample; None on the first
+        self.rss = rss  # Bytes
+        self.threads = threads
+        self.fds = fds  # Open file descriptors (handles on Windows), if the platform reports them
+        self.read_bytes = read_bytes  # Cumulative disk I/O, if the platform reports it
+        self.write_bytes = write_bytes
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def read_sample(handle, now, first=False):
+    """Take a ProcessSample from a psutil.Process; raises psutil.Error if it is gone.
+
+    The first cpu_percent() call of a handle only starts the measurement,
+    so a first sample reports no CPU figure.
+    """
+    with handle.oneshot():
+        cpu = handle.cpu_percent()
+        if first:
+            cpu = None
+        rss = handle.memory_info().rss
+        threads = handle.num_threads()
+        fds = None
+        try:
+            fds = handle.num_fds() if hasattr(handle, 'num_fds') else handle.num_handles()
+        except psutil.AccessDenied:
+            pass
+        read_bytes = write_bytes = None
+        if hasattr(handle, 'io_counters'):
+            try:
+                io = handle.io_counters()
+                read_bytes, write_bytes = io.read_bytes, io.write_bytes
+            except psutil.AccessDenied:
+                pass
+    return ProcessSample(now, handle.pid, cpu, rss, threads, fds, read_bytes, write_bytes)
+
+
+class ProcessSampler:
+    """One thread sampling every running server at a fixed interval.
+
+    targets() returns {server path: pid} of the processes to watch. A
+    psutil.Process handle is kept per server between samples, so each CPU
+    percentage covers the whole interval; the first sample after a start
+    has no CPU figure rather than a meaningless 0. Readers get the latest
+    samples with get(), which never touches /proc.
+    """
+    def __init__(self, targets, interval=SAMPLE_INTERVAL):
+        self.targets = targets
+        self.interval = interval
+        self.handles = {}  # Server path -> psutil.Process
+        self.samples = {}  # Server path -> ProcessSample, replaced as a whole every tick
+        self.listeners = []  # Called with each new samples dict, on the sampler thread
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def get(self, server_path):
+        return self.samples.get(server_path)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._run, name='process-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join(self.interval + 1)
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self.stopping.is_set():
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("Error sampling server processes")
+            # Keep a steady cadence however long sampling took
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            self.stopping.wait(delay)
+
+    def sample(self):
+        """Sample every target once and publish the results"""
+        now = time.time()
+        targets = self.targets()
+        samples = {}
+        for path, pid in targets.items():
+            handle = self.handles.get(path)
+            first = handle is None or handle.pid != pid
+            try:
+                if first:
+                    handle = self.handles[path] = psutil.Process(pid)
+                samples[path] = read_sample(handle, now, first)
+            except psutil.Error as e:
+                self.handles.pop(path, None)
+                logger.debug("Could not sample process %s of %s: %s", pid, path, e)
+        for path in list(self.handles):
+            if path not in targets:
+                del self.handles[path]
+        self.samples = samples
+        for listener in self.listeners:
+            try:
+                listener(samples)
+            except Exception:
+                logger.exception("Error in process sample listener")
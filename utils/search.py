@@ -0,0 +1,233 @@
+import mmap
+import os
+import re
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+
+from utils.logparse import LEVEL_RANKS, LogParser, normalize_level, parse_level
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9_]{2,}')
+MAX_TOKEN_LENGTH = 64
+
+# Postings file layout: header, fixed-size entry table sorted by token,
+# token bytes, then the uint64 line offsets of every entry back to back
+HEADER = struct.Struct('<4sIQQdd')  # magic, token count, blob offset, postings offset, first/last timestamp
+ENTRY = struct.Struct('<IIQI')      # token offset, token length, first posting, posting count
+MAGIC = b'MCI1'
+OPEN_READERS = 128  # Sealed postings files kept mapped at once
+
+
+def tokenize(text):
+    """Return the distinct search tokens in a line"""
+    return {token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) <= MAX_TOKEN_LENGTH}
+
+
+def level_token(level):
+    # ':' never appears in text tokens, so these cannot collide
+    return f"level:{level.lower()}"
+
+
+def level_tokens(level):
+    """Tokens of level and every level above it, or None if level is not a known one"""
+    level = normalize_level(level)
+    if level is None:
+        return None
+    rank = LEVEL_RANKS[level]
+    return {level_token(name) for name, other in LEVEL_RANKS.items() if other >= rank}
+
+
+class MemoryPostings:
+    """Postings for the segment still being written"""
+    def __init__(self):
+        self.postings = {}
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    def add(self, offset, timestamp, tokens):
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        for token in tokens:
+            offsets = self.postings.get(token)
+            if offsets is None:
+                offsets = self.postings[token] = array('Q')
+            offsets.append(offset)
+
+    def lookup(self, token):
+        offsets = self.postings.get(token)
+        return list(offsets) if offsets is not None else []
+
+    def write(self, path):
+        tokens = sorted(self.postings)
+        encoded = [token.encode('utf-8') for token in tokens]
+        blob_offset = HEADER.size + ENTRY.size * len(tokens)
+        postings_offset = blob_offset + sum(len(token) for token in encoded)
+
+        entries = []
+        blob_position = 0
+        posting_position = 0
+        for token, raw in zip(tokens, encoded):
+            count = len(self.postings[token])
+            entries.append(ENTRY.pack(blob_position, len(raw), posting_position, count))
+            blob_position += len(raw)
+            posting_position += count
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(tokens), blob_offset, postings_offset,
+                                self.first_timestamp or 0.0, self.last_timestamp or 0.0))
+            f.write(b''.join(entries))
+            f.write(b''.join(encoded))
+            for token in tokens:
+                self.postings[token].tofile(f)
+        os.replace(tmp_path, path)
+
+
+class PostingsReader:
+    """Memory-mapped postings of a sealed segment; lookups binary search the entry table"""
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            self.file.close()
+            raise
+        magic, self.count, self.blob_offset, self.postings_offset, self.first_timestamp, self.last_timestamp = \
+            HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a postings file: {path}")
+
+    def _entry(self, position):
+        return ENTRY.unpack_from(self.map, HEADER.size + position * ENTRY.size)
+
+    def _token(self, entry):
+        start = self.blob_offset + entry[0]
+        return self.map[start:start + entry[1]]
+
+    def lookup(self, token):
+        wanted = token.encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._entry(middle)
+            current = self._token(entry)
+            if current < wanted:
+                low = middle + 1
+            elif current > wanted:
+                high = middle
+            else:
+                start = self.postings_offset + entry[2] * 8
+                offsets = array('Q')
+                offsets.frombytes(self.map[start:start + entry[3] * 8])
+                return list(offsets)
+        return []
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class SearchIndex:
+    """Inverted index (token -> line offsets) for every segment of a ConsoleLog.
+
+    The active segment's postings live in memory; when the segment is sealed
+    they are written next to it and read back through mmap.
+    """
+    def __init__(self):
+        self.active = {}  # Segment number -> MemoryPostings
+        self.readers = OrderedDict()  # Segment number -> PostingsReader, least recently used first
+        self.lock = threading.Lock()
+
+    def has_postings(self, segment):
+        return os.path.exists(segment.postings_path)
+
+    def add(self, segment, offset, timestamp, stream, text, level=None):
+        tokens = tokenize(text)
+        tokens.add(level_token(level or parse_level(text, stream)))
+        with self.lock:
+            postings = self.active.get(segment.number)
+            if postings is None:
+                postings = self.active[segment.number] = MemoryPostings()
+            postings.add(offset, timestamp, tokens)
+
+    def seal(self, segment):
+        """Write the segment's postings to disk and drop them from memory"""
+        with self.lock:
+            postings = self.active.get(segment.number)
+        if postings is None:
+            postings = MemoryPostings()
+        postings.write(segment.postings_path)
+        with self.lock:
+            self.active.pop(segment.number, None)
+
+    def rebuild(self, segment, active=False):
+        """Index an existing segment file, e.g. one written before indexing existed"""
+        postings = MemoryPostings()
+        # Parsed in order like live output, so stack traces get the level of their entry
+        parser = LogParser()
+        for offset, record in segment.scan():
+            tokens = tokenize(record.text)
+            tokens.add(level_token(parser.parse(record.text, record.stream).level))
+            postings.add(offset, record.timestamp, tokens)
+        if active:
+            with self.lock:
+                self.active[segment.number] = postings
+        else:
+            postings.write(segment.postings_path)
+
+    def drop(self, segment):
+        with self.lock:
+            self.active.pop(segment.number, None)
+            reader = self.readers.pop(segment.number, None)
+        if reader:
+            reader.close()
+
+    def _postings(self, segment):
+        """Return the postings of a segment, or None if it is not indexed yet"""
+        with self.lock:
+            if segment.number in self.active:
+                return self.active[segment.number]
+            reader = self.readers.get(segment.number)
+            if reader:
+                self.readers.move_to_end(segment.number)
+                return reader
+        if not self.has_postings(segment):
+            return None
+        try:
+            reader = PostingsReader(segment.postings_path)
+        except (OSError, ValueError):
+            return None
+        with self.lock:
+            self.readers[segment.number] = reader
+            while len(self.readers) > OPEN_READERS:
+                _, expired = self.readers.popitem(last=False)
+                expired.close()
+        return reader
+
+    def matching_offsets(self, segment, tokens, start=None, end=None, any_of=None):
+        """Return sorted offsets of lines in segment containing every token, and one of any_of if given"""
+        postings = self._postings(segment)
+        if postings is None:
+            return []
+        if start is not None and postings.last_timestamp is not None and postings.last_timestamp < start:
+            return []
+        if end is not None and postings.first_timestamp is not None and postings.first_timestamp > end:
+            return []
+
+        with self.lock:
+            lists = [postings.lookup(token) for token in tokens]
+            if any_of:
+                lists.append([offset for token in any_of for offset in postings.lookup(token)])
+        if not lists or not all(lists):
+            return []
+        lists.sort(key=len)
+        matches = set(lists[0])
+        for offsets in lists[1:]:
+            matches.intersection_update(offsets)
+            if not matches:
+                return []
+        return sorted(matches)
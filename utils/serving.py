@@ -0,0 +1,259 @@
+import io
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+from utils.asyncserver import AsyncHTTPServer
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_FILE = 'webui.json'
+
+DEFAULT_SETTINGS = {
+    'host': '0.0.0.0',
+    'port': 8080,
+    'backend': 'asyncio',    # 'asyncio', 'pooled', 'waitress' or 'development'
+    'workers': 32,           # Request worker threads; with pooled, every open connection holds one
+    'backlog': 128,          # Accepted connections waiting for a free worker
+    'keep_alive': True,      # Reuse connections for several requests (HTTP/1.1)
+    'request_timeout': 30,   # Seconds a connection may sit idle or stall mid-request
+    'shutdown_timeout': 5,   # Seconds stop() waits for in-flight requests
+    # Per client and route: [requests per second, burst]; a page polls its console twice a second
+    'rate_limits': {
+        '/api/console': [20, 40],
+        '/api/status': [5, 10],
+        '/api/status/wait': [5, 10],
+        '/api/dashboard': [5, 10],
+        '/api/console/history': [2, 5],
+        '/api/console/search': [2, 5],
+        '/api/metrics/history': [2, 5],
+        '/api/players': [2, 5],
+    },
+    'coalesce_window': 0.25,  # Seconds identical expensive requests share one result
+}
+
+
+def load_settings(path=SETTINGS_FILE):
+    """Web UI settings from a JSON file, falling back to DEFAULT_SETTINGS"""
+    settings = dict(DEFAULT_SETTINGS)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                settings.update(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring invalid web UI settings in %s: %s", path, e)
+    return settings
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """Request handler that keeps HTTP/1.1 connections open between requests.
+
+    Werkzeug closes every connection because it cannot drain an unread
+    request body before the next request line. Requests without a body
+    (the polling GETs that make up most of the traffic) have nothing to
+    drain, so their connections are kept open and werkzeug's drain is
+    pointed at an empty stream so it cannot swallow the next request. That
+    drain still idles for about 10ms after each response, which is far less
+    than a new TCP (or TLS) handshake costs a remote client.
+
+    Responses are buffered so the head and body leave in one send, and
+    Nagle is turned off; otherwise each response after the first on a
+    connection waits about 40ms for the client's delayed ACK.
+    """
+    protocol_version = 'HTTP/1.1'
+    wbufsize = -1  # Buffered; werkzeug flushes after each body write
+
+    def setup(self):
+        super().setup()
+        if self.connection.family != socket.AF_UNIX:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def can_keep_alive(self):
+        headers = self.headers
+        if self.request_version != 'HTTP/1.1' or headers.get('Connection', '').lower() == 'close':
+            return False
+        if getattr(self.server, 'closing', False):
+            return False
+        return headers.get('Content-Length', '0') == '0' and 'Transfer-Encoding' not in headers
+
+    def run_wsgi(self):
+        if not self.can_keep_alive():
+            return super().run_wsgi()
+        connection_stream = self.rfile
+        self.rfile = io.BytesIO()
+        try:
+            return super().run_wsgi()
+        finally:
+            self.rfile = connection_stream
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == 'connection' and value.lower() == 'close' and self.can_keep_alive():
+            value = 'keep-alive'
+        super().send_header(keyword, value)
+
+    def log_request(self, code='-', size='-'):
+        # Access logs go to the debug level instead of stderr
+        logger.debug('%s "%s" %s %s', self.address_string(), self.requestline, code, size)
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug WSGI server that serves connections on a fixed pool of worker threads.
+
+    Accepted connections wait in a bounded queue; when every worker is busy
+    and the queue is full, accepting blocks, so load turns into backpressure
+    instead of an unbounded number of threads. A worker stays with its
+    connection until it closes, so idle keep-alive connections (for up to
+    request_timeout) and open console streams each hold one; the asyncio
+    backend does not have that limit.
+    """
+    def __init__(self, host, port, app, workers=32, backlog=128, timeout=None, handler=None):
+        self.request_queue_size = backlog
+        super().__init__(host, port, app, handler=handler)
+        self.timeout_seconds = timeout
+        self.connections = queue.Queue(maxsize=backlog)
+        self.active = set()  # Sockets being served right now
+        self.active_lock = threading.Lock()
+        self.closing = False
+        self.workers = []
+        for number in range(workers):
+            worker = threading.Thread(target=self._worker, name=f"webui-worker-{number}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def process_request(self, request, client_address):
+        if self.timeout_seconds:
+            # Bounds idle keep-alive connections and clients that stall mid-request
+            request.settimeout(self.timeout_seconds)
+        self.connections.put((request, client_address))
+
+    def _worker(self):
+        while True:
+            item = self.connections.get()
+            if item is None:
+                return
+            request, client_address = item
+            with self.active_lock:
+                self.active.add(request)
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                with self.active_lock:
+                    self.active.discard(request)
+                self.shutdown_request(request)
+
+    def handle_error(self, request, client_address):
+        logger.debug("Connection from %s ended with an error", client_address, exc_info=True)
+
+    def close(self, timeout=None):
+        """Stop the workers once the requests they are serving have finished"""
+        self.closing = True
+        with self.active_lock:
+            active = list(self.active)
+        for request in active:
+            # Idle keep-alive connections see end-of-stream instead of waiting out the timeout
+            try:
+                request.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        for _ in self.workers:
+            self.connections.put(None)
+        deadline = time.monotonic() + (timeout or 0)
+        for worker in self.workers:
+            worker.join(max(deadline - time.monotonic(), 0) if timeout else None)
+        self.server_close()
+
+
+class WerkzeugBackend:
+    """Serves the app on a werkzeug server; pooled or thread-per-connection"""
+    def __init__(self, app, settings):
+        handler = KeepAliveRequestHandler if settings['keep_alive'] else None
+        if settings['backend'] == 'development':
+            from werkzeug.serving import ThreadedWSGIServer
+            self.server = ThreadedWSGIServer(settings['host'], settings['port'], app, handler=handler)
+            self.pooled = False
+        else:
+            self.server = PooledWSGIServer(settings['host'], settings['port'], app,
+                                           workers=settings['workers'], backlog=settings['backlog'],
+                                           timeout=settings['request_timeout'], handler=handler)
+            self.pooled = True
+        self.shutdown_timeout = settings['shutdown_timeout']
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stats(self):
+        """Connections being served and, for the pool, waiting for a worker"""
+        if not self.pooled:
+            return {}
+        return {'active': len(self.server.active), 'queued': self.server.connections.qsize()}
+
+    def shutdown(self):
+        # Stop accepting, then let in-flight requests finish
+        self.server.shutdown()
+        if self.pooled:
+            self.server.close(self.shutdown_timeout)
+        else:
+            self.server.server_close()
+
+
+class WaitressBackend:
+    """Serves the app with waitress, if it is installed"""
+    def __init__(self, app, settings):
+        from waitress.server import create_server
+        self.server = create_server(
+            app, host=settings['host'], port=settings['port'],
+            threads=settings['workers'], backlog=settings['backlog'],
+            channel_timeout=settings['request_timeout'],
+        )
+
+    def serve_forever(self):
+        self.server.run()
+
+    def stats(self):
+        return {}
+
+    def shutdown(self):
+        self.server.close()
+
+
+class AsyncioBackend:
+    """Serves async_routes on an asyncio event loop and the rest of the app on a thread pool"""
+    def __init__(self, app, settings, async_routes):
+        self.server = AsyncHTTPServer(
+            settings['host'], settings['port'], app, async_routes,
+            workers=settings['workers'], backlog=settings['backlog'],
+            keep_alive=settings['keep_alive'], request_timeout=settings['request_timeout'],
+            shutdown_timeout=settings['shutdown_timeout'],
+        )
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stats(self):
+        return {'active': len(self.server.connections)}
+
+    def shutdown(self):
+        self.server.shutdown()
+
+
+def create_backend(app, settings, async_routes=None):
+    """Bind a server for app according to settings['backend'].
+
+    async_routes maps paths to coroutine handlers that only the asyncio
+    backend uses; the other backends serve those paths through the app.
+    """
+    if settings['backend'] == 'waitress':
+        try:
+            return WaitressBackend(app, settings)
+        except ImportError:
+            logger.warning("waitress is not installed; using the asyncio server")
+            return AsyncioBackend(app, settings, async_routes)
+    if settings['backend'] in ('pooled', 'development'):
+        return WerkzeugBackend(app, settings)
+    return AsyncioBackend(app, settings, async_routes)
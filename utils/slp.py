@@ -0,0 +1,310 @@
+import asyncio
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from utils.render import strip_codes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 25565
+PING_INTERVAL = 5.0   # Seconds between pings of a server that answers
+PING_TIMEOUT = 3.0    # Seconds one ping may take, connection included
+MAX_BACKOFF = 30.0    # Longest wait between pings of a server that does not answer
+PONG_TIMEOUT = 1.0    # Seconds to wait for the optional pong after the status reply
+MAX_PACKET = 1024 * 1024  # Status replies carry the favicon, but never this much
+
+# Protocol version -1 asks the server to answer with its own
+PROTOCOL_VERSION = -1
+NEXT_STATE_STATUS = 1
+
+
+class SLPError(Exception):
+    """The server answered, but not with a valid Server List Ping reply"""
+
+
+class PingResult:
+    """Outcome of one Server List Ping; never modified once built"""
+    __slots__ = ('time', 'online', 'latency', 'motd', 'players_online', 'players_max',
+                 'version', 'protocol', 'failures', 'error')
+
+    def __init__(self, time, online=False, latency=None, motd=None, players_online=None, players_max=None,
+                 version=None, protocol=None, failures=0, error=None):
+        self.time = time
+        self.online = online  # Whether the server accepted the connection and answered
+        self.latency = latency  # Milliseconds for the ping/pong round trip
+        self.motd = motd  # Plain text, formatting codes removed
+        self.players_online = players_online
+        self.players_max = players_max
+        self.version = version
+        self.protocol = protocol
+        self.failures = failures  # Failed pings in a row, this one included
+        self.error = error
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def read_server_address(server_path):
+    """(host, port) the profile's server listens on, from its server.properties"""
+    host, port = '', DEFAULT_PORT
+    try:
+        with open(os.path.join(server_path, 'server.properties'), encoding='utf-8', errors='replace') as f:
+            for line in f:
+                key, _, value = line.strip().partition('=')
+                if key == 'server-port':
+                    try:
+                        port = int(value)
+                    except ValueError:
+                        pass
+                elif key == 'server-ip':
+                    host = value.strip()
+    except OSError:
+        pass
+    # A server bound to every interface is reached on loopback
+    if host in ('', '0.0.0.0'):
+        host = '127.0.0.1'
+    elif host == '::':
+        host = '::1'
+    return host, port
+
+
+def pack_varint(value):
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def pack_string(text):
+    data = text.encode('utf-8')
+    return pack_varint(len(data)) + data
+
+
+def pack_packet(packet_id, payload=b''):
+    body = pack_varint(packet_id) + payload
+    return pack_varint(len(body)) + body
+
+
+def unpack_varint(data, position=0):
+    """Return (value, position after it) of the VarInt at position in data"""
+    value = 0
+    for shift in range(0, 35, 7):
+        if position >= len(data):
+            raise SLPError("Truncated VarInt")
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+    raise SLPError("VarInt too long")
+
+
+async def read_varint(reader):
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value
+    raise SLPError("VarInt too long")
+
+
+async def read_packet(reader):
+    """Return (packet id, payload) of the next packet"""
+    length = await read_varint(reader)
+    if not 0 < length <= MAX_PACKET:
+        raise SLPError(f"Bad packet length {length}")
+    data = await reader.readexactly(length)
+    packet_id, position = unpack_varint(data)
+    return packet_id, data[position:]
+
+
+def unpack_string(payload):
+    length, position = unpack_varint(payload)
+    if position + length > len(payload):
+        raise SLPError("Truncated string")
+    return payload[position:position + length].decode('utf-8', errors='replace')
+
+
+def describe(description):
+    """Plain text of a MOTD given as a string or a chat component"""
+    if isinstance(description, str):
+        return strip_codes(description)
+    if isinstance(description, list):
+        return ''.join(describe(part) for part in description)
+    if isinstance(description, dict):
+        return describe(description.get('text', '')) + ''.join(describe(part) for part in description.get('extra', ()))
+    return ''
+
+
+async def ping(host, port, timeout=PING_TIMEOUT):
+    """Ping one server; returns an online PingResult or raises OSError, asyncio.TimeoutError or SLPError"""
+    return await asyncio.wait_for(_ping(host, port), timeout)
+
+
+async def _ping(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        handshake = pack_varint(PROTOCOL_VERSION) + pack_string(host) + struct.pack('>H', port) \
+            + pack_varint(NEXT_STATE_STATUS)
+        writer.write(pack_packet(0x00, handshake) + pack_packet(0x00))
+        requested = time.perf_counter()
+        await writer.drain()
+        packet_id, payload = await read_packet(reader)
+        answered = time.perf_counter()
+        if packet_id != 0x00:
+            raise SLPError(f"Unexpected packet {packet_id:#x} instead of a status reply")
+        try:
+            status = json.loads(unpack_string(payload))
+        except ValueError as e:
+            raise SLPError(f"Invalid status JSON: {e}")
+        if not isinstance(status, dict):
+            raise SLPError("Status reply is not a JSON object")
+
+        # The ping/pong round trip is the latency clients see; servers that skip it get the status one
+        latency = answered - requested
+        try:
+            payload = struct.pack('>q', int(time.time() * 1000))
+            writer.write(pack_packet(0x01, payload))
+            sent = time.perf_counter()
+            await writer.drain()
+            packet_id, pong = await asyncio.wait_for(read_packet(reader), PONG_TIMEOUT)
+            if packet_id == 0x01 and pong == payload:
+                latency = time.perf_counter() - sent
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, SLPError):
+            pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    players = status.get('players') if isinstance(status.get('players'), dict) else {}
+    version = status.get('version') if isinstance(status.get('version'), dict) else {}
+    return PingResult(
+        time.time(), online=True, latency=round(latency * 1000, 1), motd=describe(status.get('description', '')),
+        players_online=players.get('online'), players_max=players.get('max'),
+        version=version.get('name'), protocol=version.get('protocol'))
+
+
+class ServerPinger:
+    """One thread with an event loop pinging every running server concurrently.
+
+    targets() returns {server path: (host, port)} of the servers to ping.
+    A server that answers is pinged every interval seconds; one that does
+    not waits twice as long after each failure, up to max_backoff. Readers
+    get the latest results with get(); listeners are called with each
+    round's results on the pinger thread.
+    """
+    def __init__(self, targets, interval=PING_INTERVAL, timeout=PING_TIMEOUT, max_backoff=MAX_BACKOFF):
+        self.targets = targets
+        self.interval = interval
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.results = {}  # Server path -> PingResult, replaced as a whole every round
+        self.addresses = {}  # Server path -> (host, port) being pinged
+        self.failures = {}  # Server path -> failed pings in a row
+        self.next_ping = {}  # Server path -> monotonic time of its next ping
+        self.listeners = []
+        self.loop = None
+        self.wakeup = None
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def get(self, server_path):
+        return self.results.get(server_path)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._run, name='server-pinger', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.loop is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.wakeup.set)
+            except RuntimeError:
+                pass  # Loop already closed
+        if self.thread:
+            self.thread.join(self.timeout + 1)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._serve())
+        finally:
+            self.loop.close()
+            self.loop = None
+
+    async def _serve(self):
+        self.wakeup = asyncio.Event()
+        while not self.stopping.is_set():
+            try:
+                await self.ping_round()
+            except Exception:
+                logger.exception("Error pinging servers")
+            # Wake for the next due ping, and at least every interval for newly started servers
+            delay = min([self.interval] + [due - time.monotonic() for due in self.next_ping.values()])
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), max(delay, 0.05))
+            except asyncio.TimeoutError:
+                pass
+
+    async def ping_round(self):
+        """Ping every target that is due and publish the results"""
+        targets = self.targets()
+        now = time.monotonic()
+        for path in list(self.addresses):
+            if path not in targets:
+                # Stopped; a new run starts over without backoff
+                for state in (self.addresses, self.failures, self.next_ping):
+                    state.pop(path, None)
+        if any(path not in targets for path in self.results):
+            self.results = {path: result for path, result in self.results.items() if path in targets}
+        due = []
+        for path, address in targets.items():
+            if self.addresses.get(path) != address:
+                self.addresses[path] = address
+                self.failures[path] = 0
+                self.next_ping[path] = now
+            if now >= self.next_ping[path]:
+                due.append(path)
+        if not due:
+            return
+        pinged = await asyncio.gather(*(self.ping_one(path, self.addresses[path]) for path in due))
+        results = {path: result for path, result in self.results.items() if path in targets}
+        results.update(pinged)
+        self.results = results
+        for listener in self.listeners:
+            try:
+                listener(results)
+            except Exception:
+                logger.exception("Error in ping listener")
+
+    async def ping_one(self, path, address):
+        try:
+            result = await ping(*address, timeout=self.timeout)
+            self.failures[path] = 0
+            delay = self.interval
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, SLPError) as e:
+            failures = self.failures[path] = self.failures.get(path, 0) + 1
+            result = PingResult(time.time(), failures=failures, error=str(e) or type(e).__name__)
+            delay = min(self.interval * 2 ** (failures - 1), self.max_backoff)
+        self.next_ping[path] = time.monotonic() + delay
+        return path, result
@@ -0,0 +1,116 @@
+import os
+import re
+import threading
+import time
+from utils.logparse import match_line, is_game_entry
+from utils.render import strip_codes
+
+# A server is lagging below this TPS, above this MSPT, or this long after a "Can't keep up!"
+LAG_TPS = 18.0
+LAG_MSPT = 50.0
+LAG_WINDOW = 60
+
+# Matched against the whole message of entries the game itself logged, so players
+# cannot fake readings by typing them in chat
+# Can't keep up! Is the server overloaded? Running 2043ms or 40 ticks behind  (WARN)
+BEHIND_PATTERN = re.compile(r"^Can't keep up! Is the server overloaded\? Running (\d+)ms or (\d+) ticks behind$")
+# TPS from last 1m, 5m, 15m: 20.0, 19.97, *20.0   (Paper, "*" above 20)
+TPS_PATTERN = re.compile(r'^TPS from last 1m, 5m, 15m: \*?([\d.]+), \*?([\d.]+), \*?([\d.]+)$')
+# Server tick times (avg/min/max) from last 5s, 10s, 1m:
+# ◴ 1.2/0.8/3.4, 1.1/0.7/3.4, 1.0/0.6/5.0
+MSPT_HEADER = 'Server tick times'
+MSPT_PATTERN = re.compile(r'^(?:[^\w\s]\s*)?([\d.]+)/([\d.]+)/([\d.]+), ([\d.]+)/([\d.]+)/([\d.]+), '
+                          r'([\d.]+)/([\d.]+)/([\d.]+)$')
+
+# Only lines containing one of these are looked at more closely
+MARKERS = ("Can't keep up!", 'TPS from last', MSPT_HEADER)
+
+
+def is_paper_profile(server_path):
+    """Paper profiles are created as PROFILE_<version>-Paper-<build>"""
+    name = os.path.basename(os.path.normpath(server_path))
+    return name.startswith('PROFILE_') and '-Paper-' in name
+
+
+class TickHealth:
+    """Tick rate of one server, read from its console output.
+
+    "Can't keep up!" warnings are printed by every server; Paper servers
+    also answer the tps and mspt commands the manager sends them. feed()
+    returns {metric: value} for every new reading so callers can record it.
+    """
+    def __init__(self):
+        self.tps = None  # 1 minute average
+        self.mspt = None  # 1 minute average milliseconds per tick
+        self.mspt_max = None
+        self.behind_ms = None  # Of the last "Can't keep up!"
+        self.behind_ticks_total = 0
+        self.lag_warned_at = None
+        self.updated = None
+        self.expect_mspt = False  # The next line holds the tick times
+        self.lock = threading.Lock()
+
+    def feed(self, lines):
+        """Parse a batch of OutputLines; returns {metric: value} of any new readings"""
+        readings = {}
+        for line in lines:
+            if not self.expect_mspt and not any(marker in line.text for marker in MARKERS):
+                continue
+            entry = match_line(line.text)
+            if not is_game_entry(entry):
+                self.expect_mspt = False
+                continue
+            text = strip_codes(entry.message).strip()
+            with self.lock:
+                if self.expect_mspt:
+                    self.expect_mspt = False
+                    match = MSPT_PATTERN.match(text)
+                    if match:
+                        self.mspt = float(match.group(7))
+                        self.mspt_max = float(match.group(9))
+                        self.updated = line.timestamp
+                        readings['mspt'] = self.mspt
+                        continue
+                if text.startswith(MSPT_HEADER):
+                    self.expect_mspt = True
+                    continue
+                match = TPS_PATTERN.match(text)
+                if match:
+                    self.tps = min(float(match.group(1)), 20.0)
+                    self.updated = line.timestamp
+                    readings['tps'] = self.tps
+                    continue
+                match = BEHIND_PATTERN.match(text)
+                if match and entry.level == 'warn':
+                    self.behind_ms = int(match.group(1))
+                    self.behind_ticks_total += int(match.group(2))
+                    self.lag_warned_at = line.timestamp
+                    readings['behind_ms'] = self.behind_ms
+        return readings
+
+    def lagging(self, now=None):
+        now = time.time() if now is None else now
+        if self.tps is not None and self.tps < LAG_TPS:
+            return True
+        if self.mspt is not None and self.mspt > LAG_MSPT:
+            return True
+        return self.lag_warned_at is not None and now - self.lag_warned_at < LAG_WINDOW
+
+    def reset(self):
+        """Forget readings of a previous run"""
+        with self.lock:
+            self.tps = self.mspt = self.mspt_max = self.behind_ms = None
+            self.lag_warned_at = self.updated = None
+            self.expect_mspt = False
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'tps': self.tps,
+                'mspt': self.mspt,
+                'mspt_max': self.mspt_max,
+                'behind_ms': self.behind_ms,
+                'last_lag_warning': self.lag_warned_at,
+                'lagging': self.lagging(),
+                'updated': self.updated,
+            }
@@ -0,0 +1,249 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+# (seconds per point, points kept) of each resolution
+RAW = (1, 3600)            # Last hour at 1 s
+MINUTES = (60, 2 * 1440)   # Last two days at 1 min
+HOURS = (3600, 366 * 24)   # Last year at 1 h
+
+FILE_VERSION = 1
+
+RANGE_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)([smhd]?)$')
+RANGE_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_range(text):
+    """Seconds in a range like '90', '15m', '6h' or '30d'; raises ValueError"""
+    match = RANGE_PATTERN.match(str(text).strip().lower())
+    if not match:
+        raise ValueError(f"Invalid range: {text}")
+    return float(match.group(1)) * RANGE_UNITS[match.group(2)]
+
+
+def finite(value):
+    return None if math.isnan(value) else round(value, 3)
+
+
+class Ring:
+    """Fixed number of consecutive time buckets, oldest overwritten first.
+
+    Values are float32 arrays allocated up front; a bucket nobody wrote
+    holds NaN. With rollup, each bucket keeps min, mean and max, otherwise
+    a single value.
+    """
+    def __init__(self, step, capacity, rollup=True):
+        self.step = step
+        self.capacity = capacity
+        self.fields = ('min', 'avg', 'max') if rollup else ('value',)
+        self.columns = [array('f', [NAN]) * capacity for _ in self.fields]
+        self.head = None  # Bucket number (time // step) of the newest bucket
+
+    def put(self, bucket, *values):
+        if self.head is not None:
+            if bucket <= self.head - self.capacity:
+                return  # Older than anything we keep
+            if bucket > self.head:
+                # Clear the buckets skipped over, e.g. while the server was stopped
+                for skipped in range(self.head + 1, min(bucket, self.head + self.capacity + 1)):
+                    for column in self.columns:
+                        column[skipped % self.capacity] = NAN
+        if self.head is None or bucket > self.head:
+            self.head = bucket
+        slot = bucket % self.capacity
+        for column, value in zip(self.columns, values):
+            column[slot] = value
+
+    def query(self, start, end):
+        """[(time, value...)] of every stored bucket between start and end seconds"""
+        if self.head is None:
+            return []
+        first = max(int(start // self.step), self.head - self.capacity + 1)
+        last = min(int(end // self.step), self.head)
+        points = []
+        for bucket in range(first, last + 1):
+            slot = bucket % self.capacity
+            values = [column[slot] for column in self.columns]
+            if not math.isnan(values[0]):
+                points.append((bucket * self.step, *values))
+        return points
+
+    def state(self):
+        return {'step': self.step, 'capacity': self.capacity, 'fields': len(self.columns), 'head': self.head}
+
+    def to_bytes(self):
+        return b''.join(column.tobytes() for column in self.columns)
+
+    def load(self, state, data):
+        """Restore from state() and to_bytes(); returns False if the layout differs"""
+        if state != dict(self.state(), head=state.get('head')):
+            return False
+        columns = []
+        size = self.capacity * array('f').itemsize
+        for index in range(len(self.columns)):
+            column = array('f')
+            column.frombytes(data[index * size:(index + 1) * size])
+            columns.append(column)
+        self.columns = columns
+        self.head = state['head']
+        return True
+
+
+class Rollup:
+    """Running min/sum/count/max of the bucket currently being filled"""
+    __slots__ = ('bucket', 'min', 'sum', 'count', 'max')
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.min = math.inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = -math.inf
+
+    def add(self, value):
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sum += value
+        self.count += 1
+
+    def point(self, step):
+        return (self.bucket * step, self.min, self.sum / self.count, self.max)
+
+
+class Series:
+    """One metric at 1 s, with minute and hour min/avg/max rollups"""
+    def __init__(self):
+        self.raw = Ring(*RAW, rollup=False)
+        self.minutes = Ring(*MINUTES)
+        self.hours = Ring(*HOURS)
+        self.pending = {}  # Ring -> Rollup of its unfinished bucket
+
+    def add(self, timestamp, value):
+        self.raw.put(int(timestamp), value)
+        for ring in (self.minutes, self.hours):
+            bucket = int(timestamp // ring.step)
+            rollup = self.pending.get(ring)
+            if rollup is not None and rollup.bucket != bucket:
+                ring.put(rollup.bucket, rollup.min, rollup.sum / rollup.count, rollup.max)
+                rollup = None
+            if rollup is None:
+                rollup = self.pending[ring] = Rollup(bucket)
+            rollup.add(value)
+
+    def query(self, ring, start, end):
+        points = ring.query(start, end)
+        rollup = self.pending.get(ring)
+        if rollup is not None and start <= rollup.bucket * ring.step <= end:
+            # Include the bucket still being filled
+            points = [point for point in points if point[0] != rollup.bucket * ring.step]
+            points.append(rollup.point(ring.step))
+        return points
+
+
+class TimeSeriesStore:
+    """Metric history of one server in a fixed amount of memory.
+
+    Every series holds the last hour at 1 s, two days of minutes and a year
+    of hours (about 160 KB per metric, however long the server runs). The
+    rollups are saved to path with save() and loaded on creation; the 1 s
+    data only lives in memory.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.series = {}  # Metric name -> Series
+        self.lock = threading.Lock()
+        if path:
+            self.load()
+
+    def add(self, timestamp, values):
+        """Record {metric: value} taken at timestamp; None values are skipped"""
+        with self.lock:
+            for metric, value in values.items():
+                if value is None:
+                    continue
+                series = self.series.get(metric)
+                if series is None:
+                    series = self.series[metric] = Series()
+                series.add(timestamp, float(value))
+
+    def metrics(self):
+        return sorted(self.series)
+
+    def query(self, metric, start, end):
+        """Points of metric between start and end, at the finest resolution that covers start.
+
+        Returns {'step', 'fields', 'points'}; 1 s points are [time, value],
+        rollups [time, min, avg, max].
+        """
+        with self.lock:
+            series = self.series.get(metric)
+            if series is None:
+                raise KeyError(metric)
+            newest = series.raw.head if series.raw.head is not None else end
+            ring = series.hours
+            for candidate in (series.raw, series.minutes):
+                if start >= newest - candidate.step * candidate.capacity:
+                    ring = candidate
+                    break
+            points = ring.query(start, end) if ring is series.raw else series.query(ring, start, end)
+            return {
+                'step': ring.step,
+                'fields': ['time'] + list(ring.fields),
+                'points': [[point[0]] + [finite(value) for value in point[1:]] for point in points],
+            }
+
+    def save(self):
+        """Write the minute and hour rollups to disk"""
+        if not self.path:
+            return
+        with self.lock:
+            header = {'version': FILE_VERSION, 'series': {}}
+            blobs = []
+            for metric, series in self.series.items():
+                header['series'][metric] = [series.minutes.state(), series.hours.state()]
+                blobs.append(series.minutes.to_bytes())
+                blobs.append(series.hours.to_bytes())
+        temporary = self.path + '.tmp'
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning("Could not save metric history to %s: %s", self.path, e)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                header = json.loads(f.readline())
+                data = f.read()
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable metric history %s: %s", self.path, e)
+            return
+        if header.get('version') != FILE_VERSION:
+            return
+        offset = 0
+        for metric, states in header.get('series', {}).items():
+            series = Series()
+            for ring, state in zip((series.minutes, series.hours), states):
+                size = state['capacity'] * state['fields'] * array('f').itemsize
+                loaded = ring.load(state, data[offset:offset + size])
+                offset += size
+                if not loaded:
+                    logger.info("Discarding %s history saved with a different layout", metric)
+                    break
+            else:
+                self.series[metric] = series